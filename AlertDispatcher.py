@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import queue
+import datetime
+from threading import Thread
+
+# Marca interna de la cola del dispatcher
+STOP = object()
+
+# Alertas que se envían en cuanto llegan, sin esperar a completar el resumen
+URGENT_KINDS = ("error", "queue_complete")
+
+class WebhookError(OSError):
+    """Respuesta de error del webhook; status es el código HTTP."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+def is_transient(error):
+    """
+    True si vale la pena reintentar el envío: errores de conexión, respuestas SMTP 4xx y
+    respuestas HTTP 5xx (o 429). Las respuestas SMTP 5xx (autenticación, remitente o
+    destinatarios rechazados), los HTTP 4xx y los errores de programación no cambian
+    por volver a intentarlo.
+    """
+    import smtplib
+    import http.client
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return any(code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code < 500
+    if isinstance(error, WebhookError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+class SmtpTarget:
+    """Correo por SMTP. La conexión se abre al primer envío y se reutiliza para los siguientes."""
+
+    def __init__(self, host, port=465, username="", password="", sender="", recipients=(), use_ssl=True, starttls=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.recipients = [recipients] if isinstance(recipients, str) else list(recipients)
+        if not self.sender:
+            raise ValueError("SMTP alerts need a sender or a username")
+        if not self.recipients:
+            raise ValueError("SMTP alerts need at least one recipient")
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.server = None
+
+    def connect(self):
+        import smtplib
+        if self.use_ssl:
+            self.server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            self.server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                self.server.starttls()
+        if self.username:
+            self.server.login(self.username, self.password)
+
+    def send(self, subject, body, alerts):
+        import smtplib
+        from email.message import EmailMessage
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        message.set_content(body)
+        if self.server is None:
+            self.connect()
+        try:
+            self.server.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # El servidor cerró la conexión reutilizada: se abre otra una sola vez
+            self.server = None
+            self.connect()
+            self.server.send_message(message)
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+class WebhookTarget:
+    """POST de un JSON {"subject", "text", "alerts"} a una URL, con conexión HTTP keep-alive."""
+
+    def __init__(self, url, headers=None, timeout=10):
+        from urllib.parse import urlsplit
+        self.url = url
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.connection = None
+
+    def send(self, subject, body, alerts):
+        import http.client
+        if self.connection is None:
+            connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            self.connection = connection_class(self.netloc, timeout=self.timeout)
+        payload = json.dumps({"subject": subject, "text": body, "alerts": alerts}).encode("utf-8")
+        headers = dict(self.headers, **{"Content-Type": "application/json"})
+        try:
+            self.connection.request("POST", self.path, payload, headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.status >= 400:
+            raise WebhookError(f"Webhook {self.url} answered {response.status} {response.reason}", response.status)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+class FileTarget:
+    """Añade cada alerta como una línea JSON a un archivo (útil para otros scripts y para pruebas)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, subject, body, alerts):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for alert in alerts:
+                f.write(json.dumps(dict(alert, subject=subject)) + "\n")
+
+    def close(self):
+        pass
+
+class AlertDispatcher:
+    """
+    Envía las alertas del render desde un hilo propio, para que ni el render ni la
+    interfaz esperen nunca a un servidor de correo.
+
+    post() solo encola. Las alertas se juntan en un resumen que sale al llegar a
+    batch_size alertas o cuando pasan batch_window segundos desde la primera; los errores
+    y el final de la cola salen en el momento. Cada destino conserva su conexión entre
+    envíos y la cierra tras idle_timeout segundos sin alertas. Si un envío falla se
+    reintenta hasta max_retries veces, esperando backoff, 2*backoff, 4*backoff... segundos.
+    """
+
+    def __init__(self, targets, batch_size=10, batch_window=300.0, max_retries=5, backoff=2.0, max_backoff=60.0, idle_timeout=60.0):
+        self.targets = targets
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self.alerts = queue.Queue()
+        self.sent = 0
+        self.failed = 0
+        self.thread = Thread(target=self.run, name="AlertDispatcher", daemon=True)
+        self.thread.start()
+
+    def post(self, kind, message):
+        self.alerts.put({
+            "kind": kind,
+            "message": message,
+            "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+    def close(self, timeout=30):
+        """Envía lo pendiente, cierra las conexiones y espera al hilo como mucho timeout segundos."""
+        self.alerts.put(STOP)
+        self.thread.join(timeout)
+
+    def run(self):
+        batch = []
+        batch_started = None
+        while True:
+            if batch:
+                wait = max(0, batch_started + self.batch_window - time.monotonic())
+            else:
+                wait = self.idle_timeout
+            try:
+                alert = self.alerts.get(timeout=wait)
+            except queue.Empty:
+                alert = None
+
+            if alert is STOP:
+                self.deliver(batch)
+                self.close_targets()
+                return
+            if alert is None and not batch:
+                # Sin alertas durante un rato: no dejar conexiones abiertas
+                self.close_targets()
+                continue
+            if alert is not None:
+                if not batch:
+                    batch_started = time.monotonic()
+                batch.append(alert)
+                if len(batch) < self.batch_size and alert["kind"] not in URGENT_KINDS:
+                    continue
+            self.deliver(batch)
+            batch = []
+
+    def deliver(self, batch):
+        if not batch:
+            return
+        subject, body = self.digest(batch)
+        for target in self.targets:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    target.send(subject, body, batch)
+                    self.sent += 1
+                    break
+                except Exception as e:
+                    target.close()
+                    if attempt == self.max_retries or not is_transient(e):
+                        self.failed += 1
+                        print(f"Could not send alert through {type(target).__name__}: {e}")
+                        break
+                    delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+                    print(f"Alert delivery through {type(target).__name__} failed ({e}), retrying in {delay:g}s")
+                    time.sleep(delay)
+
+    def digest(self, batch):
+        """Asunto y texto de un resumen con varias alertas."""
+        if len(batch) == 1:
+            subject = {
+                "item_complete": "Render complete",
+                "queue_complete": "Render queue complete",
+                "error": "Render error",
+            }.get(batch[0]["kind"], "Render alert")
+        else:
+            completed = sum(1 for alert in batch if alert["kind"] == "item_complete")
+            errors = sum(1 for alert in batch if alert["kind"] == "error")
+            finished = any(alert["kind"] == "queue_complete" for alert in batch)
+            subject = f"Render queue{' complete' if finished else ''}: {completed} job(s) completed" + (f", {errors} error(s)" if errors else "")
+        body = "\n".join(f"[{alert['time']}] {alert['message']}" for alert in batch)
+        return subject, body
+
+    def close_targets(self):
+        for target in self.targets:
+            target.close()
+
+def alert_settings_path():
+    from MetadataCache import user_config_dir
+    return os.path.join(user_config_dir(), "alerts.json")
+
+def load_alert_settings(path=None):
+    """
+    Destinos de las alertas de la configuración del usuario (alerts.json), o {} si no hay.
+    Las credenciales viven solo aquí: no se copian al diario ni a los archivos de la cola.
+    """
+    try:
+        with open(path or alert_settings_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def build_alert_dispatcher(settings):
+    """
+    Crea el dispatcher con los destinos de la configuración, o None si no hay ninguno.
+    Lanza ValueError si un destino está mal configurado:
+
+        {"smtp": {"host", "port", "username", "password", "sender", "recipients", "use_ssl", "starttls"},
+         "webhook": {"url", "headers"}, "file": "alertas.jsonl",
+         "batch_size": 10, "batch_window": 300, "max_retries": 5}
+    """
+    targets = []
+    if settings.get("smtp"):
+        targets.append(SmtpTarget(**settings["smtp"]))
+    if settings.get("webhook"):
+        targets.append(WebhookTarget(**settings["webhook"]))
+    if settings.get("file"):
+        targets.append(FileTarget(settings["file"]))
+    if not targets:
+        return None
+    return AlertDispatcher(
+        targets,
+        batch_size=settings.get("batch_size", 10),
+        batch_window=settings.get("batch_window", 300.0),
+        max_retries=settings.get("max_retries", 5),
+    )
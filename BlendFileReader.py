@@ -0,0 +1,280 @@
+import os
+import re
+import mmap
+import gzip
+import struct
+
+# Tipo de objeto de Blender para las cámaras (DNA_object_types.h)
+OB_CAMERA = 11
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+class UnsupportedBlendFile(Exception):
+    """El archivo no se puede leer sin Blender (versión, compresión o estructura desconocida)."""
+
+class BlendFileReader:
+    """
+    Lector en Python puro de archivos .blend. Recorre las cabeceras de bloque, interpreta
+    el SDNA guardado en el propio archivo y decodifica solo los bloques de objetos,
+    escenas y FileGlobal, sin abrir Blender.
+
+    Los archivos sin comprimir se mapean en memoria, así que solo se leen del disco
+    las páginas de las cabeceras y de los bloques que se usan. Los comprimidos con gzip
+    o zstd (este último necesita el paquete opcional 'zstandard') se descomprimen antes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.data = None
+        self.pointer_size = 8
+        self.endian = "<"
+        self.version = 0
+        self.header_size = 12
+        self.block_header_format = None
+        self.blocks = []
+        self.names = []
+        self.types = []
+        self.type_indices = {}
+        self.type_lengths = []
+        self.structs = {}
+        self.struct_fields_cache = {}
+
+    def __enter__(self):
+        try:
+            self.open()
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        self.file = open(self.path, "rb")
+        magic = self.file.read(4)
+        self.file.seek(0)
+        if magic.startswith(GZIP_MAGIC):
+            with gzip.GzipFile(fileobj=self.file) as f:
+                self.data = f.read()
+        elif magic == ZSTD_MAGIC:
+            try:
+                import zstandard
+            except ImportError:
+                raise UnsupportedBlendFile("zstd compressed .blend files need the 'zstandard' package")
+            reader = zstandard.ZstdDecompressor().stream_reader(self.file, read_across_frames=True)
+            self.data = reader.read()
+        else:
+            if os.fstat(self.file.fileno()).st_size == 0:
+                raise UnsupportedBlendFile("Empty file")
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.read_file_header()
+        self.read_block_headers()
+        self.read_sdna()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = None
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def read_file_header(self):
+        header = bytes(self.data[:17])
+        if not header.startswith(b"BLENDER"):
+            raise UnsupportedBlendFile("Not a .blend file")
+
+        legacy = re.match(rb"BLENDER([_-])([vV])(\d{3})", header)
+        large = re.match(rb"BLENDER(\d{2})-(\d{2})([vV])(\d{4})", header)
+        if legacy:
+            # BLENDER + tamaño de puntero + endianness + versión (12 bytes)
+            self.pointer_size = 8 if legacy.group(1) == b"-" else 4
+            self.endian = "<" if legacy.group(2) == b"v" else ">"
+            self.version = int(legacy.group(3))
+            self.header_size = 12
+            pointer = "Q" if self.pointer_size == 8 else "I"
+            # code, len, old, SDNAnr, nr
+            self.block_header_format = struct.Struct(f"{self.endian}4si{pointer}ii")
+            self.block_header_fields = ("code", "length", "old", "sdna_index", "count")
+        elif large and int(large.group(2)) == 1:
+            # Formato de Blender 5.0+: punteros de 64 bits y cabeceras de bloque de 64 bits
+            self.pointer_size = 8
+            self.endian = "<" if large.group(3) == b"v" else ">"
+            self.version = int(large.group(4))
+            self.header_size = int(large.group(1))
+            # code, SDNAnr, old, len, nr
+            self.block_header_format = struct.Struct(f"{self.endian}4siQqq")
+            self.block_header_fields = ("code", "sdna_index", "old", "length", "count")
+        else:
+            raise UnsupportedBlendFile(f"Unknown .blend header {header!r}")
+
+    def read_block_headers(self):
+        """Recorre todas las cabeceras de bloque guardando dónde empieza cada cuerpo."""
+        offset = self.header_size
+        size = len(self.data)
+        header_format = self.block_header_format
+        fields = self.block_header_fields
+        while offset + header_format.size <= size:
+            values = dict(zip(fields, header_format.unpack_from(self.data, offset)))
+            offset += header_format.size
+            if values["code"] == b"ENDB":
+                return
+            if values["length"] < 0 or offset + values["length"] > size:
+                raise UnsupportedBlendFile("Corrupt or truncated block header")
+            values["code"] = values["code"].rstrip(b"\0").decode("latin-1")
+            values["offset"] = offset
+            self.blocks.append(values)
+            offset += values["length"]
+        raise UnsupportedBlendFile("Missing ENDB block")
+
+    def read_sdna(self):
+        dna_block = next((block for block in self.blocks if block["code"] == "DNA1"), None)
+        if dna_block is None:
+            raise UnsupportedBlendFile("No DNA1 block")
+        data = bytes(self.data[dna_block["offset"]:dna_block["offset"] + dna_block["length"]])
+        offset = 0
+
+        def expect(tag):
+            nonlocal offset
+            if data[offset:offset + 4] != tag:
+                raise UnsupportedBlendFile(f"Unexpected SDNA section, expected {tag!r}")
+            offset += 4
+
+        def read_int():
+            nonlocal offset
+            value = struct.unpack_from(f"{self.endian}i", data, offset)[0]
+            offset += 4
+            return value
+
+        def read_strings(count):
+            nonlocal offset
+            strings = []
+            for _ in range(count):
+                end = data.index(b"\0", offset)
+                strings.append(data[offset:end].decode("latin-1"))
+                offset = end + 1
+            return strings
+
+        def align():
+            nonlocal offset
+            offset = (offset + 3) & ~3
+
+        expect(b"SDNA")
+        expect(b"NAME")
+        self.names = read_strings(read_int())
+        align()
+        expect(b"TYPE")
+        self.types = read_strings(read_int())
+        self.type_indices = {name: index for index, name in enumerate(self.types)}
+        align()
+        expect(b"TLEN")
+        self.type_lengths = list(struct.unpack_from(f"{self.endian}{len(self.types)}h", data, offset))
+        offset += 2 * len(self.types)
+        align()
+        expect(b"STRC")
+        for struct_index in range(read_int()):
+            type_index, field_count = struct.unpack_from(f"{self.endian}hh", data, offset)
+            offset += 4
+            fields = struct.unpack_from(f"{self.endian}{field_count * 2}h", data, offset)
+            offset += 4 * field_count
+            self.structs[self.types[type_index]] = {
+                "index": struct_index,
+                "fields": [(self.types[fields[i]], self.names[fields[i + 1]]) for i in range(0, len(fields), 2)],
+            }
+
+    def struct_fields(self, struct_name):
+        """{nombre del campo: (offset, tipo, es_puntero, tamaño)} para un struct del SDNA."""
+        if struct_name in self.struct_fields_cache:
+            return self.struct_fields_cache[struct_name]
+        if struct_name not in self.structs:
+            raise UnsupportedBlendFile(f"Struct {struct_name} not found in SDNA")
+
+        fields = {}
+        offset = 0
+        for type_name, name in self.structs[struct_name]["fields"]:
+            is_pointer = name.startswith("*") or name.startswith("(*")
+            array_length = 1
+            for dimension in re.findall(r"\[(\d+)\]", name):
+                array_length *= int(dimension)
+            base_name = re.match(r"[(*]*(\w+)", name).group(1)
+            element_size = self.pointer_size if is_pointer else self.type_lengths[self.type_indices[type_name]]
+            size = element_size * array_length
+            fields[base_name] = (offset, type_name, is_pointer, size)
+            offset += size
+        self.struct_fields_cache[struct_name] = fields
+        return fields
+
+    def field_offset(self, struct_name, path):
+        """Offset, tipo y tamaño de un campo anidado, por ejemplo ('Scene', 'r.sfra')."""
+        offset = 0
+        for part in path.split("."):
+            if part not in self.struct_fields(struct_name):
+                raise UnsupportedBlendFile(f"Field {struct_name}.{part} not found in SDNA")
+            field_offset, type_name, is_pointer, size = self.struct_fields(struct_name)[part]
+            offset += field_offset
+            struct_name = type_name
+        return offset, type_name, is_pointer, size
+
+    def read_field(self, block, struct_name, path):
+        offset, type_name, is_pointer, size = self.field_offset(struct_name, path)
+        position = block["offset"] + offset
+        if is_pointer:
+            return struct.unpack_from(f"{self.endian}{'Q' if self.pointer_size == 8 else 'I'}", self.data, position)[0]
+        if type_name == "char":
+            raw = bytes(self.data[position:position + size])
+            return raw.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+        formats = {"short": "h", "ushort": "H", "int": "i", "uint": "I", "float": "f", "double": "d", "int64_t": "q", "uint64_t": "Q"}
+        if type_name not in formats:
+            raise UnsupportedBlendFile(f"Cannot decode field type {type_name}")
+        return struct.unpack_from(f"{self.endian}{formats[type_name]}", self.data, position)[0]
+
+    def blocks_of(self, code, struct_name):
+        """Bloques con el código dado cuyo contenido es el struct indicado."""
+        struct_index = self.structs.get(struct_name, {}).get("index")
+        return [block for block in self.blocks if block["code"] == code and block["sdna_index"] == struct_index]
+
+    def read_scene_metadata(self):
+        """Mismo diccionario que devuelve script_probe.py, leído directamente del archivo."""
+        object_names = {}
+        cameras = []
+        for block in self.blocks_of("OB", "Object"):
+            name = self.read_field(block, "Object", "id.name")[2:]
+            object_names[block["old"]] = name
+            if self.read_field(block, "Object", "type") == OB_CAMERA:
+                cameras.append(name)
+
+        scenes = self.blocks_of("SC", "Scene")
+        if not scenes:
+            raise UnsupportedBlendFile("No scene found")
+        scene = scenes[0]
+        globals_blocks = self.blocks_of("GLOB", "FileGlobal")
+        if globals_blocks:
+            current_scene = self.read_field(globals_blocks[0], "FileGlobal", "curscene")
+            scene = next((block for block in scenes if block["old"] == current_scene), scene)
+
+        return {
+            "file": self.path,
+            "cameras": cameras,
+            "scene_camera": object_names.get(self.read_field(scene, "Scene", "camera"), ""),
+            "frame_start": self.read_field(scene, "Scene", "r.sfra"),
+            "frame_end": self.read_field(scene, "Scene", "r.efra"),
+            "resolution": f"{self.read_field(scene, 'Scene', 'r.xsch')}x{self.read_field(scene, 'Scene', 'r.ysch')}",
+            "render_engine": self.read_field(scene, "Scene", "r.engine"),
+        }
+
+def read_blend_metadata(path):
+    """
+    Lee cámaras y ajustes de render de un .blend sin lanzar Blender.
+    Lanza UnsupportedBlendFile si el archivo no se puede interpretar.
+    """
+    try:
+        with BlendFileReader(path) as reader:
+            return reader.read_scene_metadata()
+    except UnsupportedBlendFile:
+        raise
+    except (struct.error, ValueError, IndexError, KeyError, EOFError, OSError) as e:
+        raise UnsupportedBlendFile(f"Could not parse {path}: {e}")
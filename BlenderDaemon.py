@@ -0,0 +1,111 @@
+import os
+import json
+import asyncio
+from collections import deque
+from RenderSupervisor import STREAM_LIMIT, terminate_process
+
+class BlenderDaemon:
+    """
+    Proceso de Blender que se queda abierto en modo servidor (script_blender.py -- --server)
+    y recibe los trabajos de render por stdin, así no hay que arrancar Blender ni
+    volver a cargar el .blend en cada item de la cola. Vive en el bucle del RenderSupervisor.
+    """
+
+    def __init__(self, blender_executable="blender", script="script_blender.py"):
+        self.blender_executable = blender_executable
+        self.script = script
+        self.process = None
+        self.stderr_task = None
+        self.stderr_tail = deque(maxlen=50)
+        self.blend_file = None  # .blend que script_blender.py tiene cargado en este daemon
+
+    async def start(self, env=None):
+        command = [
+            self.blender_executable,
+            "--background",
+            "--python",
+            self.script,
+            "--",
+            "--server",
+        ]
+        print(f"Starting Blender daemon: {' '.join(command)}")
+        self.process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=dict(os.environ, **env) if env else None,
+            limit=STREAM_LIMIT,
+        )
+        # stderr se vacía en paralelo para que Blender nunca se bloquee escribiendo en él
+        self.stderr_task = asyncio.ensure_future(self._drain_stderr())
+
+        while True:
+            line = await self.readline()
+            if line is None:
+                raise RuntimeError(f"Blender daemon exited during startup\n{self.stderr_text()}")
+            print(line, end="")
+            if line.startswith("RENDER_SERVER_READY"):
+                return
+
+    async def readline(self):
+        line = await self.process.stdout.readline()
+        if not line:
+            return None
+        return line.decode("utf-8", errors="replace")
+
+    async def _drain_stderr(self):
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                return
+            text = line.decode("utf-8", errors="replace")
+            print(text, end="")
+            self.stderr_tail.append(text)
+
+    def stderr_text(self):
+        return "".join(self.stderr_tail)
+
+    def is_alive(self):
+        return self.process is not None and self.process.returncode is None
+
+    async def render(self, job, on_line):
+        """
+        Envía un trabajo al daemon y pasa cada línea de salida a on_line hasta que
+        Blender responde. Devuelve (returncode, mensaje de error) como un proceso normal.
+        Si se cancela a mitad de un trabajo el daemon se termina, porque su estado ya no es fiable.
+        """
+        try:
+            self.process.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+            await self.process.stdin.drain()
+            self.blend_file = job.get("blend_file")
+
+            while True:
+                line = await self.readline()
+                if line is None:
+                    return 1, f"Blender daemon exited unexpectedly\n{self.stderr_text()}"
+                if line.startswith("RENDER_DONE"):
+                    result = json.loads(line[len("RENDER_DONE"):])
+                    if result.get("status") == "ok":
+                        return 0, ""
+                    return 1, result.get("message", "")
+                if on_line(line) is False:
+                    self.terminate()
+                    return 1, "Rendering interrupted"
+        except asyncio.CancelledError:
+            self.terminate()
+            raise
+
+    async def stop(self):
+        if not self.is_alive():
+            return
+        try:
+            self.process.stdin.write((json.dumps({"command": "quit"}) + "\n").encode("utf-8"))
+            await self.process.stdin.drain()
+            await asyncio.wait_for(self.process.wait(), timeout=10)
+        except (OSError, asyncio.TimeoutError):
+            self.terminate()
+
+    def terminate(self):
+        if self.is_alive():
+            terminate_process(self.process)
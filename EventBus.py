@@ -0,0 +1,63 @@
+from threading import Lock
+
+class EventBus:
+    """
+    Bus de eventos entre el render (que corre fuera del hilo de Tk) y la interfaz.
+
+    publish() se puede llamar desde cualquier hilo. Mientras no haya un bucle que drene
+    el bus los eventos se entregan en el acto; con attach_tk() se guardan en una cola y
+    el hilo de Tk los entrega cada interval_ms. Los eventos publicados con la misma
+    coalesce_key entre dos drenados se juntan en uno solo con los datos más recientes,
+    así cientos de frames por segundo se convierten en un repintado por tick.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+        self.pending = []
+        self.coalesced = {}
+        self.lock = Lock()
+        self.root = None
+        self.interval_ms = 50
+
+    def subscribe(self, callback):
+        """callback(event_type, data) se llama en el hilo que drena el bus."""
+        self.subscribers.append(callback)
+
+    def publish(self, event_type=None, data=None, coalesce_key=None):
+        if self.root is None:
+            self.deliver(event_type, data)
+            return
+
+        with self.lock:
+            if coalesce_key is not None and coalesce_key in self.coalesced:
+                # Sustituir el evento pendiente conservando su posición en la cola
+                self.pending[self.coalesced[coalesce_key]] = (event_type, data)
+                return
+            if coalesce_key is not None:
+                self.coalesced[coalesce_key] = len(self.pending)
+            self.pending.append((event_type, data))
+
+    def deliver(self, event_type, data):
+        for callback in list(self.subscribers):
+            callback(event_type, data)
+
+    def drain(self):
+        """Entrega todos los eventos pendientes en el hilo actual."""
+        with self.lock:
+            events = self.pending
+            self.pending = []
+            self.coalesced = {}
+        for event_type, data in events:
+            self.deliver(event_type, data)
+        return len(events)
+
+    def attach_tk(self, root, interval_ms=50):
+        """Entrega los eventos desde el bucle principal de Tk usando root.after."""
+        self.root = root
+        self.interval_ms = interval_ms
+        self.root.after(self.interval_ms, self._tk_tick)
+
+    def _tk_tick(self):
+        # Se reprograma antes de entregar para que un error en un observador no corte el bucle
+        self.root.after(self.interval_ms, self._tk_tick)
+        self.drain()
@@ -0,0 +1,117 @@
+import os
+import gzip
+import time
+from collections import deque
+from threading import Lock
+
+class JobLog:
+    """
+    Salida de Blender (stdout y stderr) de un trabajo, con memoria acotada.
+
+    En memoria solo quedan las últimas tail_lines líneas y el bloque que se está
+    llenando. Cada block_lines líneas el bloque se comprime como un miembro gzip
+    independiente y se añade al archivo <job_id>.log.gz: el archivo completo se puede
+    leer con zcat, y con el índice de bloques (primera línea, posición, tamaño) page()
+    solo descomprime los bloques que pide. Así un trabajo de 10.000 frames con Cycles en
+    modo detallado ocupa lo mismo en memoria que uno de diez.
+
+    Cada render del trabajo añade sus bloques al final del archivo, así que reintentar un
+    trabajo no borra el log del intento que falló; page() y tail() ven solo el render actual.
+
+    append() se llama desde el bucle del render y page()/tail() desde la interfaz.
+    """
+
+    def __init__(self, job_id, log_dir, tail_lines=500, block_lines=1000):
+        self.job_id = job_id
+        self.path = os.path.join(log_dir, f"{job_id}.log.gz")
+        self.tail_lines = tail_lines
+        self.block_lines = block_lines
+        self.tail_buffer = deque(maxlen=tail_lines)
+        self.pending = []
+        self.blocks = []  # (primera línea, posición en el archivo, bytes)
+        self.line_count = 0
+        self.file = None
+        self.closed = False
+        self.lock = Lock()
+
+    def append(self, line):
+        if not line.endswith("\n"):
+            line += "\n"
+        with self.lock:
+            if self.closed:
+                return
+            self.tail_buffer.append(line)
+            self.pending.append(line)
+            self.line_count += 1
+            if len(self.pending) >= self.block_lines:
+                self._flush_block()
+
+    def _flush_block(self):
+        # Se llama con self.lock tomado
+        if not self.pending:
+            return
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Los renders anteriores del trabajo se quedan al principio del archivo
+            self.file = open(self.path, "ab")
+        member = gzip.compress("".join(self.pending).encode("utf-8"), compresslevel=6, mtime=0)
+        self.blocks.append((self.line_count - len(self.pending), self.file.tell(), len(member)))
+        self.file.write(member)
+        self.file.flush()
+        self.pending = []
+
+    def close(self):
+        """Pasa a disco lo que queda y libera la memoria; el log se sigue pudiendo leer."""
+        with self.lock:
+            if self.closed:
+                return
+            self._flush_block()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.closed = True
+            self.tail_buffer = None
+
+    def page(self, start=0, count=200):
+        """Líneas [start, start + count) del log completo (en disco y en memoria)."""
+        start = max(0, start)
+        end = start + max(0, count)
+        lines = []
+        with self.lock:
+            blocks = list(self.blocks)
+            pending = list(self.pending)
+            pending_start = self.line_count - len(pending)
+        needed = [block for index, block in enumerate(blocks)
+                  if block[0] < end and (blocks[index + 1][0] if index + 1 < len(blocks) else pending_start) > start]
+        if needed:
+            with open(self.path, "rb") as f:
+                for first_line, offset, size in needed:
+                    f.seek(offset)
+                    block_lines = gzip.decompress(f.read(size)).decode("utf-8").splitlines(keepends=True)
+                    lines.extend(block_lines[max(0, start - first_line):max(0, end - first_line)])
+        if end > pending_start:
+            lines.extend(pending[max(0, start - pending_start):end - pending_start])
+        return lines
+
+    def tail(self, count=50):
+        """Últimas count líneas; de memoria mientras el trabajo corre y de disco después."""
+        with self.lock:
+            if self.tail_buffer is not None and count <= self.tail_lines:
+                return list(self.tail_buffer)[-count:] if count else []
+            total = self.line_count
+        return self.page(total - count, count)
+
+def prune_logs(log_dir, max_age_days=30):
+    """Borra los logs de trabajos con más de max_age_days días."""
+    limit = time.time() - max_age_days * 86400
+    try:
+        entries = list(os.scandir(log_dir))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name.endswith(".log.gz"):
+            try:
+                if entry.stat().st_mtime < limit:
+                    os.remove(entry.path)
+            except OSError:
+                pass
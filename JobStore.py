@@ -0,0 +1,129 @@
+from threading import RLock
+
+# Campos de los trabajos que tienen índice secundario
+INDEXED_FIELDS = ("status", "file", "output_path")
+
+def new_job_id():
+    import uuid  # uuid arrastra platform; solo se carga al crear el primer trabajo
+    return uuid.uuid4().hex
+
+class JobStore:
+    """
+    Trabajos del render indexados por un id estable (UUID) en lugar de por su posición.
+
+    Buscar, actualizar y quitar un trabajo por id cuesta O(1), y los índices secundarios
+    por estado, archivo .blend y carpeta de salida evitan recorrer toda la cola. Se itera
+    en el orden de la cola, que solo cambia al añadir trabajos o con sort().
+
+    Los campos indexados se deben cambiar con update() o set_status() para que los
+    índices sigan siendo correctos; el resto se puede modificar directamente en el dict.
+    El render cambia los estados desde su propio hilo, por eso todo pasa por un lock.
+
+    listener, si se asigna, recibe cada cambio como listener(acción, trabajo, campos)
+    dentro del lock, en el mismo orden en que se hizo (lo usa QueueJournal).
+    """
+
+    def __init__(self, jobs=None, default_status="pending"):
+        self.default_status = default_status
+        self.lock = RLock()
+        self.jobs = {}
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        self.listener = None
+        for job in jobs or []:
+            self.add(job)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.jobs.values()))
+
+    def __contains__(self, job_id):
+        return job_id in self.jobs
+
+    def __getitem__(self, job_id):
+        return self.jobs[job_id]
+
+    def get(self, job_id, default=None):
+        return self.jobs.get(job_id, default)
+
+    def ids(self):
+        with self.lock:
+            return list(self.jobs)
+
+    def add(self, job):
+        """Añade un trabajo al final de la cola, asignándole un id si no lo tiene."""
+        with self.lock:
+            job_id = job.get("id")
+            if not job_id or job_id in self.jobs:
+                job_id = job["id"] = new_job_id()
+            job.setdefault("status", self.default_status)
+            self.jobs[job_id] = job
+            self._index(job)
+            self._changed("add", job)
+            return job_id
+
+    def remove(self, job_id):
+        """Quita un trabajo y lo devuelve, o None si no existe."""
+        with self.lock:
+            job = self.jobs.pop(job_id, None)
+            if job is not None:
+                self._unindex(job)
+                self._changed("remove", job)
+            return job
+
+    def update(self, job_id, fields):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            self._unindex(job)
+            job.update(fields)
+            self._index(job)
+            self._changed("update", job, fields)
+            return job
+
+    def set_status(self, job_id, status):
+        return self.update(job_id, {"status": status})
+
+    def clear(self):
+        with self.lock:
+            self.jobs = {}
+            self.indexes = {field: {} for field in INDEXED_FIELDS}
+            self._changed("clear")
+
+    def sort(self, key):
+        with self.lock:
+            self.jobs = {job["id"]: job for job in sorted(self.jobs.values(), key=key)}
+            self._changed("sort")
+
+    def _changed(self, action, job=None, fields=None):
+        if self.listener is not None:
+            self.listener(action, job, fields)
+
+    def by_status(self, status):
+        return self._lookup("status", status)
+
+    def by_file(self, blend_file):
+        return self._lookup("file", blend_file)
+
+    def by_output(self, output_path):
+        return self._lookup("output_path", output_path)
+
+    def _lookup(self, field, value):
+        # Los índices guardan los ids en un dict para conservar el orden de inserción
+        with self.lock:
+            return [self.jobs[job_id] for job_id in self.indexes[field].get(value, ())]
+
+    def _index(self, job):
+        for field in INDEXED_FIELDS:
+            self.indexes[field].setdefault(job.get(field), {})[job["id"]] = None
+
+    def _unindex(self, job):
+        for field in INDEXED_FIELDS:
+            ids = self.indexes[field].get(job.get(field))
+            if ids is not None:
+                ids.pop(job["id"], None)
+                if not ids:
+                    del self.indexes[field][job.get(field)]
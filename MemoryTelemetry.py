@@ -0,0 +1,129 @@
+import re
+
+# "Fra:12 Mem:512.30M (Peak 1024.00M) | Time:..." y el formato antiguo
+# "Fra:12 Mem:512.30M (0.00M, Peak 1024.00M) | ..."; en escenas grandes Blender usa G
+FRAME_MEMORY = re.compile(r"Fra:(\d+)\s+Mem:\s*([\d.]+)([KMG])(?:[^|]*?Peak\s*([\d.]+)([KMG]))?")
+UNIT_MB = {"K": 1 / 1024, "M": 1, "G": 1024}
+# Frames que se guardan en frame_memory y sobre los que se calcula memory_p95_mb
+FRAME_WINDOW = 50
+
+def parse_frame_memory(line):
+    """Devuelve (frame, memoria_mb, pico_mb o None) de una línea "Fra:" de Blender, o None."""
+    match = FRAME_MEMORY.match(line)
+    if match is None:
+        return None
+    frame, memory, unit, peak, peak_unit = match.groups()
+    memory_mb = float(memory) * UNIT_MB[unit]
+    peak_mb = float(peak) * UNIT_MB[peak_unit] if peak else None
+    return int(frame), memory_mb, peak_mb
+
+def format_memory(megabytes):
+    """Formatea MB para la interfaz: '850 MB', '3.2 GB' o '' si no hay dato."""
+    if not megabytes:
+        return ""
+    if megabytes >= 1024:
+        return f"{megabytes / 1024:.1f} GB"
+    return f"{megabytes:.0f} MB"
+
+class MemoryTelemetry:
+    """
+    Memoria de un trabajo mientras se renderiza un chunk, guardada en el propio item
+    para el planificador y para revisar después un render que falló:
+
+    - blender_memory_mb / blender_peak_mb: lo que Blender informa en sus líneas "Fra:",
+    - frame_memory: pico informado en los últimos FRAME_WINDOW frames ([[12, 1024.0], ...]),
+    - memory_p95_mb: percentil 95 de esos picos,
+    - process_peak_mb: RSS máximo de Blender y sus procesos hijos en este render,
+      muestreado con psutil,
+    - peak_memory_mb: el mayor pico visto nunca, para mostrarlo en la interfaz.
+
+    ResourceMonitor decide si el trabajo cabe junto a otros con memory_p95_mb y
+    process_peak_mb, no con peak_memory_mb: un frame puntualmente pesado no frena el
+    trabajo para siempre, y lo que se guarda en el item no crece con el número de frames.
+
+    Todo se actualiza desde el bucle del supervisor. Sin psutil solo quedan los datos
+    de Blender. Con daemons el proceso se reutiliza, así que process_peak_mb incluye lo
+    que el daemon tenga cargado de trabajos anteriores.
+    """
+
+    def __init__(self, item, interval=1.0):
+        self.item = item
+        self.interval = interval
+        self.task = None
+
+    @staticmethod
+    def reset(item):
+        """Borra la telemetría del render anterior; peak_memory_mb y memory_p95_mb se mantienen como referencia."""
+        for key in ("blender_memory_mb", "blender_peak_mb", "process_peak_mb", "frame_memory"):
+            item.pop(key, None)
+
+    def record_line(self, line):
+        parsed = parse_frame_memory(line)
+        if parsed is None:
+            return
+        frame, memory_mb, peak_mb = parsed
+        self.record(frame, memory_mb, peak_mb if peak_mb is not None else memory_mb)
+
+    def record(self, frame, memory_mb, peak_mb):
+        item = self.item
+        if memory_mb is not None:
+            item["blender_memory_mb"] = round(memory_mb, 1)
+        if peak_mb is None:
+            return
+        peak_mb = round(peak_mb, 1)
+        window = item.get("frame_memory")
+        if not isinstance(window, list):
+            window = item["frame_memory"] = []  # Configuraciones antiguas guardaban un dict por frame
+        # Con chunks en paralelo las líneas de varios frames se mezclan: se busca desde el final
+        for entry in reversed(window):
+            if entry[0] == frame:
+                changed = peak_mb > entry[1]
+                if changed:
+                    entry[1] = peak_mb
+                break
+        else:
+            window.append([frame, peak_mb])
+            if len(window) > FRAME_WINDOW:
+                del window[0]
+            changed = True
+        if changed:
+            peaks = sorted(entry[1] for entry in window)
+            item["memory_p95_mb"] = peaks[min(len(peaks) - 1, int(len(peaks) * 0.95))]
+        item["blender_peak_mb"] = round(max(item.get("blender_peak_mb") or 0, peak_mb), 1)
+        self.update_peak(peak_mb)
+
+    def update_peak(self, megabytes):
+        self.item["peak_memory_mb"] = round(max(float(self.item.get("peak_memory_mb") or 0), megabytes), 1)
+
+    def start(self, pid):
+        """Empieza a muestrear el árbol de procesos de pid (llamar desde el bucle de asyncio)."""
+        import asyncio
+        self.stop()
+        self.task = asyncio.get_running_loop().create_task(self.sample_process_tree(pid))
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def sample_process_tree(self, pid):
+        import asyncio
+        try:
+            import psutil
+        except ImportError:
+            return
+        try:
+            process = psutil.Process(pid)
+            while True:
+                rss = 0
+                for member in [process] + process.children(recursive=True):
+                    try:
+                        rss += member.memory_info().rss
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        pass
+                rss_mb = rss / (1024 * 1024)
+                self.item["process_peak_mb"] = round(max(self.item.get("process_peak_mb") or 0, rss_mb), 1)
+                self.update_peak(rss_mb)
+                await asyncio.sleep(self.interval)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
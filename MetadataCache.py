@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+from threading import Lock
+
+def user_config_dir(app_name="BlenderQueue"):
+    """Directorio de configuración del usuario según el sistema operativo."""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, app_name)
+
+class MetadataCache:
+    """
+    Caché en disco (SQLite) de los metadatos de escena de cada .blend.
+
+    Una entrada es válida mientras el archivo conserve el mismo tamaño y mtime. Con
+    use_content_hash, un archivo que solo cambió de mtime (por ejemplo al copiarlo)
+    se da por válido si su hash SHA-1 coincide. Cuando hay más de max_entries se
+    borran las entradas usadas hace más tiempo.
+    """
+
+    def __init__(self, db_path=None, max_entries=5000, use_content_hash=False):
+        if db_path is None:
+            db_path = os.path.join(user_config_dir(), "metadata_cache.sqlite")
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.use_content_hash = use_content_hash
+        self.lock = Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS blend_metadata ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " content_hash TEXT,"
+            " metadata TEXT NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS blend_metadata_access ON blend_metadata (last_access)")
+        self.connection.commit()
+
+    def file_hash(self, path):
+        sha1 = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha1.update(block)
+        return sha1.hexdigest()
+
+    def get(self, path):
+        """Devuelve los metadatos guardados para path, o None si no hay o el archivo cambió."""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT size, mtime_ns, content_hash, metadata FROM blend_metadata WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        size, mtime_ns, content_hash, metadata = row
+        if size != stat.st_size:
+            return None
+        if mtime_ns != stat.st_mtime_ns:
+            if not (self.use_content_hash and content_hash and content_hash == self.file_hash(path)):
+                return None
+
+        with self.lock:
+            self.connection.execute(
+                "UPDATE blend_metadata SET mtime_ns = ?, last_access = ? WHERE path = ?",
+                (stat.st_mtime_ns, time.time(), path),
+            )
+            self.connection.commit()
+        return json.loads(metadata)
+
+    def put(self, path, metadata):
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        content_hash = self.file_hash(path) if self.use_content_hash else None
+
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO blend_metadata (path, size, mtime_ns, content_hash, metadata, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, content_hash, json.dumps(metadata), time.time()),
+            )
+            self.evict()
+            self.connection.commit()
+
+    def evict(self):
+        # Se llama con self.lock tomado
+        count = self.connection.execute("SELECT COUNT(*) FROM blend_metadata").fetchone()[0]
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM blend_metadata WHERE path IN"
+                " (SELECT path FROM blend_metadata ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
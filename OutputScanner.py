@@ -0,0 +1,78 @@
+import os
+import re
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".exr")
+
+# Firma inicial (y final, si el formato tiene una) de cada tipo de imagen
+IMAGE_SIGNATURES = {
+    ".png": (b"\x89PNG\r\n\x1a\n", b"IEND\xaeB`\x82"),
+    ".jpg": (b"\xff\xd8", b"\xff\xd9"),
+    ".jpeg": (b"\xff\xd8", b"\xff\xd9"),
+    ".tif": ((b"II*\x00", b"MM\x00*"), None),
+    ".tiff": ((b"II*\x00", b"MM\x00*"), None),
+    ".bmp": (b"BM", None),
+    ".exr": (b"v/1\x01", None),
+}
+
+def is_complete_image(path, size):
+    """Comprueba la cabecera y el final del archivo para descartar frames cortados a medias."""
+    extension = os.path.splitext(path)[1].lower()
+    header, trailer = IMAGE_SIGNATURES.get(extension, (None, None))
+    try:
+        with open(path, "rb") as f:
+            start = f.read(8)
+            if trailer is not None:
+                f.seek(max(0, size - len(trailer) - 2))
+                end = f.read()
+    except OSError:
+        return False
+
+    if header is not None and not start.startswith(header):
+        return False
+    if trailer is not None and trailer not in end:
+        return False
+    return True
+
+def find_rendered_frames(output_path, check="size"):
+    """
+    Frames que ya existen para la ruta base que usa script_blender.py, que guarda cada
+    frame como <output_path>/<basename(output_path)>_<frame:04>.<ext>.
+
+    check puede ser "exists" (basta con que el archivo exista), "size" (además no puede
+    estar vacío) o "header" (además la cabecera y el final de la imagen deben ser válidos).
+    """
+    frame_dir = output_path or "."
+    base_name = os.path.basename(output_path)
+    pattern = re.compile(rf"^{re.escape(base_name)}_(\d+)(\.\w+)$")
+
+    frames = set()
+    try:
+        entries = list(os.scandir(frame_dir))
+    except OSError:
+        return frames
+
+    for entry in entries:
+        match = pattern.match(entry.name)
+        if not match or match.group(2).lower() not in IMAGE_EXTENSIONS:
+            continue
+        if check != "exists":
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            if size == 0:
+                continue
+            if check == "header" and not is_complete_image(entry.path, size):
+                continue
+        frames.add(int(match.group(1)))
+    return frames
+
+def frames_to_spec(frames):
+    """Convierte una lista ordenada de frames en rangos compactos, por ejemplo '1-10,15,20-30'."""
+    ranges = []
+    for frame in frames:
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+    return ",".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
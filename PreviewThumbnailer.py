@@ -0,0 +1,113 @@
+import os
+from collections import OrderedDict
+from threading import Thread, Condition
+
+PREVIEW_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff")
+
+def find_latest_preview(output_path):
+    """Última imagen de la carpeta previews de la salida, o None. Una sola pasada con scandir."""
+    latest = None
+    latest_mtime = -1
+    try:
+        entries = os.scandir(os.path.join(output_path, "previews"))
+    except OSError:
+        return None
+    with entries:
+        for entry in entries:
+            if not entry.name.lower().endswith(PREVIEW_EXTENSIONS):
+                continue
+            try:
+                mtime = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            if mtime > latest_mtime and entry.is_file():
+                latest, latest_mtime = entry.path, mtime
+    return latest
+
+class PreviewThumbnailer:
+    """
+    Prepara las miniaturas de la previsualización en un hilo propio, para que abrir y
+    reducir un EXR o un PNG de 4K no congele la interfaz.
+
+    request() solo guarda la última petición: si llega otra antes de que el hilo la
+    atienda, la anterior se descarta, y si una miniatura termina cuando ya se pidió un
+    frame más nuevo no se entrega. Las miniaturas se guardan en una caché LRU por
+    (ruta, mtime), de modo que volver a una imagen que no cambió no la decodifica otra vez.
+
+    on_ready(ruta, imagen, error) se llama desde el hilo del thumbnailer con una imagen
+    de PIL ya reducida (o None); quien la reciba debe pasarla al hilo de Tk, que solo
+    tiene que crear el PhotoImage.
+    """
+
+    def __init__(self, on_ready, size=(200, 200), cache_size=32):
+        self.on_ready = on_ready
+        self.size = size
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.condition = Condition()
+        self.pending = None  # (ruta de la imagen o None, carpeta de salida)
+        self.generation = 0
+        self.shown_key = None
+        self.thread = None
+
+    def request(self, image_path=None, output_path=None):
+        """Pide la miniatura de image_path o, si no se conoce, la de la última previsualización de output_path."""
+        with self.condition:
+            self.pending = (image_path, output_path)
+            self.generation += 1
+            if self.thread is None:
+                self.thread = Thread(target=self.run, name="PreviewThumbnailer", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                image_path, output_path = self.pending
+                self.pending = None
+                generation = self.generation
+
+            if image_path is None and output_path:
+                image_path = find_latest_preview(output_path)
+            if image_path is None:
+                continue
+            try:
+                key = (image_path, os.stat(image_path).st_mtime_ns)
+            except OSError:
+                continue
+            if key == self.shown_key:
+                continue  # La interfaz ya muestra esta imagen
+
+            image, error = self.thumbnail(image_path, key)
+            with self.condition:
+                if generation != self.generation:
+                    continue  # Ya se pidió un frame más nuevo
+            self.shown_key = key
+            self.on_ready(image_path, image, error)
+
+    def thumbnail(self, image_path, key):
+        """Devuelve (imagen reducida, None) o (None, mensaje de error)."""
+        image = self.cache.get(key)
+        if image is not None:
+            self.cache.move_to_end(key)
+            return image, None
+        if image_path.lower().endswith(".mp4"):
+            return None, None
+        try:
+            from PIL import Image
+        except ImportError:
+            return None, "Pillow is not installed"
+        try:
+            with Image.open(image_path) as source:
+                # Los JPEG se decodifican directamente a menor resolución
+                source.draft("RGB", self.size)
+                source.thumbnail(self.size)
+                image = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+        except Exception as e:
+            return None, str(e)
+        self.cache[key] = image
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return image, None
@@ -0,0 +1,122 @@
+"""
+Formato compacto de la cola para colas muy grandes: un JSON por línea (sin sangría),
+opcionalmente comprimido con gzip (.rqueue.gz) o zstd (.rqueue.zst, paquete 'zstandard').
+
+    {"format": "render-queue", "version": 1, "settings": {...}}   cabecera
+    {"s": "/proyectos/escena.blend"}                            siguiente cadena de la tabla
+    {"q": {"file": 0, "selected_camera": 1, ...}}               trabajo de la cola
+    {"l": {...}}                                                 archivo cargado
+
+Los valores de INTERNED_FIELDS y la lista de cámaras se guardan como índices de la
+tabla, que se va definiendo antes de su primer uso; así se puede leer en streaming y
+la interfaz muestra los primeros trabajos antes de terminar de leer el archivo.
+"""
+import io
+import json
+import gzip
+from BlendFileReader import GZIP_MAGIC, ZSTD_MAGIC
+
+FORMAT_NAME = "render-queue"
+FORMAT_VERSION = 1
+QUEUE_EXTENSIONS = (".rqueue", ".rqueue.gz", ".rqueue.zst")
+
+# Campos que se repiten entre trabajos y se guardan una sola vez en la tabla de cadenas
+INTERNED_FIELDS = (
+    "file", "selected_camera", "output_path", "output_format", "file_prefix", "output_file_name",
+    "format", "resolution", "render_engine", "render_threads", "status",
+)
+# Datos de la sesión que no tiene sentido guardar
+VOLATILE_FIELDS = ("eta", "current_frame", "last_preview")
+STORES = {"l": "loaded_files", "q": "queue"}
+
+def is_queue_file(path):
+    return path.lower().endswith(QUEUE_EXTENSIONS)
+
+def open_text(path, mode):
+    """Abre el archivo como texto, comprimiendo o descomprimiendo según la extensión o la firma."""
+    if mode == "w":
+        if path.lower().endswith(".gz"):
+            return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        if path.lower().endswith(".zst"):
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("zstd compressed queue files need the 'zstandard' package")
+            raw = zstandard.ZstdCompressor(level=6).stream_writer(open(path, "wb"), closefd=True)
+            return io.TextIOWrapper(raw, encoding="utf-8")
+        return open(path, "w", encoding="utf-8")
+
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if magic == ZSTD_MAGIC:
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compressed queue files need the 'zstandard' package")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def write_queue_file(path, settings, stores):
+    """
+    Escribe la cola en el formato compacto. stores es [(nombre, trabajos)] con
+    "loaded_files" y/o "queue". Los trabajos se escriben uno a uno, sin armar el documento.
+    """
+    table = {}
+    tags = {name: tag for tag, name in STORES.items()}
+    dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+    with open_text(path, "w") as f:
+        def intern(value):
+            # Las cadenas se buscan tal cual; el resto por su JSON, para no confundir 1 con True
+            key = value if type(value) is str else (dumps(value),)
+            index = table.get(key)
+            if index is None:
+                index = table[key] = len(table)
+                f.write('{"s":' + dumps(value) + "}\n")
+            return index
+
+        f.write(dumps({"format": FORMAT_NAME, "version": FORMAT_VERSION, "settings": settings}) + "\n")
+        for name, jobs in stores:
+            tag = tags[name]
+            for job in jobs:
+                record = {}
+                for field, value in job.items():
+                    if field in VOLATILE_FIELDS:
+                        continue
+                    if field in INTERNED_FIELDS:
+                        value = intern(value)
+                    elif field == "cameras" and isinstance(value, list):
+                        value = [intern(camera) for camera in value]
+                    record[field] = value
+                f.write('{"' + tag + '":' + dumps(record) + "}\n")
+
+def iter_queue_file(path):
+    """
+    Lee el formato compacto en streaming. Primero devuelve ("settings", ajustes) y
+    después ("loaded_files" o "queue", trabajo) por cada trabajo, en el orden del archivo.
+    Lanza ValueError si el archivo no es una cola en este formato.
+    """
+    table = []
+    with open_text(path, "r") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != FORMAT_NAME:
+            raise ValueError(f"{path} is not a render queue file")
+        if header.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(f"{path} was written by a newer version (format {header['version']})")
+        yield "settings", header.get("settings", {})
+
+        for line in f:
+            record = json.loads(line)
+            if "s" in record:
+                table.append(record["s"])
+                continue
+            for tag, job in record.items():
+                for field in INTERNED_FIELDS:
+                    if field in job:
+                        job[field] = table[job[field]]
+                if isinstance(job.get("cameras"), list):
+                    job["cameras"] = [table[index] for index in job["cameras"]]
+                yield STORES[tag], job
@@ -0,0 +1,188 @@
+import os
+import json
+import sqlite3
+import contextlib
+from threading import Lock
+from MetadataCache import user_config_dir
+
+# JSON compacto para los datos de los trabajos (una fila por trabajo)
+dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+# Campos que cambian lo que se renderiza: si cambia alguno, los frames hechos ya no valen
+RENDER_FIELDS = (
+    "file", "start_frame", "end_frame", "output_path", "output_file_name", "file_prefix",
+    "selected_camera", "format", "resolution", "render_engine",
+)
+
+class QueueJournal:
+    """
+    Diario en disco (SQLite en modo WAL) del estado de la cola, para que un cierre
+    inesperado de la interfaz no pierda la cola ni el trabajo hecho.
+
+    Cada cambio de los JobStore del modelo (añadir, quitar, actualizar, cambiar de estado,
+    ordenar) se escribe al momento, y cada frame terminado se apunta en la tabla frames.
+    Al arrancar, load() devuelve el mismo formato que RenderQueueModel.to_dict y
+    completed_frames() los frames que no hay que volver a renderizar.
+
+    Los trabajos del render en curso se marcan con in_run: si al arrancar siguen
+    marcados, la aplicación se cerró a mitad de render y hay que continuarlos.
+    Con synchronous=NORMAL cada escritura sobrevive a un cierre del programa; tras un
+    corte de luz se pueden perder las últimas transacciones, pero no se corrompe.
+    """
+
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = os.path.join(user_config_dir(), "queue_journal.sqlite")
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.lock = Lock()
+        self.batch_depth = 0
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " store TEXT NOT NULL,"
+            " position INTEGER NOT NULL,"
+            " status TEXT,"
+            " in_run INTEGER NOT NULL DEFAULT 0,"
+            " data TEXT NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS frames ("
+            " job_id TEXT NOT NULL,"
+            " frame INTEGER NOT NULL,"
+            " PRIMARY KEY (job_id, frame)) WITHOUT ROWID"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Versiones anteriores copiaban aquí los destinos de las alertas, con sus contraseñas
+        self.connection.execute("DELETE FROM settings WHERE key = 'alerts'")
+        self.connection.commit()
+        self.next_position = self.connection.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM jobs").fetchone()[0]
+
+    def load(self):
+        """Estado guardado en el formato de RenderQueueModel.to_dict, o None si el diario está vacío."""
+        with self.lock:
+            rows = self.connection.execute("SELECT store, data FROM jobs ORDER BY position").fetchall()
+            settings = self.connection.execute("SELECT key, value FROM settings").fetchall()
+        if not rows and not settings:
+            return None
+        state = {key: json.loads(value) for key, value in settings}
+        state["loaded_files"] = [json.loads(data) for store, data in rows if store == "loaded_files"]
+        state["queue"] = [json.loads(data) for store, data in rows if store == "queue"]
+        return state
+
+    def interrupted_jobs(self):
+        """Ids de los trabajos que estaban en un render que no terminó."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id FROM jobs WHERE in_run = 1 AND store = 'queue' AND status != 'done' ORDER BY position"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def completed_frames(self, job_id):
+        with self.lock:
+            rows = self.connection.execute("SELECT frame FROM frames WHERE job_id = ?", (job_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def replace(self, state):
+        """Sustituye todo el diario por un estado completo (por ejemplo al cargar una configuración)."""
+        with self.lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM jobs")
+                self.connection.execute("DELETE FROM frames")
+                self.connection.execute("DELETE FROM settings")
+                self.next_position = 1
+                for store in ("loaded_files", "queue"):
+                    for job in state.get(store, []):
+                        self._write_job(store, job)
+                self._write_settings(state)
+
+    def save_settings(self, settings):
+        with self.lock:
+            with self.connection:
+                self._write_settings(settings)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Junta en una sola transacción los cambios que record() reciba dentro del with (por
+        ejemplo al cargar miles de trabajos seguidos), en lugar de una por trabajo.
+        """
+        with self.lock:
+            self.batch_depth += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.batch_depth -= 1
+                if self.batch_depth == 0:
+                    self.connection.commit()
+
+    def record(self, store, job_store, action, job=None, fields=None):
+        """Listener de JobStore: escribe en el diario el cambio que se acaba de hacer en memoria."""
+        with self.lock:
+            # Dentro de batch() el commit se hace al salir del with
+            with self.connection if not self.batch_depth else contextlib.nullcontext():
+                if action == "add":
+                    self._write_job(store, job)
+                elif action == "update":
+                    self.connection.execute(
+                        "UPDATE jobs SET status = ?, data = ? WHERE id = ?",
+                        (job.get("status"), dumps(job), job["id"]),
+                    )
+                    # Un trabajo terminado o con otros ajustes de render empieza de cero la próxima vez
+                    if job.get("status") == "done" or any(field in fields for field in RENDER_FIELDS):
+                        self.connection.execute("DELETE FROM frames WHERE job_id = ?", (job["id"],))
+                elif action == "remove":
+                    self.connection.execute("DELETE FROM jobs WHERE id = ?", (job["id"],))
+                    self.connection.execute("DELETE FROM frames WHERE job_id = ?", (job["id"],))
+                elif action == "clear":
+                    self.connection.execute("DELETE FROM frames WHERE job_id IN (SELECT id FROM jobs WHERE store = ?)", (store,))
+                    self.connection.execute("DELETE FROM jobs WHERE store = ?", (store,))
+                elif action == "sort":
+                    for job_id in job_store.ids():
+                        self.connection.execute("UPDATE jobs SET position = ? WHERE id = ?", (self.next_position, job_id))
+                        self.next_position += 1
+
+    def start_run(self, jobs):
+        with self.lock:
+            with self.connection:
+                self.connection.executemany(
+                    "UPDATE jobs SET in_run = 1, status = ?, data = ? WHERE id = ?",
+                    [(job.get("status"), dumps(job), job["id"]) for job in jobs],
+                )
+
+    def finish_run(self):
+        with self.lock:
+            with self.connection:
+                self.connection.execute("UPDATE jobs SET in_run = 0 WHERE in_run = 1")
+
+    def frames_done(self, job_id, frames):
+        with self.lock:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO frames (job_id, frame) VALUES (?, ?)",
+                    [(job_id, int(frame)) for frame in frames],
+                )
+
+    def _write_job(self, store, job):
+        # Se llama con self.lock tomado y dentro de una transacción
+        self.connection.execute(
+            "INSERT INTO jobs (id, store, position, status, data) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (id) DO UPDATE SET store = excluded.store, position = excluded.position,"
+            " status = excluded.status, data = excluded.data",
+            (job["id"], store, self.next_position, job.get("status"), dumps(job)),
+        )
+        self.next_position += 1
+
+    def _write_settings(self, settings):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in settings.items() if key not in ("loaded_files", "queue")],
+        )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
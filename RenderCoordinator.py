@@ -0,0 +1,176 @@
+import json
+import time
+import asyncio
+from itertools import count
+
+# Resultado interno de un chunk cuyo worker se desconectó o dejó de enviar latidos
+WORKER_LOST = object()
+
+class RemoteWorker:
+    """Agente de render conectado al coordinador (render_agent.py en otra máquina)."""
+
+    def __init__(self, reader, writer, name, slots):
+        self.reader = reader
+        self.writer = writer
+        self.name = name
+        self.slots = max(1, int(slots))
+        self.running = {}  # id del chunk -> RemoteChunk
+        self.last_seen = time.monotonic()
+        self.alive = True
+
+    def free_slots(self):
+        return self.slots - len(self.running) if self.alive else 0
+
+    async def send(self, message):
+        self.writer.write((json.dumps(message) + "\n").encode("utf-8"))
+        await self.writer.drain()
+
+class RemoteChunk:
+    def __init__(self, chunk_id, on_line, future):
+        self.chunk_id = chunk_id
+        self.on_line = on_line
+        self.future = future
+
+class RenderCoordinator:
+    """
+    Reparte los chunks de la cola entre agentes de render de otras máquinas.
+
+    El coordinador escucha por TCP (un JSON por línea). Cada agente se presenta con
+    {"type": "hello", "name", "slots"}, envía {"type": "heartbeat"} cada pocos segundos
+    y recibe {"type": "render", "chunk", "job_id", "job"} con los mismos argumentos que
+    build_render_job. El agente ejecuta Blender en su máquina y devuelve las líneas de
+    eventos y "Fra:" ({"type": "line"}) y el resultado ({"type": "done"}).
+
+    run_chunk() se usa en lugar de lanzar Blender en local: espera un hueco libre en
+    algún agente y devuelve (returncode, stderr) como un proceso normal. Si el agente se
+    desconecta o pasa heartbeat_timeout segundos sin dar señales, sus chunks se vuelven
+    a enviar a otro agente (hasta max_attempts veces).
+
+    Los .blend y las carpetas de salida tienen que estar en las mismas rutas en todas las
+    máquinas (por ejemplo, un almacenamiento compartido). Vive en el bucle del RenderSupervisor.
+    """
+
+    def __init__(self, host="0.0.0.0", port=8765, heartbeat_timeout=15.0, max_attempts=3):
+        self.host = host
+        self.port = port
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.server = None
+        self.monitor_task = None
+        self.workers = []
+        self.chunk_ids = count(1)
+        self.slots_changed = None
+
+    async def start(self):
+        self.slots_changed = asyncio.Condition()
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.monitor_task = asyncio.ensure_future(self._watch_heartbeats())
+        print(f"Render coordinator listening on {self.host}:{self.port}")
+
+    async def run_chunk(self, job, on_line, job_id):
+        """Renderiza job en un agente remoto. Devuelve (returncode, stderr)."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.max_attempts + 1):
+            worker = await self._acquire_worker()
+            chunk = RemoteChunk(next(self.chunk_ids), on_line, loop.create_future())
+            worker.running[chunk.chunk_id] = chunk
+            try:
+                print(f"Sending {job['blend_file']} (frames {job['start_frame']}-{job['end_frame']}) to worker {worker.name}")
+                await worker.send({"type": "render", "chunk": chunk.chunk_id, "job_id": job_id, "job": job})
+                result = await chunk.future
+            except OSError:
+                await self._drop_worker(worker, "connection error")
+                result = WORKER_LOST
+            except asyncio.CancelledError:
+                if worker.alive:
+                    try:
+                        await worker.send({"type": "cancel", "chunk": chunk.chunk_id})
+                    except OSError:
+                        pass
+                raise
+            finally:
+                worker.running.pop(chunk.chunk_id, None)
+                await self._notify_slots()
+            if result is not WORKER_LOST:
+                return result
+            print(f"Worker {worker.name} was lost, reassigning {job['blend_file']} (attempt {attempt}/{self.max_attempts})")
+        return 1, f"Chunk was lost on {self.max_attempts} workers"
+
+    async def _acquire_worker(self):
+        async with self.slots_changed:
+            while True:
+                workers = [worker for worker in self.workers if worker.free_slots() > 0]
+                if workers:
+                    # El agente con más huecos libres, para repartir la carga
+                    return max(workers, key=lambda worker: worker.free_slots())
+                await self.slots_changed.wait()
+
+    async def _notify_slots(self):
+        async with self.slots_changed:
+            self.slots_changed.notify_all()
+
+    async def _handle_connection(self, reader, writer):
+        worker = None
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+            if hello.get("type") != "hello":
+                return
+            peer = writer.get_extra_info("peername")
+            worker = RemoteWorker(reader, writer, hello.get("name") or f"{peer[0]}:{peer[1]}", hello.get("slots", 1))
+            self.workers.append(worker)
+            print(f"Worker {worker.name} connected with {worker.slots} slot(s)")
+            await self._notify_slots()
+            while worker.alive:
+                line = await reader.readline()
+                if not line:
+                    break
+                worker.last_seen = time.monotonic()
+                self._handle_message(worker, json.loads(line))
+        except (OSError, ValueError):
+            pass
+        finally:
+            if worker is not None:
+                await self._drop_worker(worker, "disconnected")
+            else:
+                writer.close()
+
+    def _handle_message(self, worker, message):
+        chunk = worker.running.get(message.get("chunk"))
+        if message.get("type") == "line" and chunk is not None:
+            chunk.on_line(message.get("line", ""))
+        elif message.get("type") == "done" and chunk is not None and not chunk.future.done():
+            chunk.future.set_result((message.get("returncode", 1), message.get("stderr", "")))
+
+    async def _drop_worker(self, worker, reason):
+        if not worker.alive:
+            return
+        worker.alive = False
+        print(f"Worker {worker.name} {reason}")
+        if worker in self.workers:
+            self.workers.remove(worker)
+        for chunk in list(worker.running.values()):
+            if not chunk.future.done():
+                chunk.future.set_result(WORKER_LOST)
+        worker.writer.close()
+        await self._notify_slots()
+
+    async def _watch_heartbeats(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_timeout / 3)
+            now = time.monotonic()
+            for worker in list(self.workers):
+                if now - worker.last_seen > self.heartbeat_timeout:
+                    await self._drop_worker(worker, f"missed heartbeats for {self.heartbeat_timeout:.0f}s")
+
+    async def close(self):
+        if self.monitor_task is not None:
+            self.monitor_task.cancel()
+        for worker in list(self.workers):
+            try:
+                await worker.send({"type": "quit"})
+            except OSError:
+                pass
+            await self._drop_worker(worker, "released")
+        if self.server is not None:
+            self.server.close()
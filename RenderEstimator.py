@@ -0,0 +1,91 @@
+from RenderScheduler import estimate_frame_cost
+
+def format_duration(seconds):
+    """Duración en H:MM:SS para la interfaz; cadena vacía si no hay estimación."""
+    if seconds is None:
+        return ""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+class RenderEstimator:
+    """
+    Tiempo restante y ritmo de render a partir de los tiempos por frame que envía
+    script_blender.py en cada evento frame_done.
+
+    Por trabajo guarda una media móvil de segundos por frame (item["avg_frame_time"],
+    que también usa el planificador como coste) y los frames que le faltan; por worker,
+    una media móvil de frames por segundo. Mientras un trabajo no tiene ningún frame
+    medido se usa la estimación por motor y resolución de RenderScheduler.
+
+    El tiempo restante de la cola es el trabajo pendiente de todos los items repartido
+    entre los workers; se mantiene como un total para no recorrer la cola en cada frame.
+    Solo se usa desde el bucle del supervisor, no necesita lock.
+    """
+
+    def __init__(self, workers=1, smoothing=0.2):
+        self.workers = max(1, int(workers))
+        self.smoothing = smoothing
+        self.jobs = {}  # id del trabajo -> {"item", "frames_left"}
+        self.worker_fps = {}
+        self.remaining_seconds = 0.0
+
+    def add_job(self, item, frames_left):
+        item["eta"] = 0.0
+        self.jobs[item["id"]] = {"item": item, "frames_left": frames_left}
+        self.refresh(item["id"])
+
+    def average(self, previous, value):
+        if previous is None:
+            return value
+        return previous * (1 - self.smoothing) + value * self.smoothing
+
+    def record_frame(self, job_id, worker, seconds):
+        """Registra lo que tardó un frame del trabajo en el worker indicado."""
+        job = self.jobs.get(job_id)
+        if job is None or seconds is None or seconds <= 0:
+            return
+        item = job["item"]
+        item["avg_frame_time"] = self.average(item.get("avg_frame_time"), float(seconds))
+        self.worker_fps[worker] = self.average(self.worker_fps.get(worker), 1.0 / float(seconds))
+        self.refresh(job_id)
+
+    def update_job(self, job_id, frames_left):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        job["frames_left"] = max(0, frames_left)
+        return self.refresh(job_id)
+
+    def refresh(self, job_id):
+        """Recalcula el tiempo restante del trabajo (item["eta"]) y el total de la cola."""
+        item = self.jobs[job_id]["item"]
+        eta = self.jobs[job_id]["frames_left"] * estimate_frame_cost(item)
+        self.remaining_seconds += eta - item["eta"]
+        item["eta"] = eta
+        return eta
+
+    def job_eta(self, job_id):
+        return self.jobs[job_id]["item"]["eta"]
+
+    def queue_eta(self):
+        return max(0.0, self.remaining_seconds) / self.workers
+
+    def worker_done(self, worker):
+        """El worker ya no renderiza: deja de contar en el ritmo total."""
+        self.worker_fps.pop(worker, None)
+
+    def throughput(self):
+        """Frames por segundo de todos los workers juntos."""
+        return sum(self.worker_fps.values())
+
+    def snapshot(self, job_id=None):
+        """Datos del evento eta_update que se publica en el bus."""
+        data = {
+            "queue_eta": self.queue_eta(),
+            "fps": self.throughput(),
+            "worker_fps": dict(self.worker_fps),
+        }
+        if job_id is not None and job_id in self.jobs:
+            data["job_id"] = job_id
+            data["eta"] = self.job_eta(job_id)
+        return data
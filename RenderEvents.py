@@ -0,0 +1,86 @@
+import json
+
+EVENT_PREFIX = "RENDER_EVENT "
+
+class RenderEventServer:
+    """
+    Servidor TCP local por el que script_blender.py envía sus eventos (un JSON por línea):
+    frame_start, frame_done (con tiempo y pico de memoria), preview y error.
+
+    Corre en el bucle de asyncio del RenderSupervisor. Cada evento lleva el id del trabajo
+    que lo generó y se entrega al manejador que se registró para ese id; los eventos de
+    trabajos sin manejador se descartan.
+
+    asyncio se importa en start(): importar este módulo solo por EVENT_PREFIX es barato.
+    """
+
+    def __init__(self, host="127.0.0.1"):
+        self.host = host
+        self.port = None
+        self.server = None
+        self.handlers = {}
+
+    async def start(self):
+        import asyncio
+        self.server = await asyncio.start_server(self._handle_connection, self.host, 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def environment(self, job_id=""):
+        """Variables de entorno que necesita script_blender.py para conectarse."""
+        env = {"RENDER_QUEUE_EVENTS": self.address}
+        if job_id:
+            env["RENDER_QUEUE_JOB"] = job_id
+        return env
+
+    def register(self, job_id, handler):
+        self.handlers[job_id] = handler
+
+    def unregister(self, job_id):
+        self.handlers.pop(job_id, None)
+
+    def dispatch(self, event):
+        handler = self.handlers.get(event.get("job", ""))
+        if handler is not None:
+            handler(event)
+
+    def parse_line(self, line):
+        """Devuelve el evento de una línea JSON, o None si no es un evento válido."""
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(event, dict) or "event" not in event:
+            return None
+        return event
+
+    def dispatch_line(self, line):
+        event = self.parse_line(line)
+        if event is not None:
+            self.dispatch(event)
+
+    async def _handle_connection(self, reader, writer):
+        jobs_seen = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                event = self.parse_line(line.decode("utf-8", errors="replace"))
+                if event is not None:
+                    jobs_seen.add(event.get("job", ""))
+                    self.dispatch(event)
+        except (OSError, ValueError):
+            pass
+        finally:
+            writer.close()
+        # Avisar de que ya no llegarán más eventos de estos trabajos
+        for job_id in jobs_seen:
+            self.dispatch({"event": "channel_closed", "job": job_id})
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
@@ -1,10 +1,23 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import re
-import json
-import psutil  # Importar psutil
-import datetime
-import os
+from RenderScheduler import parse_deadline
+from QueueFile import is_queue_file
+from PreviewThumbnailer import PreviewThumbnailer
+
+# Opciones del desplegable "Scheduling" -> (política, reparto del modo fair)
+SCHEDULE_POLICIES = {
+    "FIFO": ("fifo", "file"),
+    "Shortest Job First": ("sjf", "file"),
+    "Fair Share (File)": ("fair", "file"),
+    "Fair Share (Project)": ("fair", "project"),
+}
+
+# Save/Load Config: el formato compacto para colas grandes y el JSON de siempre
+CONFIG_FILETYPES = [
+    ("Render queue", "*.rqueue *.rqueue.gz *.rqueue.zst"),
+    ("JSON files", "*.json"),
+]
 
 class RenderQueueController:
     def __init__(self, model, view):
@@ -12,29 +25,40 @@ class RenderQueueController:
         self.view = view
         self.model.add_observer(self)
         self.is_monitoring = False # Bandera para indicar si se esta monitoreando o no.
+        # Las previsualizaciones se abren y se reducen fuera del hilo de Tk
+        self.thumbnailer = PreviewThumbnailer(self.thumbnail_ready)
     def add_file_dialog(self):
         file_paths = filedialog.askopenfilenames(filetypes=[("Blender Files", "*.blend")])
         if file_paths:
+            try:
+                # Todos los archivos se leen en una sola sesión de Blender
+                metadata = self.model.probe_blend_files(list(file_paths))
+            except Exception as e:
+                messagebox.showerror("Error", f"An error occurred while retrieving cameras: {e}")
+                return
             for file_path in file_paths:
-                cameras = self.model.get_cameras_from_blend(file_path)
+                file_metadata = metadata.get(file_path, {})
+                cameras = file_metadata.get("cameras")
                 if cameras:
-                    self.model.add_file(file_path, cameras)
+                    self.model.add_file(file_path, cameras, file_metadata)
+                elif "error" in file_metadata:
+                    messagebox.showerror("Error", f"Could not read {file_path}\n{file_metadata['error']}")
                 else:
                     messagebox.showerror("Error", f"No cameras found in {file_path}")
 
-    def remove_file(self, index):
-        self.model.remove_file(index)
+    def remove_file(self, job_id):
+        self.model.remove_file(job_id)
 
-    def add_to_queue(self, index):
+    def add_to_queue(self, job_id):
         settings = self.get_settings()
         if self.validate_settings(settings):  # Validar configuraciones antes de agregar a la cola
-            self.model.add_to_queue(index, settings)
+            self.model.add_to_queue(job_id, settings)
 
-    def remove_from_queue(self, index):
-        self.model.remove_from_queue(index)
+    def remove_from_queue(self, job_id):
+        self.model.remove_from_queue(job_id)
 
-    def update_file_settings(self, index, settings):
-        self.model.update_file_settings(index, settings)
+    def update_file_settings(self, job_id, settings):
+        self.model.update_file_settings(job_id, settings)
 
     def get_settings(self):
         return {
@@ -52,6 +76,8 @@ class RenderQueueController:
             "suspend_after_render": self.view.settings_frame.suspend_var.get(), # <--- Acceder a través de settings_frame
             "output_file_name": self.view.settings_frame.output_file_name_var.get(), # <--- Acceder a través de settings_frame
             "use_custom_alerts": self.view.settings_frame.use_custom_alerts_var.get(), # <--- Acceder a través de settings_frame
+            "priority": self.view.settings_frame.priority_var.get(),
+            "deadline": self.view.settings_frame.deadline_var.get().strip(),
         }
 
     def validate_settings(self, settings):
@@ -87,13 +113,49 @@ class RenderQueueController:
              messagebox.showerror("Error", "Invalid output format. Check if all variables are correctly used")
              return False
 
+        try:
+            parse_deadline(settings["deadline"])
+        except ValueError:
+            messagebox.showerror("Error", "Invalid deadline. Please use format like '2025-01-31 18:00' or leave it empty.")
+            return False
+
         return True
 
-    def start_render(self, selected_queue, progress_bar): # <--- Añadir progress_bar como parámetro
+    def start_render(self, selected_queue):
         print("Controller start_render called")
-        for item in selected_queue:
-            item["output_path"] = self.process_output_format(item["output_path"], item["output_format"], item.get("output_file_name",""))
-        self.model.start_render(selected_queue, progress_bar) # <--- Pasa la barra de progreso al modelo
+        try:
+            max_workers = int(self.view.settings_frame.max_workers_var.get())
+        except (tk.TclError, ValueError):
+            max_workers = 0
+        if max_workers < 1:
+            messagebox.showerror("Error", "Invalid number of parallel workers, must be a positive integer")
+            return
+        try:
+            chunk_size = int(self.view.settings_frame.chunk_size_var.get())
+        except (tk.TclError, ValueError):
+            chunk_size = -1
+        if chunk_size < 0:
+            messagebox.showerror("Error", "Invalid chunk size, must be 0 (no chunks) or a positive number of frames")
+            return
+        try:
+            min_free_memory_mb = int(self.view.settings_frame.min_free_memory_var.get())
+            max_cpu_percent = int(self.view.settings_frame.max_cpu_percent_var.get())
+        except (tk.TclError, ValueError):
+            min_free_memory_mb = max_cpu_percent = -1
+        if min_free_memory_mb < 0 or not 1 <= max_cpu_percent <= 100:
+            messagebox.showerror("Error", "Invalid resource limits: free RAM must be 0 or more MB and CPU load between 1 and 100%")
+            return
+        self.model.max_workers = max_workers
+        self.model.chunk_size = chunk_size
+        self.model.min_free_memory_mb = min_free_memory_mb
+        self.model.max_cpu_percent = max_cpu_percent
+        self.model.use_daemon = self.view.settings_frame.use_daemon_var.get()
+        self.model.resume_renders = self.view.settings_frame.resume_renders_var.get()
+        self.model.use_custom_alerts = self.view.settings_frame.use_custom_alerts_var.get()
+        self.model.schedule_policy, self.model.fair_share_key = SCHEDULE_POLICIES.get(
+            self.view.settings_frame.schedule_policy_var.get(), ("fifo", "file"))
+        self.model.resolve_output_paths(selected_queue)
+        self.model.start_render(selected_queue)
         self.start_monitoring()
 
     def stop_render(self):
@@ -102,31 +164,89 @@ class RenderQueueController:
         self.stop_monitoring()  # Detener el monitoreo al detener el render
         
     def save_config(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".rqueue.gz", filetypes=CONFIG_FILETYPES)
         if file_path:
-            config_data = self.model.to_dict()
             try:
-                 with open(file_path, "w") as f:
-                    json.dump(config_data, f, indent=4)
-                 messagebox.showinfo("Config Saved", "Configuration saved successfully.")
+                if is_queue_file(file_path):
+                    # Formato compacto: se escribe trabajo a trabajo, sin armar todo el documento
+                    self.model.save_queue_file(file_path)
+                else:
+                    import json
+                    with open(file_path, "w") as f:
+                        json.dump(self.model.to_dict(), f, indent=4)
+                messagebox.showinfo("Config Saved", "Configuration saved successfully.")
             except Exception as e:
                 messagebox.showerror("Error", f"Error saving configuration: {e}")
 
     def load_config(self):
-        file_path = filedialog.askopenfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        file_path = filedialog.askopenfilename(filetypes=CONFIG_FILETYPES)
         if file_path:
             try:
+                if is_queue_file(file_path):
+                    self.load_config_stream(self.model.load_queue_file(file_path))
+                    return
+                import json
                 with open(file_path, "r") as f:
                    config_data = json.load(f)
-                
-                self.model.from_dict(config_data)
-                self.view.update_loaded_files_tree(self.model.loaded_files)
-                self.view.update_queue_tree(self.model.queue)
-                self.view.update_output_preview()
-                messagebox.showinfo("Config Loaded", "Configuration loaded successfully.")
+
+                self.model.load_dict(config_data)
+                self.config_loaded()
             except Exception as e:
                 messagebox.showerror("Error", f"Error loading configuration: {e}")
 
+    def load_config_stream(self, batches):
+        """Lee un bloque de trabajos por cada vuelta del bucle de Tk y muestra lo que lleva."""
+        try:
+            next(batches)
+        except StopIteration:
+            self.config_loaded()
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading configuration: {e}")
+            return
+        self.view.update_loaded_files_tree(self.model.loaded_files)
+        self.view.update_queue_tree(self.model.queue)
+        self.view.root.after(1, lambda: self.load_config_stream(batches))
+
+    def update_settings_from_model(self):
+        """Lleva a los controles los ajustes de render del modelo (configuración cargada o diario)."""
+        settings_frame = self.view.settings_frame
+        settings_frame.max_workers_var.set(self.model.max_workers)
+        settings_frame.chunk_size_var.set(self.model.chunk_size)
+        settings_frame.min_free_memory_var.set(self.model.min_free_memory_mb)
+        settings_frame.max_cpu_percent_var.set(self.model.max_cpu_percent)
+        settings_frame.use_daemon_var.set(self.model.use_daemon)
+        settings_frame.resume_renders_var.set(self.model.resume_renders)
+        settings_frame.use_custom_alerts_var.set(self.model.use_custom_alerts)
+        for label, policy in SCHEDULE_POLICIES.items():
+            if policy == (self.model.schedule_policy, self.model.fair_share_key) or (
+                    policy[0] == self.model.schedule_policy != "fair"):
+                settings_frame.schedule_policy_var.set(label)
+                break
+
+    def config_loaded(self):
+        self.model.refresh_file_metadata()
+        self.update_settings_from_model()
+        self.view.update_loaded_files_tree(self.model.loaded_files)
+        self.view.update_queue_tree(self.model.queue)
+        self.view.update_output_preview()
+        messagebox.showinfo("Config Loaded", "Configuration loaded successfully.")
+
+    def restore_journal(self):
+        """Recupera la cola de la última sesión y continúa el render si se cerró a medias."""
+        try:
+            interrupted = self.model.open_journal()
+        except Exception as e:
+            print(f"Queue journal disabled: {e}")
+            return
+        self.update_settings_from_model()
+        self.view.update_loaded_files_tree(self.model.loaded_files)
+        self.view.update_queue_tree(self.model.queue)
+        if interrupted:
+            print(f"Resuming {len(interrupted)} job(s) from an interrupted render")
+            self.model.start_render(interrupted)
+            self.start_monitoring()
+
     def sort_queue(self, sort_by):
         self.model.sort_queue(sort_by)
 
@@ -144,75 +264,45 @@ class RenderQueueController:
         if self.model.suspend_after_render:
             messagebox.showinfo("Suspensión Automática", "La PC se suspenderá automáticamente cuando se completen los renders.")
 
-    def process_output_format(self, output_path, output_format, output_file_name):
-            now = datetime.datetime.now()
-            output = output_format
-            output = output.replace("{{date}}", now.strftime("%Y-%m-%d"))
-            output = output.replace("{{time}}", now.strftime("%H-%M-%S"))
-            output = output.replace("{{frame}}", "//") # <---- Esto es para que genere frames intermedios
-
-            if output_file_name:
-                output = f"{output_path}/{output_file_name}"
-            else:
-                output = f"{output_path}/{output}"
-
-            return output
-    
     def update(self, model, event_type=None, data=None):
             if event_type == "error":
                 messagebox.showerror("Error", data)
             elif event_type == "render_complete":
                 messagebox.showinfo("Render Complete", data)
                 self.view.progress_bar['value'] = 0
+                self.view.update_eta_label()
                 self.stop_monitoring()
                 if self.model.shutdown_after_render:
                     self.model.shutdown_pc()
                 if self.model.suspend_after_render:
                     self.model.suspend_pc()
+            elif event_type == "global_progress":
+                self.view.progress_bar['value'] = data
+            elif event_type == "eta_update":
+                self.view.update_eta_label(data["queue_eta"], data["fps"])
             elif event_type == "progress_update":
-                self.view.update_progress_bar(data, model.queue[data]["progress"])
-                # Intenta mostrar la última imagen generada
-                if model.queue:
-                    last_rendered_image = self.get_last_rendered_image(model.queue[data]["output_path"])
-                    if last_rendered_image:
-                        self.view.show_preview(last_rendered_image)
+                # data es el id del trabajo; puede haber salido de la cola mientras se renderizaba
+                item = model.queue.get(data)
+                if item is not None:
+                    self.view.update_progress_bar(item)
+                    # Intenta mostrar la última imagen generada
+                    # script_blender.py avisa de cada previsualización; si no, el thumbnailer busca en la carpeta
+                    self.thumbnailer.request(item.get("last_preview"), model.output_dir(item))
+            elif event_type == "preview_ready":
+                self.view.show_preview(data["path"], data["image"], data["error"])
             elif event_type == "render_complete_item":
-                if self.model.use_custom_alerts:
-                    self.model.send_alerts()
+                pass  # El modelo encola la alerta; se envía desde el hilo del AlertDispatcher
             else:
                 self.view.update_loaded_files_tree(model.loaded_files)
                 self.view.update_queue_tree(model.queue)
 
                 if model.loaded_files:
-                    self.view.update_settings_from_loaded_files(len(model.loaded_files) - 1)
+                    self.view.update_settings_from_loaded_files(model.loaded_files.ids()[-1])
     
-    def get_last_rendered_image(self, output_path):
-        """
-        Obtiene la última imagen de previsualización renderizada de la ruta de salida.
-        Ahora busca en el subdirectorio 'previews'.
-        """
-        try:
-            # Construye la ruta al directorio de previsualizaciones
-            preview_dir = os.path.join(output_path, "previews")
-            
-            # Lista de archivos en el directorio de previsualizaciones
-            files = [f for f in os.listdir(preview_dir) if os.path.isfile(os.path.join(preview_dir, f))]
-
-            # Filtrar por extensiones de imagen
-            image_files = [f for f in files if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff'))]
+    def thumbnail_ready(self, image_path, image, error):
+        # Se llama desde el hilo del thumbnailer: la miniatura llega a Tk por el bus de eventos
+        self.model.notify_observers("preview_ready", {"path": image_path, "image": image, "error": error})
 
-            # Ordenar por fecha de modificación (la última modificada es la más reciente)
-            image_files.sort(key=lambda x: os.path.getmtime(os.path.join(preview_dir, x)), reverse=True)
-
-            if image_files:
-                # Retorna la ruta completa de la última imagen de previsualización
-                return os.path.join(preview_dir, image_files[0])
-            else:
-                return None
-        except Exception as e:
-            print(f"Error al obtener la última imagen renderizada: {e}")
-            return None
-    
     def start_monitoring(self):
          self.is_monitoring = True
          self.update_monitoring()
@@ -222,8 +312,13 @@ class RenderQueueController:
     
     def update_monitoring(self):
         if self.is_monitoring:
-            cpu_percent = psutil.cpu_percent()
-            ram_percent = psutil.virtual_memory().percent
+            # Las mismas lecturas que usa el control de admisión de los workers
+            sample = self.model.resource_monitor.sample()
+            if sample is None:
+                self.is_monitoring = False
+                return
+            cpu_percent = sample["cpu_percent"]
+            ram_percent = sample["memory_percent"]
             self.view.update_monitoring_labels(cpu_percent, ram_percent)
             self.view.root.after(1000, self.update_monitoring)  # Actualizar cada segundo
     
@@ -240,15 +335,5 @@ class RenderQueueController:
         return True
     
     def process_output_format(self, output_path, output_format, output_file_name):
-        now = datetime.datetime.now()
-        output = output_format
-        output = output.replace("{{date}}", now.strftime("%Y-%m-%d"))
-        output = output.replace("{{time}}", now.strftime("%H-%M-%S"))
-        output = output.replace("{{frame}}", str(0)) # Esto lo actualiza Blender después.
-        
-        if output_file_name:
-             output = f"{output_path}/{output_file_name}"
-        else:
-            output = f"{output_path}/{output}"
-
-        return output
\ No newline at end of file
+        # La misma resolución que usa el modelo la primera vez que renderiza el trabajo (ver resolve_output_paths)
+        return self.model.process_output_format(output_path, output_format, output_file_name)
@@ -1,229 +1,697 @@
 import os
-import subprocess
-import platform
-import re
-from threading import Thread, Event
+from threading import Event
 import json
 import datetime
-import smtplib
-from email.mime.text import MIMEText
+import contextlib
+from itertools import islice
+from BlendFileReader import read_blend_metadata, UnsupportedBlendFile
+from OutputScanner import find_rendered_frames, frames_to_spec
+from RenderEvents import EVENT_PREFIX
+from EventBus import EventBus
+from JobStore import JobStore, new_job_id
+from RenderScheduler import RenderScheduler
+from RenderEstimator import RenderEstimator
+from ResourceMonitor import ResourceMonitor
+from MemoryTelemetry import MemoryTelemetry, format_memory
+from JobLog import JobLog, prune_logs
+
+# Los scripts de Blender se buscan junto al modelo, no en el directorio actual (cron, CLI)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# asyncio, subprocess, smtplib/email y sqlite3 se importan la primera vez que se usan
+# (al renderizar, al leer un .blend con Blender, al enviar una alerta o al abrir la caché):
+# así abrir la ventana o el CLI no paga su tiempo de carga.
 
 class RenderQueueModel:
     def __init__(self):
-        self.queue = []
-        self.loaded_files = []
+        # Trabajos indexados por id estable; la interfaz y los eventos se refieren a ellos por id
+        self.queue = JobStore(default_status="queued")
+        self.loaded_files = JobStore(default_status="loaded")
         self.is_rendering = False
         self.observers = []
+        self.event_bus = EventBus()
+        self.event_bus.subscribe(self.deliver_to_observers)
+        self.global_progress = 0
         self.shutdown_after_render = False
         self.suspend_after_render = False
         self.stop_event = Event()
-        self.current_process = None
+        self.supervisor = None  # Se crea con get_supervisor() al lanzar el primer render
+        self.render_handle = None
+        self.max_workers = 1
+        self.chunk_size = 0  # 0 = no dividir los items en bloques de frames
+        self.use_daemon = False  # Reutilizar procesos de Blender ya abiertos entre trabajos
+        self.idle_daemons = []
+        self.resume_renders = False  # Saltar los frames que ya existen en la carpeta de salida
+        self.resume_check = "size"  # "exists", "size" o "header"
+        self.schedule_policy = "fifo"  # "fifo", "sjf" o "fair" (ver RenderScheduler)
+        self.fair_share_key = "file"  # Reparto del modo "fair": por "file" o por "project"
+        # Control de admisión: no lanzar otro Blender si no quedan estos márgenes (ver ResourceMonitor)
+        self.min_free_memory_mb = 1024
+        self.max_cpu_percent = 100  # 100 = no esperar por CPU
+        self.admission_poll_interval = 1.0
+        self.resource_monitor = ResourceMonitor()
+        self.coordinator = None  # RenderCoordinator: renderizar en agentes remotos en lugar de en local
+        self.use_metadata_cache = True
+        self.use_native_reader = True  # Leer los .blend en Python antes de recurrir a Blender
+        self.metadata_cache = None
+        self.journal = None  # QueueJournal abierto con open_journal()
+        self.job_logs = {}  # id del trabajo -> JobLog del último render
+        self.log_dir = None  # Por defecto <configuración del usuario>/logs
+        self.log_tail_lines = 500
+        self.event_server = None
         self.use_custom_alerts = False
+        # Destinos y resumen de las alertas (ver AlertDispatcher.build_alert_dispatcher). Con None
+        # se leen de alerts.json en la configuración del usuario (o de alerts_path) al necesitarlos
+        self.alerts = None
+        self.alerts_path = None
+        self.alert_dispatcher = None
+        self.alert_config_error = None  # Configuración rechazada; se vuelve a probar en el próximo render
+        self.blender_executable = "blender"
+        self.render_script = os.path.join(SCRIPT_DIR, "script_blender.py")
+        self.probe_script = os.path.join(SCRIPT_DIR, "script_probe.py")
 
     def add_observer(self, observer):
         self.observers.append(observer)
 
-    def notify_observers(self, event_type=None, message=None):
+    def deliver_to_observers(self, event_type, message):
         for observer in self.observers:
             observer.update(self, event_type, message)
 
-    def add_file(self, file_path, cameras):
+    def notify_observers(self, event_type=None, message=None):
+        # Se puede llamar desde el hilo del render: el bus entrega los eventos en el hilo de Tk
+        coalesce_key = event_type if event_type in ("global_progress", "preview_ready") else None
+        if event_type == "progress_update":
+            coalesce_key = (event_type, message)  # message es el id del trabajo
+        elif event_type == "eta_update":
+            coalesce_key = (event_type, message.get("job_id"))
+        self.event_bus.publish(event_type, message, coalesce_key)
+
+    def add_file(self, file_path, cameras, metadata=None):
+        metadata = metadata or {}
         default_output_path = os.path.dirname(file_path)
         new_file = {
             "file": file_path,
             "cameras": cameras,
-            "selected_camera": cameras[0],
-            "start_frame": 1,
-            "end_frame": 250,
-            "resolution": "1920x1080",
+            "selected_camera": metadata.get("scene_camera") or cameras[0],
+            "start_frame": metadata.get("frame_start", 1),
+            "end_frame": metadata.get("frame_end", 250),
+            "resolution": metadata.get("resolution", "1920x1080"),
             "format": "PNG",
             "output_path": default_output_path,
             "output_format": "",
-            "render_engine": "CYCLES",
+            "render_engine": metadata.get("render_engine", "CYCLES"),
             "file_prefix": "",
             "progress": 0,
             "render_threads": "Auto",
             "output_file_name": "",
         }
-        self.loaded_files.append(new_file)
+        self.loaded_files.add(new_file)
         self.notify_observers()
 
-    def remove_file(self, index):
-        if index < len(self.loaded_files):
-            self.loaded_files.pop(index)
+    def remove_file(self, job_id):
+        if self.loaded_files.remove(job_id) is not None:
             self.notify_observers()
 
-    def add_to_queue(self, index, settings):
-        if index < len(self.loaded_files):
-            file_data = self.loaded_files.pop(index)
+    def add_to_queue(self, job_id, settings):
+        file_data = self.loaded_files.remove(job_id)
+        if file_data is not None:
             file_data.update(settings)
+            # Con los ajustes nuevos la carpeta de salida se vuelve a resolver al renderizar
+            file_data.pop("resolved_output_path", None)
             file_data["progress"] = 0
-            self.queue.append(file_data)
+            file_data["status"] = "queued"
+            self.queue.add(file_data)
             self.notify_observers()
 
-    def remove_from_queue(self, index):
-        if index < len(self.queue):
-            file_data = self.queue.pop(index)
-            self.loaded_files.append(file_data)
+    def remove_from_queue(self, job_id):
+        file_data = self.queue.remove(job_id)
+        if file_data is not None:
+            file_data["status"] = "loaded"
+            self.loaded_files.add(file_data)
             self.notify_observers()
 
-    def update_file_settings(self, index, settings):
-        if index < len(self.loaded_files):
-            self.loaded_files[index].update(settings)
+    def update_file_settings(self, job_id, settings):
+        if self.loaded_files.update(job_id, settings) is not None:
             self.notify_observers()
 
-    def start_render(self, selected_queue, progress_bar):  # <--- Recibe progress_bar
+    def set_job_status(self, item, status):
+        """Cambia el estado de un trabajo manteniendo el índice por estado de la cola."""
+        if self.queue.get(item.get("id")) is item:
+            self.queue.set_status(item["id"], status)
+        else:
+            item["status"] = status
+
+    def process_output_format(self, output_path, output_format, output_file_name):
+        now = datetime.datetime.now()
+        output = output_format
+        output = output.replace("{{date}}", now.strftime("%Y-%m-%d"))
+        output = output.replace("{{time}}", now.strftime("%H-%M-%S"))
+        output = output.replace("{{frame}}", str(0)) # Esto lo actualiza Blender después.
+
+        if output_file_name:
+            output = f"{output_path}/{output_file_name}"
+        else:
+            output = f"{output_path}/{output}"
+
+        return output
+
+    def resolve_output_paths(self, items):
+        """
+        Carpeta real de salida de cada trabajo (la carpeta elegida más su formato o nombre
+        de archivo), igual desde la interfaz que desde render_cli. Se resuelve una sola vez
+        por trabajo y se guarda aparte, en resolved_output_path: output_path queda como lo
+        escribió el usuario, y los renders siguientes (parar y volver a empezar, reanudar)
+        usan la misma carpeta aunque el formato tenga {{date}} o {{time}}.
+        """
+        for item in items:
+            if item.get("resolved_output_path"):
+                continue
+            output_path = self.process_output_format(item["output_path"], item.get("output_format", ""), item.get("output_file_name", ""))
+            if self.queue.get(item.get("id")) is item:
+                self.queue.update(item["id"], {"resolved_output_path": output_path})
+            else:
+                item["resolved_output_path"] = output_path
+
+    def output_dir(self, item):
+        """Carpeta donde se escriben los frames del trabajo (resuelta o, si aún no, la del usuario)."""
+        return item.get("resolved_output_path") or item["output_path"]
+
+    def start_render(self, selected_queue):
         print("Model start_render called")
         self.is_rendering = True
         self.stop_event.clear()
-        render_thread = Thread(target=self.process_queue, args=(selected_queue, progress_bar))  # <--- Pasa progress_bar
-        render_thread.start()
+        # La cola corre en el bucle de asyncio del supervisor, no en un hilo propio
+        self.render_handle = self.get_supervisor().submit(self.run_queue(selected_queue), "render_queue")
 
     def stop_render(self):
         print("Model stop_render called")
         if self.is_rendering:
             self.is_rendering = False
             self.stop_event.set()
-            if self.current_process:
-                print("Terminating current Blender process")
-                self.current_process.terminate()
+            if self.render_handle is not None:
+                # Cancelar la cola termina todos los procesos de Blender en marcha
+                self.render_handle.cancel()
+
+    def resolve_render_threads(self, render_threads, workers):
+        """Reparte los hilos de la máquina entre los workers cuando el item usa 'Auto'."""
+        if str(render_threads).isdigit() or workers <= 1:
+            return str(render_threads)
+        return str(max(1, (os.cpu_count() or 1) // workers))
+
+    def render_output_base(self, item):
+        """Ruta base que recibe script_blender.py, sin el número de frame NI la extensión."""
+        output_dir = self.output_dir(item).replace("\\", "/")
+        output_file_name = item.get("output_file_name", "")
+
+        if output_file_name:
+            base_name, _ = os.path.splitext(output_file_name)
+            return f"{output_dir}/{base_name}"
+        # Si no, usar el prefijo
+        return f"{output_dir}/{item.get('file_prefix', '')}"
+
+    def build_render_job(self, item, start_frame, end_frame, render_threads, frame_spec=""):
+        """Argumentos de script_blender.render_animation para un rango de frames de un item."""
+        job = {
+            "blend_file": item["file"],
+            "output_path": self.render_output_base(item),
+            "camera_name": item["selected_camera"],
+            "render_engine": item.get("render_engine", "CYCLES"),
+            "start_frame": str(start_frame),
+            "end_frame": str(end_frame),
+            "render_threads": render_threads,
+            "format_type": item["format"],
+        }
+        if frame_spec:
+            job["frames"] = frame_spec
+        return job
 
-    def process_queue(self, queue_to_render, progress_bar):
-        print("process_queue started")
-        total_frames_to_render = sum((int(item["end_frame"]) - int(item["start_frame"]) + 1) for item in queue_to_render)
-        total_frames_rendered = 0
-
-        # Inicializar variables fuera del bucle
-        blend_file = None
-        output_path = None
-        resolution = None
-        format_type = None
-        camera = None
-        start_frame = None
-        end_frame = None
-        file_prefix = None
-        render_engine = None
-        render_threads = None
-        output_file_name = None
-
-        for index, item in enumerate(queue_to_render):
-            if self.stop_event.is_set():
-                print("Rendering stopped by user")
-                break
+    def build_render_command(self, job):
+        command = [
+            self.blender_executable,
+            "--background",
+            job["blend_file"],
+            "--python",
+            self.render_script,
+            "--",
+            job["blend_file"],
+            job["output_path"],
+            job["camera_name"],
+            job["render_engine"],
+            job["start_frame"],
+            job["end_frame"],
+            job["render_threads"],
+            job["format_type"],
+        ]
+        if job.get("frames"):
+            command.append(job["frames"])
+        return command
+
+    def frames_to_render(self, item):
+        """
+        Frames del item que hay que renderizar. En modo reanudar se omiten los que ya
+        están en la carpeta de salida (se lee el directorio una sola vez por item).
+        """
+        frames = list(range(int(item["start_frame"]), int(item["end_frame"]) + 1))
+        if self.journal is not None and item.get("id"):
+            # Frames que el diario registró antes de un cierre inesperado
+            journaled = self.journal.completed_frames(item["id"])
+            if journaled:
+                frames = [frame for frame in frames if frame not in journaled]
+        if not self.resume_renders:
+            return frames
+        rendered = find_rendered_frames(self.render_output_base(item), self.resume_check)
+        return [frame for frame in frames if frame not in rendered]
+
+    def split_into_chunks(self, item, frames):
+        """Divide los frames de un item en bloques de chunk_size frames."""
+        chunk_size = int(self.chunk_size) if self.chunk_size else 0
+        if chunk_size <= 0:
+            chunk_size = len(frames)
+        full_range = len(frames) == int(item["end_frame"]) - int(item["start_frame"]) + 1
+
+        chunks = []
+        for position in range(0, len(frames), chunk_size):
+            chunk_frames = frames[position:position + chunk_size]
+            chunks.append({
+                "job_id": item["id"],
+                "item": item,
+                "start_frame": chunk_frames[0],
+                "end_frame": chunk_frames[-1],
+                "frames": chunk_frames,
+                # Solo hace falta pasar los frames sueltos si el bloque tiene huecos
+                "frame_spec": "" if full_range else frames_to_spec(chunk_frames),
+            })
+        return chunks
+
+    def get_supervisor(self):
+        """Crea el bucle de asyncio que vigila los procesos de Blender la primera vez que se necesita."""
+        if self.supervisor is None:
+            from RenderSupervisor import RenderSupervisor
+            self.supervisor = RenderSupervisor()
+        return self.supervisor
+
+    def process_queue(self, queue_to_render):
+        """Renderiza la cola y espera a que termine (para usarla fuera de la interfaz)."""
+        from concurrent.futures import CancelledError
+        self.is_rendering = True
+        self.stop_event.clear()
+        self.render_handle = self.get_supervisor().submit(self.run_queue(queue_to_render), "render_queue")
+        try:
+            self.render_handle.result()
+        except CancelledError:
+            pass
 
-            print(f"Processing item: {item}")
-
-            # Asignar valores a las variables solo si no se ha detenido el renderizado
-            blend_file = item["file"]
-            output_path = item["output_path"]
-            resolution = item["resolution"]
-            format_type = item["format"]
-            camera = item["selected_camera"]
-            start_frame = int(item["start_frame"])
-            end_frame = int(item["end_frame"])
-            file_prefix = item.get("file_prefix", "")
-            render_engine = item.get("render_engine", "CYCLES")
-            render_threads = item.get("render_threads", "Auto")
-            output_file_name = item.get("output_file_name", "")
-
-            output_dir = output_path.replace("\\", "/")
-            output_file = f"{output_dir}/{file_prefix}{index:04}.{format_type.lower()}"
-            
-            if output_file_name:
-                base_name, _ = os.path.splitext(output_file_name)
-                output_file = f"{output_dir}/{base_name}"
+    async def run_queue(self, queue_to_render):
+        import asyncio
+        from RenderEvents import RenderEventServer
+        print("process_queue started")
+        self.alert_config_error = None
+        loop = asyncio.get_running_loop()
+        pending = []
+        chunks_per_item = {}
+        item_frames = {}
+        frames_left = {}
+        for item in queue_to_render:
+            # Los trabajos que no vienen de la cola (por ejemplo en scripts) reciben su id aquí
+            job_id = item.setdefault("id", new_job_id())
+            MemoryTelemetry.reset(item)
+            if self.resume_renders:
+                # Leer la carpeta de salida fuera del bucle para no frenar a los demás procesos
+                frames = await loop.run_in_executor(None, self.frames_to_render, item)
             else:
-                # Si no, usar el prefijo
-                output_file = f"{output_dir}/{file_prefix}"
-
-            command = [
-                "blender",
-                "--background",
-                blend_file,
-                "--python",
-                "script_blender.py",
-                "--",
-                blend_file,
-                output_file,  # Ahora output_file es la ruta base sin el número de frame NI la extensión
-                camera,
-                render_engine,
-                str(start_frame),
-                str(end_frame),
-                render_threads,
-                format_type,
-            ]
-            print(f"Running command: {' '.join(command)}")
-
-            try:
-                self.current_process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, shell=True, encoding="utf-8")
-
-                for line in iter(self.current_process.stdout.readline, ""):
-                    if self.stop_event.is_set():
-                        break
-                    print(line, end="")
-                    match = re.search(r"Fra:(\d+), Mem:.*, Time:(.*), (.*)", line)
-                    if match:
-                        frame_done = int(match.group(1))
-                        frames_in_current_item = int(item["end_frame"]) - int(item["start_frame"]) + 1
-                        progress_current_item = int((frame_done / frames_in_current_item) * 100)
-
-                        item["progress"] = progress_current_item
-
-                        # Calcular progreso global
-                        total_frames_rendered_temp = total_frames_rendered + frame_done
-                        global_progress = int((total_frames_rendered_temp / total_frames_to_render) * 100)
-
-                        # Actualizar barra de progreso
-                        progress_bar["value"] = global_progress
-
-                        self.notify_observers("progress_update", index)
-
-                for line in iter(self.current_process.stderr.readline, ""):
-                    if self.stop_event.is_set():
-                        break
-                    print(line, end="")
-
-                self.current_process.wait()
-                stdout, stderr = self.current_process.communicate()
-
-                if self.current_process.returncode != 0:
-                    if self.stop_event.is_set():
-                        print("Rendering stopped by user during an error")
-                        self.notify_observers("error", f"Rendering stopped by user during an error: {stderr}")
-                        return
-                    self.notify_observers("error", f"Error rendering {blend_file}\n{stderr}")
-                    return
-
-                self.current_process = None
-                self.notify_observers("render_complete_item", f"Rendering {blend_file} has been completed")
+                frames = self.frames_to_render(item)
+            frames_in_item = int(item["end_frame"]) - int(item["start_frame"]) + 1
+            # Los frames que ya estaban renderizados cuentan como hechos desde el principio
+            item_frames[job_id] = frames_in_item - len(frames)
+            frames_left[job_id] = (item, len(frames))
+            item["progress"] = int((item_frames[job_id] / frames_in_item) * 100) if frames_in_item else 100
+            if not frames:
+                print(f"All frames of {item['file']} are already rendered, skipping")
+                self.set_job_status(item, "done")
+            else:
+                self.set_job_status(item, "queued")
+            chunks = self.split_into_chunks(item, frames) if frames else []
+            chunks_per_item[job_id] = len(chunks)
+            if chunks:
+                self.open_job_log(item)
+            pending.extend(chunks)
+
+        if self.journal is not None:
+            # Si la aplicación se cierra a mitad de render, estos trabajos se continúan al arrancar
+            self.journal.save_settings(self.settings_dict())
+            self.journal.start_run(queue_to_render)
+
+        workers = max(1, min(int(self.max_workers), len(pending) or 1))
+        # El planificador decide el orden de los chunks según prioridad, fecha límite y política
+        scheduler = RenderScheduler(self.schedule_policy, self.fair_share_key)
+        scheduler.extend(pending)
+        estimator = RenderEstimator(workers)
+        for item, frame_count in frames_left.values():
+            estimator.add_job(item, frame_count)
+
+        # Estado compartido entre los workers; todos corren en el bucle de asyncio, así que no necesita lock
+        progress = {
+            "total_frames": sum((int(item["end_frame"]) - int(item["start_frame"]) + 1) for item in queue_to_render) or 1,
+            "chunk_frames": {},
+            "item_frames": item_frames,
+            # Total de frames hechos, para no sumar todos los items en cada evento
+            "frames_rendered": sum(item_frames.values()),
+            "chunks_left": chunks_per_item,
+            "failed": False,
+            "estimator": estimator,
+            "running": 0,  # Chunks admitidos que se están renderizando
+        }
+        self.resource_monitor.min_free_memory_mb = self.min_free_memory_mb
+        self.resource_monitor.max_cpu_percent = self.max_cpu_percent
 
-                # Actualizar el conteo de frames renderizados después de completar cada item
-                total_frames_rendered += int(item["end_frame"]) - int(item["start_frame"]) + 1
+        if self.event_server is None:
+            self.event_server = RenderEventServer()
+        if self.event_server.server is None:
+            await self.event_server.start()
+        if self.coordinator is not None and self.coordinator.server is None:
+            await self.coordinator.start()
 
-            except FileNotFoundError:
-                self.notify_observers(
-                    "error",
-                    f"Blender executable not found. Please make sure Blender is installed and accessible in your system path."
-                )
-            except subprocess.CalledProcessError as e:
-                if self.stop_event.is_set():
-                    print("Rendering stopped by user during an error")
-                    self.notify_observers("error", f"Rendering stopped by user during an error: {e.stderr}")
-                    return
-                self.notify_observers("error", f"Error rendering {blend_file}:\n{e.stderr}")
-            except Exception as e:
-                self.notify_observers("error", f"An unexpected error occurred: {e}")
-                return
+        print(f"Starting {workers} render worker(s) for {len(pending)} chunk(s), {self.schedule_policy} scheduling")
+        try:
+            await asyncio.gather(*(
+                self.render_worker(scheduler, workers, progress, worker)
+                for worker in range(workers)
+            ))
+        except asyncio.CancelledError:
+            print("Rendering stopped by user")
+            self.is_rendering = False
+            for item in queue_to_render:
+                if item.get("status") == "rendering":
+                    self.set_job_status(item, "stopped")
+            if self.journal is not None:
+                self.journal.finish_run()
+            raise
+        finally:
+            for item in queue_to_render:
+                job_log = self.job_logs.get(item["id"])
+                if job_log is not None:
+                    job_log.close()
 
         self.is_rendering = False
+        if self.journal is not None:
+            self.journal.finish_run()
+        if progress["failed"]:
+            return
         self.notify_observers("render_complete", "All renders have been processed.")
+        self.post_alert("queue_complete", "All renders have been processed.")
 
+        if not self.use_daemon:
+            await self.shutdown_daemons()
         if self.shutdown_after_render:
             self.shutdown_pc()
         if self.suspend_after_render:
             self.suspend_pc()
 
+    async def render_worker(self, scheduler, workers, progress, worker=0):
+        try:
+            while scheduler and not self.stop_event.is_set() and not progress["failed"]:
+                chunk = scheduler.next_chunk()
+                chunk["worker"] = worker
+                if not await self.wait_for_admission(chunk, progress):
+                    return
+                try:
+                    succeeded = await self.render_chunk(chunk, workers, progress)
+                finally:
+                    self.resource_monitor.release((chunk["job_id"], chunk["start_frame"]))
+                    progress["running"] -= 1
+                if not succeeded:
+                    progress["failed"] = True
+                    return
+        finally:
+            progress["estimator"].worker_done(worker)
+
+    async def wait_for_admission(self, chunk, progress):
+        """
+        Espera a que haya CPU y RAM libres para el chunk antes de lanzar su Blender.
+        Devuelve False si el render se detuvo o falló mientras esperaba.
+        """
+        import asyncio
+        item = chunk["item"]
+        waiting_reason = None
+        while not self.stop_event.is_set() and not progress["failed"]:
+            running = progress["running"]
+            # Con coordinador Blender corre en otras máquinas: los recursos locales no cuentan
+            if self.coordinator is not None:
+                admitted, reason = True, ""
+            else:
+                admitted, reason = self.resource_monitor.admit(item, running)
+            if admitted:
+                progress["running"] += 1
+                # Reservar la memoria del trabajo hasta que Blender termine de cargar la escena
+                self.resource_monitor.reserve((chunk["job_id"], chunk["start_frame"]), item)
+                if waiting_reason is not None:
+                    print(f"Resources available again, starting {item['file']}")
+                return True
+            if reason != waiting_reason:
+                print(f"Holding back {item['file']} (frames {chunk['start_frame']}-{chunk['end_frame']}): {reason}")
+                waiting_reason = reason
+            await asyncio.sleep(self.admission_poll_interval)
+        return False
+
+    def update_chunk_progress(self, chunk, frames_done, progress):
+        """Registra los frames hechos de un chunk y recalcula el progreso del item y el global."""
+        job_id = chunk["job_id"]
+        item = chunk["item"]
+        frames_in_item = int(item["end_frame"]) - int(item["start_frame"]) + 1
+        key = (job_id, chunk["start_frame"])
+        previous = progress["chunk_frames"].get(key, 0)
+        # Un evento atrasado nunca puede hacer retroceder el progreso del chunk
+        frames_done = max(frames_done, previous)
+        progress["chunk_frames"][key] = frames_done
+        progress["item_frames"][job_id] = progress["item_frames"].get(job_id, 0) + frames_done - previous
+        progress["frames_rendered"] += frames_done - previous
+        item["progress"] = int((progress["item_frames"][job_id] / frames_in_item) * 100)
+        total_frames_rendered = progress["frames_rendered"]
+        global_progress = int((total_frames_rendered / progress["total_frames"]) * 100)
+
+        # Tiempo restante del item y de la cola con lo que falta por renderizar
+        estimator = progress["estimator"]
+        estimator.update_job(job_id, frames_in_item - progress["item_frames"][job_id])
+        self.notify_observers("eta_update", estimator.snapshot(job_id))
+
+        # La barra de progreso se actualiza en el hilo de la interfaz
+        self.global_progress = global_progress
+        self.notify_observers("global_progress", global_progress)
+
+    async def acquire_daemon(self, blend_file=None):
+        """
+        Devuelve un daemon de Blender libre, arrancando uno nuevo si no hay ninguno caliente.
+        Se prefiere uno que ya tenga cargado blend_file, así no hay que volver a leer el archivo.
+        """
+        self.idle_daemons = [daemon for daemon in self.idle_daemons if daemon.is_alive()]
+        for index in range(len(self.idle_daemons) - 1, -1, -1):
+            if self.idle_daemons[index].blend_file == blend_file:
+                return self.idle_daemons.pop(index)
+        if self.idle_daemons:
+            return self.idle_daemons.pop()
+        from BlenderDaemon import BlenderDaemon
+        daemon = BlenderDaemon(self.blender_executable, self.render_script)
+        await daemon.start(self.event_server.environment())
+        return daemon
+
+    async def release_daemon(self, daemon):
+        if daemon.is_alive() and self.use_daemon:
+            self.idle_daemons.append(daemon)
+        else:
+            await daemon.stop()
+
+    async def shutdown_daemons(self):
+        daemons = self.idle_daemons
+        self.idle_daemons = []
+        for daemon in daemons:
+            await daemon.stop()
+
+    async def run_blender_process(self, job, on_line, job_id, on_start=None, on_stderr=None):
+        """Lanza un proceso de Blender nuevo para el trabajo. Devuelve (returncode, stderr)."""
+        command = self.build_render_command(job)
+        print(f"Running command: {' '.join(command)}")
+        env = dict(os.environ, **self.event_server.environment(job_id))
+        on_stderr = on_stderr or (lambda line: print(line, end=""))
+        return await self.supervisor.run_process(command, on_line, on_stderr, env, on_start)
+
+    async def run_on_daemon(self, job, on_line, job_id, on_start=None):
+        """Envía el trabajo a un daemon de Blender ya cargado. Devuelve (returncode, mensaje)."""
+        job = dict(job, job_id=job_id)
+        daemon = await self.acquire_daemon(job["blend_file"])
+        print(f"Sending job to Blender daemon {daemon.process.pid}: {job}")
+        if on_start is not None:
+            on_start(daemon.process.pid)
+        try:
+            return await daemon.render(job, on_line)
+        finally:
+            await self.release_daemon(daemon)
+
+    async def render_chunk(self, chunk, workers, progress):
+        import asyncio
+        item = chunk["item"]
+        item_id = chunk["job_id"]
+        print(f"Processing item: {item} (frames {chunk['start_frame']}-{chunk['end_frame']})")
+        blend_file = item["file"]
+        start_frame = chunk["start_frame"]
+        end_frame = chunk["end_frame"]
+        chunk_frames = chunk["frames"]
+        if self.coordinator is not None:
+            # Cada agente reparte "Auto" entre sus propios huecos
+            render_threads = str(item.get("render_threads", "Auto"))
+        else:
+            render_threads = self.resolve_render_threads(item.get("render_threads", "Auto"), workers)
+        job = self.build_render_job(item, start_frame, end_frame, render_threads, chunk["frame_spec"])
+
+        job_id = new_job_id()
+        frames_completed = set()
+        errors = []
+        channel_closed = asyncio.Event()
+        event_server = self.event_server
+        telemetry = MemoryTelemetry(item)
+        job_log = self.job_logs.get(item_id) or self.open_job_log(item)
+
+        def on_event(event):
+            event_type = event.get("event")
+            if event_type == "frame_start":
+                item["current_frame"] = event.get("frame")
+            elif event_type == "frame_done":
+                frames_completed.add(event.get("frame"))
+                if self.journal is not None:
+                    self.journal.frames_done(item_id, [event.get("frame")])
+                # El pico de memoria decide si el trabajo cabe junto a otros la próxima vez
+                if event.get("peak_memory_mb"):
+                    telemetry.record(event.get("frame"), None, float(event["peak_memory_mb"]))
+                # Con el primer frame hecho la memoria ya está asignada y se ve en las lecturas
+                self.resource_monitor.release((item_id, start_frame))
+                # Media móvil del tiempo por frame: la usan la estimación de tiempo y el planificador
+                progress["estimator"].record_frame(item_id, chunk.get("worker"), event.get("time"))
+                self.update_chunk_progress(chunk, len(frames_completed), progress)
+                self.notify_observers("progress_update", item_id)
+            elif event_type == "preview":
+                item["last_preview"] = event.get("path")
+            elif event_type == "error":
+                errors.append(event.get("message", ""))
+            elif event_type == "channel_closed":
+                channel_closed.set()
+
+        def on_line(line):
+            if self.stop_event.is_set():
+                return False
+            # Sin canal de eventos script_blender.py los escribe en stdout con un prefijo
+            if line.startswith(EVENT_PREFIX):
+                event_server.dispatch_line(line[len(EVENT_PREFIX):])
+                return True
+            if line.startswith("Fra:"):
+                telemetry.record_line(line)
+            job_log.append(line)
+            print(line, end="")
+            return True
+
+        def on_stderr(line):
+            job_log.append(line)
+            print(line, end="")
+
+        event_server.register(job_id, on_event)
+        if item.get("status") != "rendering":
+            self.set_job_status(item, "rendering")
+        try:
+            if self.coordinator is not None:
+                returncode, stderr = await self.coordinator.run_chunk(job, on_line, job_id)
+            elif self.use_daemon:
+                returncode, stderr = await self.run_on_daemon(job, on_line, job_id, telemetry.start)
+            else:
+                returncode, stderr = await self.run_blender_process(job, on_line, job_id, telemetry.start, on_stderr)
+                if returncode != 0:
+                    # El evento de error puede llegar justo después de que el proceso termine
+                    try:
+                        await asyncio.wait_for(channel_closed.wait(), 1)
+                    except asyncio.TimeoutError:
+                        pass
+            if errors:
+                stderr = f"{errors[-1]}\n{stderr}"
+
+            if returncode != 0:
+                self.set_job_status(item, "failed")
+                if self.use_daemon or self.coordinator is not None:
+                    # El stderr de los daemons y de los agentes remotos no pasa por on_stderr
+                    job_log.append(stderr)
+                # El log no se cierra aquí: otros chunks del item pueden seguir escribiendo.
+                # run_queue cierra todos los logs cuando terminan los workers
+                if self.stop_event.is_set():
+                    print("Rendering stopped by user during an error")
+                    self.notify_observers("error", f"Rendering stopped by user during an error: {stderr}")
+                    return False
+                self.notify_observers("error", f"Error rendering {blend_file}\n{stderr}\nFull log: {job_log.path}")
+                self.post_alert("error", f"Error rendering {blend_file}\n{stderr[-2000:]}\nFull log: {job_log.path}")
+                return False
+
+            # Actualizar el conteo de frames renderizados después de completar cada chunk
+            self.update_chunk_progress(chunk, len(chunk_frames), progress)
+            if self.journal is not None:
+                self.journal.frames_done(item_id, chunk_frames)
+            progress["chunks_left"][item_id] -= 1
+            item_finished = progress["chunks_left"][item_id] == 0
+            if item_finished:
+                job_log.close()
+                self.set_job_status(item, "done")
+                self.notify_observers("render_complete_item", f"Rendering {blend_file} has been completed")
+                self.post_alert("item_complete", f"Rendering {blend_file} has been completed")
+            return True
+
+        except FileNotFoundError:
+            self.set_job_status(item, "failed")
+            self.notify_observers(
+                "error",
+                f"Blender executable not found. Please make sure Blender is installed and accessible in your system path."
+            )
+            return False
+        except Exception as e:
+            self.set_job_status(item, "failed")
+            self.notify_observers("error", f"An unexpected error occurred: {e}")
+            return False
+        finally:
+            telemetry.stop()
+            event_server.unregister(job_id)
+            if item.get("peak_memory_mb"):
+                print(f"Peak memory of {blend_file} (frames {start_frame}-{end_frame}): {format_memory(item['peak_memory_mb'])}")
+
+    def open_job_log(self, item):
+        """Empieza el log del render del item, a continuación del de los renders anteriores (ver JobLog)."""
+        if self.log_dir is None:
+            from MetadataCache import user_config_dir
+            self.log_dir = os.path.join(user_config_dir(), "logs")
+            prune_logs(self.log_dir)
+        previous = self.job_logs.get(item["id"])
+        if previous is not None:
+            previous.close()
+        job_log = self.job_logs[item["id"]] = JobLog(item["id"], self.log_dir, self.log_tail_lines)
+        job_log.append(f"=== Render started {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
+        item["log_path"] = job_log.path
+        return job_log
+
+    def read_job_log(self, job_id, start=0, count=200):
+        """
+        Página del log de un trabajo: devuelve (líneas [start, start + count), total de
+        líneas o None si no se conoce). Los logs de sesiones anteriores se leen de disco.
+        """
+        job_log = self.job_logs.get(job_id)
+        if job_log is not None:
+            return job_log.page(start, count), job_log.line_count
+        item = self.queue.get(job_id) or self.loaded_files.get(job_id) or {}
+        if not item.get("log_path") or not os.path.exists(item["log_path"]):
+            return [], 0
+        import gzip
+        from itertools import islice
+        with gzip.open(item["log_path"], "rt", encoding="utf-8") as f:
+            return list(islice(f, start, start + count)), None
+
+    def job_log_tail(self, job_id, count=50):
+        job_log = self.job_logs.get(job_id)
+        return job_log.tail(count) if job_log is not None else []
+
     def shutdown_pc(self):
+        import platform
+        self.close_alerts(timeout=60)  # Que el último aviso salga antes de apagar
         os_name = platform.system()
         if os_name == "Windows":
             os.system("shutdown /s /t 0")
@@ -235,6 +703,8 @@ class RenderQueueModel:
             self.notify_observers("error", "Sistema operativo no soportado para apagado automático.")
 
     def suspend_pc(self):
+        import platform
+        self.close_alerts(timeout=60)  # Que el último aviso salga antes de suspender
         os_name = platform.system()
         if os_name == "Windows":
             os.system("rundll32.exe powrprof.dll,SetSuspendState 0,1,0")
@@ -245,63 +715,241 @@ class RenderQueueModel:
         else:
             self.notify_observers("error", "Sistema operativo no soportado para suspensión automática.")
 
-    def get_cameras_from_blend(self, blend_file):
+    def get_metadata_cache(self):
+        """Abre la caché de metadatos la primera vez que se necesita. None si no se puede usar."""
+        if self.metadata_cache is None and self.use_metadata_cache:
+            import sqlite3
+            from MetadataCache import MetadataCache
+            try:
+                self.metadata_cache = MetadataCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Metadata cache disabled: {e}")
+                self.use_metadata_cache = False
+        return self.metadata_cache
+
+    def probe_blend_files(self, blend_files):
+        """
+        Devuelve {ruta: metadatos} para varios .blend. Los que no cambiaron desde la
+        última vez salen de la caché; el resto se leen con Blender y se guardan.
+        """
+        metadata = {}
+        cache = self.get_metadata_cache()
+        to_probe = []
+        for blend_file in blend_files:
+            cached = cache.get(blend_file) if cache else None
+            if cached is not None:
+                metadata[blend_file] = dict(cached, file=blend_file)
+            else:
+                to_probe.append(blend_file)
+
+        if to_probe:
+            print(f"Metadata cache: {len(metadata)} hit(s), probing {len(to_probe)} file(s)")
+            probed, to_probe = self.probe_natively(to_probe)
+            probed.update(self.probe_with_blender(to_probe))
+            for blend_file, data in probed.items():
+                if cache and "error" not in data:
+                    cache.put(blend_file, data)
+            metadata.update(probed)
+        return metadata
+
+    def probe_natively(self, blend_files):
+        """
+        Lee los metadatos con BlendFileReader sin arrancar Blender. Devuelve los
+        resultados y la lista de archivos que el lector no supo interpretar.
+        """
+        if not self.use_native_reader:
+            return {}, list(blend_files)
+        metadata = {}
+        unsupported = []
+        for blend_file in blend_files:
+            try:
+                metadata[blend_file] = read_blend_metadata(blend_file)
+            except UnsupportedBlendFile as e:
+                print(f"Native reader cannot handle {blend_file}, falling back to Blender: {e}")
+                unsupported.append(blend_file)
+        return metadata, unsupported
+
+    def probe_with_blender(self, blend_files):
+        """
+        Lee cámaras, rango de frames, resolución y motor de varios .blend abriéndolos
+        todos en una sola sesión de Blender. Devuelve {ruta: metadatos}; los archivos
+        que no se pudieron leer llevan una clave "error".
+        """
+        if not blend_files:
+            return {}
+
+        import subprocess
+        import tempfile
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+            json.dump(list(blend_files), f)
+            file_list_path = f.name
+
         command = [
-            "blender",
+            self.blender_executable,
             "--background",
-            blend_file,
-            "--python-expr",
-            (
-                "import bpy;"
-                "camera_names = [obj.name for obj in bpy.data.objects if obj.type == 'CAMERA'];"
-                "print('CAMERAS:', camera_names)"
-            ),
+            "--python",
+            self.probe_script,
+            "--",
+            file_list_path,
         ]
         print(f"Command: {' '.join(command)}")
 
         try:
             result = subprocess.run(command, capture_output=True, text=True, encoding="utf-8")
-            stdout = result.stdout.strip()
-            stderr = result.stderr.strip()
-            print("STDOUT:", stdout)
-            print("STDERR:", stderr)
-
-            cameras_line = None
+            print("STDERR:", result.stderr.strip())
+        finally:
+            os.remove(file_list_path)
+
+        metadata = {}
+        for line in result.stdout.splitlines():
+            if line.startswith("PROBE_RESULT:"):
+                data = json.loads(line[len("PROBE_RESULT:"):])
+                metadata[data["file"]] = data
+            else:
+                print(line)
 
-            for line in stdout.splitlines():
-                if "CAMERAS:" in line:
-                    cameras_line = line
+        for blend_file in blend_files:
+            if blend_file not in metadata:
+                metadata[blend_file] = {"file": blend_file, "error": f"Blender did not return information for the file:\n{result.stderr.strip()}"}
+        return metadata
 
-            if cameras_line:
-                cameras = cameras_line.split(":")[1].strip()[1:-1].replace("'", "").split(", ")
-                return cameras
-            else:
-                self.notify_observers("error", "No cameras found in the blend file.")
-                return []
+    def get_cameras_from_blend(self, blend_file):
+        try:
+            metadata = self.probe_blend_files([blend_file])[blend_file]
         except Exception as e:
             self.notify_observers("error", f"An error occurred while retrieving cameras: {e}")
             return []
 
+        if metadata.get("cameras"):
+            return metadata["cameras"]
+        self.notify_observers("error", "No cameras found in the blend file.")
+        return []
+
     def to_dict(self):
+        return dict(loaded_files=list(self.loaded_files), queue=list(self.queue), **self.settings_dict())
+
+    def settings_dict(self):
+        """Ajustes de la cola sin los trabajos, tal como se guardan en la configuración."""
         return {
-            "loaded_files": self.loaded_files,
-            "queue": self.queue,
             "shutdown_after_render": self.shutdown_after_render,
             "suspend_after_render": self.suspend_after_render,
             "use_custom_alerts": self.use_custom_alerts,
+            "max_workers": self.max_workers,
+            "chunk_size": self.chunk_size,
+            "use_daemon": self.use_daemon,
+            "resume_renders": self.resume_renders,
+            "resume_check": self.resume_check,
+            "schedule_policy": self.schedule_policy,
+            "fair_share_key": self.fair_share_key,
+            "min_free_memory_mb": self.min_free_memory_mb,
+            "max_cpu_percent": self.max_cpu_percent,
         }
 
     @classmethod
     def from_dict(cls, data):
         model = cls()
-        model.loaded_files = data.get("loaded_files", [])
-        model.queue = data.get("queue", [])
-        model.shutdown_after_render = data.get("shutdown_after_render", False)
-        model.suspend_after_render = data.get("suspend_after_render", False)
-        model.use_custom_alerts = data.get("use_custom_alerts", False)
-        model.notify_observers()
+        model.load_dict(data)
         return model
 
+    def load_dict(self, data):
+        """Reemplaza el estado de este modelo con una configuración guardada por to_dict."""
+        # Las configuraciones antiguas no tienen id; JobStore les asigna uno nuevo
+        self.loaded_files = JobStore(data.get("loaded_files", []), default_status="loaded")
+        self.queue = JobStore(data.get("queue", []), default_status="queued")
+        self.shutdown_after_render = data.get("shutdown_after_render", False)
+        self.suspend_after_render = data.get("suspend_after_render", False)
+        self.use_custom_alerts = data.get("use_custom_alerts", False)
+        if "alerts" in data:
+            # Configuraciones de versiones anteriores: se usan, pero ya no se vuelven a guardar
+            self.alerts = data["alerts"]
+        self.close_alerts(timeout=0)
+        self.max_workers = data.get("max_workers", 1)
+        self.chunk_size = data.get("chunk_size", 0)
+        self.use_daemon = data.get("use_daemon", False)
+        self.resume_renders = data.get("resume_renders", False)
+        self.resume_check = data.get("resume_check", "size")
+        self.schedule_policy = data.get("schedule_policy", "fifo")
+        self.fair_share_key = data.get("fair_share_key", "file")
+        self.min_free_memory_mb = data.get("min_free_memory_mb", 1024)
+        self.max_cpu_percent = data.get("max_cpu_percent", 100)
+        if self.journal is not None:
+            self.attach_journal()
+            self.journal.replace(self.to_dict())
+        self.notify_observers()
+
+    def save_queue_file(self, path):
+        """Guarda la cola en el formato compacto de QueueFile (.rqueue, .rqueue.gz o .rqueue.zst)."""
+        from QueueFile import write_queue_file
+        write_queue_file(path, self.settings_dict(), [("loaded_files", self.loaded_files), ("queue", self.queue)])
+
+    def load_queue_file(self, path, batch_size=1000):
+        """
+        Carga una cola guardada con save_queue_file en streaming. Es un generador: tras
+        cada bloque de batch_size trabajos devuelve cuántos lleva, para que la interfaz
+        pueda mostrar los primeros trabajos mientras se lee el resto.
+        """
+        from QueueFile import iter_queue_file
+        records = iter_queue_file(path)
+        _, settings = next(records)
+        self.load_dict(settings)
+        loaded = 0
+        while True:
+            # Una transacción del diario por bloque, no una por trabajo
+            with self.journal_batch():
+                count = 0
+                for store, job in islice(records, batch_size):
+                    getattr(self, store).add(job)
+                    count += 1
+            loaded += count
+            if count < batch_size:
+                break
+            yield loaded
+        yield loaded
+
+    def journal_batch(self):
+        """Agrupa en una transacción del diario los cambios hechos dentro del with (si hay diario)."""
+        if self.journal is None:
+            return contextlib.nullcontext()
+        return self.journal.batch()
+
+    def open_journal(self, db_path=None):
+        """
+        Abre el diario de la cola (QueueJournal) y, si tiene datos, recupera con él la
+        cola de la última sesión. Desde entonces cada cambio se escribe en el diario.
+        Devuelve los trabajos de un render que no terminó, para continuarlos con
+        start_render(); sus frames ya hechos no se vuelven a renderizar.
+        """
+        from QueueJournal import QueueJournal
+        journal = QueueJournal(db_path)
+        state = journal.load()
+        if state is not None:
+            self.load_dict(state)
+        self.journal = journal
+        self.attach_journal()
+        if state is None:
+            journal.replace(self.to_dict())
+            return []
+        return [self.queue[job_id] for job_id in journal.interrupted_jobs() if job_id in self.queue]
+
+    def attach_journal(self):
+        from functools import partial
+        self.queue.listener = partial(self.journal.record, "queue", self.queue)
+        self.loaded_files.listener = partial(self.journal.record, "loaded_files", self.loaded_files)
+
+    def refresh_file_metadata(self):
+        """
+        Actualiza la lista de cámaras de los archivos cargados y en cola. Solo se vuelven
+        a leer con Blender los .blend que cambiaron desde que se guardaron en la caché.
+        """
+        items = list(self.loaded_files) + list(self.queue)
+        blend_files = list(dict.fromkeys(item["file"] for item in items if os.path.exists(item["file"])))
+        metadata = self.probe_blend_files(blend_files)
+        for item in items:
+            cameras = metadata.get(item["file"], {}).get("cameras")
+            if cameras:
+                item["cameras"] = cameras
+        self.notify_observers()
+
     def sort_queue(self, sort_by):
         if sort_by == "File Name":
             self.queue.sort(key=lambda item: os.path.basename(item["file"]))
@@ -317,6 +965,8 @@ class RenderQueueModel:
             self.queue.sort(key=lambda item: item["format"])
         elif sort_by == "Resolution":
             self.queue.sort(key=lambda item: item["resolution"])
+        elif sort_by == "Priority":
+            self.queue.sort(key=lambda item: -int(item.get("priority") or 0))
         self.notify_observers()
 
     def filter_loaded_files(self, filter_text):
@@ -329,23 +979,32 @@ class RenderQueueModel:
             if filter_text in os.path.basename(file["file"]).lower()
         ]
 
-    def send_alerts(self):
-        print("Sending alerts...")
-
-        if True:
-            sender_email = "your_email@example.com"
-            sender_password = "your_password"
-            receiver_email = "receiver_email@example.com"
-
-            message = MIMEText("The rendering is done!")
-            message["Subject"] = "Render Complete"
-            message["From"] = sender_email
-            message["To"] = receiver_email
-
+    def get_alert_dispatcher(self):
+        """Crea el AlertDispatcher con los destinos configurados la primera vez que hace falta."""
+        if self.alert_dispatcher is None and self.alert_config_error is None:
+            from AlertDispatcher import build_alert_dispatcher, load_alert_settings
             try:
-                with smtplib.SMTP_SSL("smtp.example.com", 465) as server:
-                    server.login(sender_email, sender_password)
-                    server.send_message(message)
-                    print("Alerta de correo enviada correctamente")
-            except Exception as e:
-                print(f"Error sending email alert: {e}")
\ No newline at end of file
+                if self.alerts is None:
+                    self.alerts = load_alert_settings(self.alerts_path)
+                self.alert_dispatcher = build_alert_dispatcher(self.alerts)
+            except (OSError, ValueError, TypeError) as e:
+                self.alert_config_error = str(e)
+                self.notify_observers("error", f"Invalid alert configuration: {e}")
+                return None
+            if self.alert_dispatcher is None:
+                print("Custom alerts are enabled but no alert target (smtp, webhook or file) is configured")
+        return self.alert_dispatcher
+
+    def post_alert(self, kind, message):
+        """Encola una alerta; el envío se hace en el hilo del dispatcher, nunca en el del render."""
+        if not self.use_custom_alerts:
+            return
+        dispatcher = self.get_alert_dispatcher()
+        if dispatcher is not None:
+            dispatcher.post(kind, message)
+
+    def close_alerts(self, timeout=30):
+        """Envía las alertas pendientes y cierra las conexiones (al salir de la aplicación o antes de apagar)."""
+        dispatcher, self.alert_dispatcher = self.alert_dispatcher, None
+        if dispatcher is not None:
+            dispatcher.close(timeout)
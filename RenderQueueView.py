@@ -3,6 +3,7 @@ from tkinter import filedialog, messagebox, ttk
 import os
 from SettingsFrame import SettingsFrame
 from TreeviewsFrame import TreeviewsFrame
+from RenderEstimator import format_duration
 
 class RenderQueueView:
     def __init__(self, root, controller):
@@ -150,6 +151,9 @@ class RenderQueueView:
         self.ram_label = tk.Label(self.monitoring_frame, text="RAM Usage: 0%", bg=self.label_bg_color, fg=self.label_fg_color)
         self.ram_label.pack(side="left", padx=10, pady=5)
 
+        self.eta_label = tk.Label(self.monitoring_frame, text="Time Left: -", bg=self.label_bg_color, fg=self.label_fg_color)
+        self.eta_label.pack(side="left", padx=10, pady=5)
+
         # Configurar el redimensionamiento de las columnas
         self.root.grid_rowconfigure(0, weight=0)
         self.root.grid_rowconfigure(1, weight=0)
@@ -163,27 +167,33 @@ class RenderQueueView:
         self.cpu_label.config(text=f"CPU Usage: {cpu_percent:.1f}%")
         self.ram_label.config(text=f"RAM Usage: {ram_percent:.1f}%")
 
+    def update_eta_label(self, queue_eta=None, fps=0.0):
+        if queue_eta is None:
+            self.eta_label.config(text="Time Left: -")
+        else:
+            self.eta_label.config(text=f"Time Left: {format_duration(queue_eta)} ({fps:.2f} fps)")
+
     def remove_file(self):
-        selected_items = list(self.treeviews_frame.selected_loaded_files)
-        for item_id in selected_items:
-            index = self.treeviews_frame.loaded_files_tree.index(item_id)
-            self.controller.remove_file(index)
-            self.treeviews_frame.loaded_files_tree.delete(item_id)
-            self.treeviews_frame.selected_loaded_files.remove(item_id)
-
-    def show_preview(self, image_path):
-            """Muestra la imagen de previsualización."""
+        # Las filas de los árboles usan el id del trabajo como iid
+        job_ids = list(self.treeviews_frame.selected_loaded_files)
+        self.treeviews_frame.loaded_files_sync.clear_selection()
+        for job_id in job_ids:
+            self.controller.remove_file(job_id)
+
+    def show_preview(self, image_path, image=None, error=None):
+            """Muestra la previsualización; image es la miniatura de PIL ya reducida por el PreviewThumbnailer."""
             try:
+                if error:
+                    raise ValueError(error)
                 if image_path.lower().endswith('.mp4'):
                     # Si es un video, muestra un mensaje o un ícono representativo
                     self.preview_label.config(text="Video Preview\n(Click to open)", cursor="hand2")
                     self.preview_label.bind("<Button-1>", lambda e: os.startfile(image_path))
                     self.preview_label.image = None  # Limpia cualquier imagen anterior
                 else:
-                    # Si es una imagen, intenta mostrarla
-                    img = Image.open(image_path)
-                    img.thumbnail((200, 200))  # Ajusta el tamaño de la vista previa
-                    photo = ImageTk.PhotoImage(img)
+                    # En el hilo de Tk solo se crea el PhotoImage de la miniatura
+                    from PIL import ImageTk
+                    photo = ImageTk.PhotoImage(image)
                     self.preview_label.config(image=photo, text="")
                     self.preview_label.image = photo
                     self.preview_label.bind("<Button-1>", lambda e: os.startfile(image_path))
@@ -199,15 +209,15 @@ class RenderQueueView:
 
         selected_queue = [
             item
-            for i, item in enumerate(self.controller.model.queue)
-            if self.treeviews_frame.queue_tree.get_children()[i] in self.treeviews_frame.selected_items
+            for item in self.controller.model.queue
+            if item["id"] in self.treeviews_frame.selected_items
         ]
         print("Selected queue:", selected_queue)
         if not selected_queue:
             messagebox.showerror("Error", "No items selected for rendering!")
             return
 
-        self.controller.start_render(selected_queue, self.progress_bar)
+        self.controller.start_render(selected_queue)
 
     def stop_render(self):
         print("Stop Render button clicked")
@@ -218,19 +228,16 @@ class RenderQueueView:
             messagebox.showerror("Error", "No files selected to add to the render queue.")
             return
 
-        for item_id in list(self.treeviews_frame.selected_loaded_files):
-            index = self.treeviews_frame.loaded_files_tree.index(item_id)
-            self.controller.add_to_queue(index)
-
-        self.treeviews_frame.selected_loaded_files.clear()  # Limpiar la lista después de añadir a la cola
-        for item in self.treeviews_frame.loaded_files_tree.get_children():
-            self.treeviews_frame.loaded_files_tree.item(item, tags=[]) # Quitar el tag "selected" de los items
+        job_ids = list(self.treeviews_frame.selected_loaded_files)
+        self.treeviews_frame.loaded_files_sync.clear_selection()  # Quitar el tag "selected" antes de que las filas pasen a la cola
+        for job_id in job_ids:
+            self.controller.add_to_queue(job_id)
     
     def remove_from_render_queue(self):
-        selected_items = list(self.treeviews_frame.selected_items)
-        for item_id in selected_items:
-            index = self.treeviews_frame.queue_tree.index(item_id)
-            self.controller.remove_from_queue(index)
+        job_ids = list(self.treeviews_frame.selected_items)
+        self.treeviews_frame.queue_sync.clear_selection()
+        for job_id in job_ids:
+            self.controller.remove_from_queue(job_id)
 
     def save_config(self):
         self.controller.save_config()
@@ -239,38 +246,17 @@ class RenderQueueView:
         self.controller.load_config()
         
     def update_loaded_files_tree(self, loaded_files):
-        self.treeviews_frame.loaded_files_tree.delete(*self.treeviews_frame.loaded_files_tree.get_children())
-        for item in loaded_files:
-            self.treeviews_frame.loaded_files_tree.insert("", tk.END, values=(os.path.basename(item["file"]),))
+        self.treeviews_frame.loaded_files_sync.sync(loaded_files)
 
     def update_queue_tree(self, queue):
-        self.treeviews_frame.queue_tree.delete(*self.treeviews_frame.queue_tree.get_children())
-        for item in queue:
-            progress = item.get("progress", 0)
-            self.treeviews_frame.queue_tree.insert(
-                "",
-                tk.END,
-                values=(
-                    os.path.basename(item["file"]),
-                    item["start_frame"],
-                    item["end_frame"],
-                    item["output_path"],
-                    item["selected_camera"],
-                    item["format"],
-                    item["resolution"],
-                    f"{progress}%",
-                ),
-            )
-
-    def update_progress_bar(self, index, progress):
-        item_id = self.queue_tree.get_children()[index] # <--- Modificar esta linea
-        values = list(self.queue_tree.item(item_id, "values"))
-        values[-1] = f"{progress}%"
-        self.queue_tree.item(item_id, values=values) # <--- Modificar esta linea
+        self.treeviews_frame.queue_sync.sync(queue)
+
+    def update_progress_bar(self, item):
+        self.treeviews_frame.queue_sync.update_item(item)
         
-    def update_settings_from_loaded_files(self, index):
-        if index < len(self.controller.model.loaded_files):
-            item = self.controller.model.loaded_files[index]
+    def update_settings_from_loaded_files(self, job_id):
+        item = self.controller.model.loaded_files.get(job_id)
+        if item is not None:
             self.settings_frame.camera_dropdown["values"] = item["cameras"]
             self.settings_frame.camera_var.set(item["selected_camera"])
             self.settings_frame.frame_start_var.set(item["start_frame"])
@@ -298,4 +284,6 @@ class RenderQueueView:
                 self.settings_frame.output_file_name_var.set(item["output_file_name"])
             else:
                  self.settings_frame.output_file_name_var.set("")
+            self.settings_frame.priority_var.set(item.get("priority", 0))
+            self.settings_frame.deadline_var.set(item.get("deadline") or "")
             self.settings_frame.update_output_preview()
\ No newline at end of file
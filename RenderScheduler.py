@@ -0,0 +1,166 @@
+import os
+import heapq
+import datetime
+from collections import deque
+from itertools import count
+
+# Segundos por frame a 1920x1080 cuando todavía no se ha renderizado nada del archivo
+ENGINE_FRAME_COST = {
+    "CYCLES": 60.0,
+    "BLENDER_EEVEE": 6.0,
+    "BLENDER_EEVEE_NEXT": 6.0,
+    "BLENDER_WORKBENCH": 1.0,
+}
+DEFAULT_FRAME_COST = 60.0
+REFERENCE_PIXELS = 1920 * 1080
+
+SCHEDULE_POLICIES = ("fifo", "sjf", "fair")
+
+def estimate_frame_cost(item):
+    """
+    Segundos estimados por frame. Si el archivo ya se renderizó se usa el tiempo medio
+    medido (avg_frame_time); si no, un valor por motor escalado por la resolución.
+    """
+    if item.get("avg_frame_time"):
+        return float(item["avg_frame_time"])
+    cost = ENGINE_FRAME_COST.get(str(item.get("render_engine", "")).upper(), DEFAULT_FRAME_COST)
+    try:
+        width, height = (int(value) for value in str(item.get("resolution", "")).lower().split("x"))
+        cost *= (width * height) / REFERENCE_PIXELS
+    except ValueError:
+        pass
+    return cost
+
+def parse_deadline(deadline):
+    """Convierte la fecha límite de un trabajo ('YYYY-MM-DD HH:MM' o ISO) a timestamp, o None."""
+    if deadline in (None, ""):
+        return None
+    if isinstance(deadline, (int, float)):
+        return float(deadline)
+    return datetime.datetime.fromisoformat(str(deadline).strip()).timestamp()
+
+class RenderScheduler:
+    """
+    Decide qué chunk renderiza cada worker libre.
+
+    - Gana siempre el trabajo con más prioridad (item["priority"], 0 por defecto).
+    - Un trabajo con fecha límite (item["deadline"]) que ya no llega a tiempo si espera
+      más de deadline_window segundos pasa delante de los de su misma prioridad.
+    - Entre trabajos de igual prioridad decide la política:
+        fifo: orden de la cola.
+        sjf:  primero el trabajo con menos coste estimado (frames * segundos por frame),
+              así un render corto no espera detrás de uno de toda la noche.
+        fair: reparte el tiempo entre archivos .blend (o proyectos, con share_key="project")
+              eligiendo el grupo que menos coste estimado ha consumido hasta ahora.
+
+    Los chunks de un mismo trabajo salen siempre en orden de frames. Cada grupo guarda
+    un heap de trabajos, así elegir el siguiente chunk no recorre toda la cola.
+    """
+
+    def __init__(self, policy="fifo", share_key="file", deadline_window=3600, clock=None):
+        if policy not in SCHEDULE_POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.policy = policy
+        self.share_key = share_key
+        self.deadline_window = deadline_window
+        self.clock = clock or (lambda: datetime.datetime.now().timestamp())
+        self.groups = {}  # grupo -> heap de (clave, entrada)
+        self.usage = {}  # grupo -> coste estimado ya repartido
+        self.deadlines = []  # heap de (fecha límite, orden, entrada)
+        self.entries = {}
+        self.sequence = count()
+        self.pending_chunks = 0
+
+    def __len__(self):
+        return self.pending_chunks
+
+    def group_for(self, item):
+        if self.policy != "fair":
+            return ""
+        if self.share_key == "project":
+            return item.get("project") or os.path.dirname(item["file"])
+        return item.get(self.share_key, "")
+
+    def add(self, chunk):
+        item = chunk["item"]
+        entry = self.entries.get(chunk["job_id"])
+        if entry is None:
+            entry = {
+                "item": item,
+                "chunks": deque(),
+                "order": next(self.sequence),
+                "priority": int(item.get("priority") or 0),
+                "deadline": parse_deadline(item.get("deadline")),
+                "frame_cost": estimate_frame_cost(item),
+                "group": self.group_for(item),
+            }
+            self.entries[chunk["job_id"]] = entry
+        entry["chunks"].append(chunk)
+        self.pending_chunks += 1
+
+    def extend(self, chunks):
+        for chunk in chunks:
+            self.add(chunk)
+        self.build()
+
+    def remaining_cost(self, entry):
+        return sum(len(chunk["frames"]) for chunk in entry["chunks"]) * entry["frame_cost"]
+
+    def build(self):
+        """Ordena los trabajos añadidos. Las claves se calculan una vez por trabajo."""
+        self.groups = {}
+        self.deadlines = []
+        for entry in self.entries.values():
+            if not entry["chunks"]:
+                continue
+            if self.policy == "sjf":
+                policy_key = self.remaining_cost(entry)
+            else:
+                policy_key = entry["order"]
+            key = (-entry["priority"], policy_key, entry["order"])
+            self.groups.setdefault(entry["group"], []).append((key, entry["order"], entry))
+            self.usage.setdefault(entry["group"], 0.0)
+            if entry["deadline"] is not None:
+                self.deadlines.append((entry["deadline"], entry["order"], entry))
+        for heap in self.groups.values():
+            heapq.heapify(heap)
+        heapq.heapify(self.deadlines)
+
+    def _top(self, heap):
+        # Los trabajos sin chunks se quitan al llegar arriba del heap
+        while heap and not heap[0][-1]["chunks"]:
+            heapq.heappop(heap)
+        return heap[0][-1] if heap else None
+
+    def _best_by_policy(self):
+        best = None
+        best_key = None
+        for group, heap in self.groups.items():
+            entry = self._top(heap)
+            if entry is None:
+                continue
+            # En fair share el grupo con menos uso gana entre trabajos de igual prioridad
+            key = (-entry["priority"], self.usage[group] if self.policy == "fair" else 0, heap[0][0])
+            if best_key is None or key < best_key:
+                best, best_key = entry, key
+        return best
+
+    def _urgent(self):
+        entry = self._top(self.deadlines)
+        if entry is None:
+            return None
+        slack = entry["deadline"] - self.clock() - self.remaining_cost(entry)
+        return entry if slack <= self.deadline_window else None
+
+    def next_chunk(self):
+        """Saca el siguiente chunk a renderizar, o None si no queda ninguno."""
+        entry = self._best_by_policy()
+        if entry is None:
+            return None
+        urgent = self._urgent()
+        if urgent is not None and urgent["priority"] >= entry["priority"]:
+            entry = urgent
+        chunk = entry["chunks"].popleft()
+        self.pending_chunks -= 1
+        self.usage[entry["group"]] += len(chunk["frames"]) * entry["frame_cost"]
+        return chunk
@@ -0,0 +1,120 @@
+import asyncio
+from collections import deque
+from threading import Thread, Lock
+
+# Límite de longitud de línea para stdout/stderr de Blender (el de asyncio es 64 KB)
+STREAM_LIMIT = 1024 * 1024
+
+class JobHandle:
+    """
+    Referencia a un trabajo que corre en el bucle del supervisor. Se puede esperar con
+    await desde el propio bucle, bloquear con result() desde otro hilo o cancelar.
+    """
+
+    def __init__(self, future, name=""):
+        self.future = future
+        self.name = name
+
+    def __await__(self):
+        return asyncio.wrap_future(self.future).__await__()
+
+    def cancel(self):
+        return self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+class RenderSupervisor:
+    """
+    Bucle de asyncio en un hilo propio que lanza y vigila los procesos de Blender.
+    Todos los procesos hijos comparten el mismo bucle, y stdout y stderr se leen a la
+    vez para que un stderr muy largo no llene la tubería y bloquee a Blender.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.lock = Lock()
+
+    def start(self):
+        with self.lock:
+            if self.loop is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            self.thread = Thread(target=self._run_loop, name="RenderSupervisor", daemon=True)
+            self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine, name=""):
+        """Programa una corrutina en el bucle del supervisor y devuelve su JobHandle."""
+        self.start()
+        return JobHandle(asyncio.run_coroutine_threadsafe(coroutine, self.loop), name)
+
+    async def run_process(self, command, on_stdout_line=None, on_stderr_line=None, env=None, on_start=None):
+        """
+        Ejecuta un proceso leyendo stdout y stderr en paralelo. Cada línea se pasa al
+        callback correspondiente; si on_stdout_line devuelve False se termina el proceso.
+        on_start recibe el PID en cuanto el proceso arranca.
+        Si la tarea se cancela, el proceso se termina antes de propagar la cancelación.
+        Devuelve (returncode, últimas líneas de stderr).
+        """
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            limit=STREAM_LIMIT,
+        )
+        if on_start is not None:
+            on_start(process.pid)
+        stderr_tail = deque(maxlen=200)
+
+        async def read_stdout():
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    return
+                if on_stdout_line is not None and on_stdout_line(line.decode("utf-8", errors="replace")) is False:
+                    terminate_process(process)
+                    return
+
+        async def read_stderr():
+            while True:
+                line = await process.stderr.readline()
+                if not line:
+                    return
+                text = line.decode("utf-8", errors="replace")
+                stderr_tail.append(text)
+                if on_stderr_line is not None:
+                    on_stderr_line(text)
+
+        try:
+            await asyncio.gather(read_stdout(), read_stderr())
+            returncode = await process.wait()
+        except asyncio.CancelledError:
+            terminate_process(process)
+            await asyncio.shield(process.wait())
+            raise
+        return returncode, "".join(stderr_tail)
+
+    def stop(self):
+        with self.lock:
+            if self.loop is None:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+            self.loop = None
+            self.thread = None
+
+def terminate_process(process):
+    if process.returncode is None:
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            pass
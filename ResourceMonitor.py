@@ -0,0 +1,96 @@
+import time
+from threading import Lock
+
+class ResourceMonitor:
+    """
+    Lecturas de CPU y RAM de la máquina (con psutil) compartidas entre el panel de
+    recursos de la interfaz y el control de admisión de los workers de render.
+
+    Antes de lanzar otro Blender, admit() comprueba que quede margen de CPU y que la RAM
+    libre, descontando lo reservado para los trabajos que aún están cargando, alcance
+    para la memoria que ese trabajo usó en sus frames más recientes (ver
+    MemoryTelemetry) y deje al menos min_free_memory_mb libres. Así dos
+    escenas pesadas de Cycles no arrancan a la vez hasta que el sistema las mata.
+
+    Sin psutil no hay lecturas: sample() devuelve None y se admite todo.
+    """
+
+    def __init__(self, min_free_memory_mb=1024, max_cpu_percent=100, default_job_memory_mb=0, max_age=0.5):
+        self.min_free_memory_mb = min_free_memory_mb
+        self.max_cpu_percent = max_cpu_percent
+        self.default_job_memory_mb = default_job_memory_mb
+        self.max_age = max_age
+        self.reserved = {}  # chunk -> MB reservados hasta que el trabajo empiece a renderizar
+        self.lock = Lock()
+        self.last_sample = None
+        self.last_sample_time = 0
+        self.psutil = None
+        self.available = True
+
+    def sample(self):
+        """
+        Devuelve {"cpu_percent", "memory_percent", "available_mb"} o None sin psutil.
+        Las lecturas se reutilizan durante max_age segundos: cpu_percent() mide desde la
+        llamada anterior y varios lectores seguidos se quitarían el intervalo entre sí.
+        """
+        with self.lock:
+            if not self.available:
+                return None
+            now = time.monotonic()
+            if self.last_sample is not None and now - self.last_sample_time < self.max_age:
+                return self.last_sample
+            if self.psutil is None:
+                try:
+                    import psutil
+                except ImportError:
+                    print("psutil is not installed, resource monitoring and admission control disabled")
+                    self.available = False
+                    return None
+                self.psutil = psutil
+            memory = self.psutil.virtual_memory()
+            self.last_sample = {
+                "cpu_percent": self.psutil.cpu_percent(),
+                "memory_percent": memory.percent,
+                "available_mb": memory.available / (1024 * 1024),
+            }
+            self.last_sample_time = now
+            return self.last_sample
+
+    def expected_memory_mb(self, item):
+        # Ventana reciente (p95 de los últimos frames, RSS de este render); el pico histórico solo si no hay otra cosa
+        recent = max(float(item.get("memory_p95_mb") or 0), float(item.get("process_peak_mb") or 0))
+        return recent or float(item.get("peak_memory_mb") or self.default_job_memory_mb)
+
+    def admit(self, item, running):
+        """
+        (True, "") si se puede lanzar un worker para el item con running workers ya en
+        marcha, o (False, motivo). Con ningún worker en marcha siempre se admite, para
+        que la cola avance aunque el trabajo no quepa en la RAM libre.
+        """
+        if running == 0:
+            return True, ""
+        sample = self.sample()
+        if sample is None:
+            return True, ""
+        if sample["cpu_percent"] > self.max_cpu_percent:
+            return False, f"CPU at {sample['cpu_percent']:.0f}% (limit {self.max_cpu_percent}%)"
+        with self.lock:
+            reserved = sum(self.reserved.values())
+        needed = self.expected_memory_mb(item)
+        free_after = sample["available_mb"] - reserved - needed
+        if free_after < self.min_free_memory_mb:
+            return False, (
+                f"{sample['available_mb']:.0f} MB free, {reserved:.0f} MB reserved, job needs {needed:.0f} MB "
+                f"(keeping {self.min_free_memory_mb} MB free)"
+            )
+        return True, ""
+
+    def reserve(self, key, item):
+        """Reserva la memoria esperada del trabajo mientras Blender carga la escena."""
+        with self.lock:
+            self.reserved[key] = self.expected_memory_mb(item)
+
+    def release(self, key):
+        """Libera la reserva: la memoria ya aparece como usada en las lecturas del sistema."""
+        with self.lock:
+            self.reserved.pop(key, None)
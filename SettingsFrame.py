@@ -50,9 +50,18 @@ class SettingsFrame(tk.LabelFrame):
         self.frame_end_var = tk.IntVar(value=250)
         self.render_engine_var = tk.StringVar(value="CYCLES")
         self.render_threads_var = tk.StringVar(value="Auto")
+        self.max_workers_var = tk.IntVar(value=1)
+        self.chunk_size_var = tk.IntVar(value=0)
+        self.min_free_memory_var = tk.IntVar(value=1024)
+        self.max_cpu_percent_var = tk.IntVar(value=100)
         self.output_format_var = tk.StringVar()
         self.output_file_name_var = tk.StringVar()
         self.use_custom_alerts_var = tk.BooleanVar(value=False)
+        self.use_daemon_var = tk.BooleanVar(value=False)
+        self.resume_renders_var = tk.BooleanVar(value=False)
+        self.priority_var = tk.IntVar(value=0)
+        self.deadline_var = tk.StringVar()
+        self.schedule_policy_var = tk.StringVar(value="FIFO")
 
         current_row = 1  # Empezamos en la fila 1 después del título "Output Settings"
         self.create_setting_entry("File Name Prefix:", self.file_prefix_var, current_row)
@@ -102,6 +111,20 @@ class SettingsFrame(tk.LabelFrame):
         current_row += 1
         self.create_setting_entry("Render Threads:", self.render_threads_var, current_row)
         current_row += 1
+        self.create_setting_entry("Parallel Workers:", self.max_workers_var, current_row, entry_type="int")
+        current_row += 1
+        self.create_setting_entry("Frames per Chunk:", self.chunk_size_var, current_row, entry_type="int")
+        current_row += 1
+        self.create_setting_entry("Min Free RAM (MB):", self.min_free_memory_var, current_row, entry_type="int")
+        current_row += 1
+        self.create_setting_entry("Max CPU Load (%):", self.max_cpu_percent_var, current_row, entry_type="int")
+        current_row += 1
+        self.create_setting_entry("Priority:", self.priority_var, current_row, entry_type="int")
+        current_row += 1
+        self.create_setting_entry("Deadline:", self.deadline_var, current_row)
+        current_row += 1
+        self.create_setting_entry("Scheduling:", self.schedule_policy_var, current_row)
+        current_row += 1
 
         # Checkbox para apagar la PC al finalizar
         self.shutdown_var = tk.BooleanVar(value=False)
@@ -118,6 +141,14 @@ class SettingsFrame(tk.LabelFrame):
         self.use_custom_alerts_check = tk.Checkbutton(self, text="Use Custom Alerts", variable=self.use_custom_alerts_var, bg=self.bg_color, fg=self.fg_color, selectcolor=self.bg_color)
         self.use_custom_alerts_check.grid(row=current_row + 1, column=0, columnspan=2, sticky="w")
 
+        current_row += 1
+        self.use_daemon_check = tk.Checkbutton(self, text="Keep Blender Workers Warm", variable=self.use_daemon_var, bg=self.bg_color, fg=self.fg_color, selectcolor=self.bg_color)
+        self.use_daemon_check.grid(row=current_row + 1, column=0, columnspan=2, sticky="w")
+
+        current_row += 1
+        self.resume_renders_check = tk.Checkbutton(self, text="Resume (Skip Rendered Frames)", variable=self.resume_renders_var, bg=self.bg_color, fg=self.fg_color, selectcolor=self.bg_color)
+        self.resume_renders_check.grid(row=current_row + 1, column=0, columnspan=2, sticky="w")
+
     def create_output_format_buttons(self, row):
       # Frame para los botones de formato
       format_frame = tk.Frame(self, bg=self.bg_color)
@@ -146,6 +177,10 @@ class SettingsFrame(tk.LabelFrame):
             self.render_engine_dropdown = ttk.Combobox(self, textvariable=self.render_engine_var, state="readonly", width=27, font=entry_font)
             self.render_engine_dropdown["values"] = ["CYCLES", "BLENDER_EEVEE", "BLENDER_WORKBENCH"]
             entry = self.render_engine_dropdown
+        elif label_text == "Scheduling:":
+            self.schedule_policy_dropdown = ttk.Combobox(self, textvariable=variable, state="readonly", width=27, font=entry_font)
+            self.schedule_policy_dropdown["values"] = ["FIFO", "Shortest Job First", "Fair Share (File)", "Fair Share (Project)"]
+            entry = self.schedule_policy_dropdown
         else:
             entry = tk.Entry(self, textvariable=variable, width=25, bg=self.entry_bg_color, fg=self.entry_fg_color, font=entry_font)
 
@@ -204,9 +239,9 @@ class SettingsFrame(tk.LabelFrame):
         entry.bind('<FocusIn>', focus_in)
         entry.bind('<FocusOut>', focus_out)
     
-    def update_settings_from_loaded_files(self, index):
-        if index < len(self.controller.model.loaded_files):
-            item = self.controller.model.loaded_files[index]
+    def update_settings_from_loaded_files(self, job_id):
+        item = self.controller.model.loaded_files.get(job_id)
+        if item is not None:
             self.camera_dropdown["values"] = item["cameras"]
             self.camera_var.set(item["selected_camera"])
             self.frame_start_var.set(item["start_frame"])
@@ -234,6 +269,8 @@ class SettingsFrame(tk.LabelFrame):
                 self.output_file_name_var.set(item["output_file_name"])
             else:
                  self.output_file_name_var.set("")
+            self.priority_var.set(item.get("priority", 0))
+            self.deadline_var.set(item.get("deadline") or "")
             self.update_output_preview()
             
     def set_output_format(self, format):
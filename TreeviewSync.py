@@ -0,0 +1,176 @@
+class TreeviewSync:
+    """
+    Mantiene un ttk.Treeview igual a una lista de items aplicando solo los cambios:
+    inserta las filas nuevas, borra las que ya no están y actualiza las celdas que
+    cambiaron, en lugar de borrar y volver a crear todas las filas.
+
+    Cada item se identifica por key(item) y su fila usa esa clave como iid, así la
+    selección sigue siendo válida entre actualizaciones. Con más de virtual_threshold
+    items la tabla pasa a modo virtual: solo existen las filas de la ventana visible y
+    el scrollbar y la rueda del ratón mueven esa ventana sobre la lista. El tamaño de la
+    ventana se mide con la altura real de la tabla, que cambia al redimensionar.
+
+    Las filas seleccionadas que desaparecen de la lista (por ejemplo al filtrar) se
+    recuerdan y vuelven seleccionadas cuando la lista las vuelve a mostrar.
+    """
+
+    def __init__(self, tree, row_values, key=id, selected=None, virtual_threshold=2000):
+        self.tree = tree
+        self.row_values = row_values
+        self.key = key
+        self.selected = selected if selected is not None else set()
+        self.virtual_threshold = virtual_threshold
+        self.items = []
+        self.rows = {}  # iid -> valores mostrados
+        self.item_by_iid = {}
+        self.window_start = 0
+        self.visible_rows = None  # Filas que caben en la altura actual; se mide en <Configure>
+        self.hidden_selected = set()
+        self.scrollbar = None
+
+        self.tree.tag_configure("selected")
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel, add="+")
+        self.tree.bind("<Button-4>", lambda event: self.scroll_window(-3), add="+")
+        self.tree.bind("<Button-5>", lambda event: self.scroll_window(3), add="+")
+        self.tree.bind("<Configure>", self.on_configure, add="+")
+
+    def attach_scrollbar(self, scrollbar):
+        self.scrollbar = scrollbar
+        scrollbar.configure(command=self.yview)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
+
+    def iid(self, item):
+        return str(self.key(item))
+
+    def item_for(self, iid):
+        return self.item_by_iid.get(iid)
+
+    @property
+    def virtual(self):
+        return len(self.items) > self.virtual_threshold
+
+    def window_size(self):
+        if self.visible_rows:
+            return self.visible_rows
+        # Antes de que la tabla se muestre: su altura nominal en filas
+        return max(1, int(self.tree.cget("height")))
+
+    def measure_rows(self, height):
+        """Filas completas que caben en height píxeles, medidas con la primera fila visible."""
+        children = self.tree.get_children()
+        if not children:
+            return None
+        bbox = self.tree.bbox(children[0])
+        if not bbox:
+            return None
+        _, top, _, row_height = bbox
+        return max(1, (height - top) // max(1, row_height))
+
+    def on_configure(self, event):
+        rows = self.measure_rows(event.height)
+        if rows and rows != self.visible_rows:
+            self.visible_rows = rows
+            if self.virtual:
+                self.sync(self.items)
+
+    def tags_for(self, iid):
+        return ["selected"] if iid in self.selected else []
+
+    def sync(self, items):
+        """Deja la tabla igual que la lista de items con el mínimo de cambios."""
+        self.items = list(items)
+        self.item_by_iid = {self.iid(item): item for item in self.items}
+        if self.virtual:
+            self.window_start = max(0, min(self.window_start, len(self.items) - self.window_size()))
+            visible = self.items[self.window_start:self.window_start + self.window_size()]
+        else:
+            self.window_start = 0
+            visible = self.items
+
+        wanted = [self.iid(item) for item in visible]
+        wanted_set = set(wanted)
+        removed = [iid for iid in self.rows if iid not in wanted_set]
+        if removed:
+            self.tree.delete(*removed)
+            for iid in removed:
+                del self.rows[iid]
+        # La selección de las filas ocultas se guarda aparte (se modifica el mismo set, que comparte la vista)
+        hidden = self.selected.difference(self.item_by_iid)
+        if hidden:
+            self.selected.difference_update(hidden)
+            self.hidden_selected.update(hidden)
+        shown_again = self.hidden_selected.intersection(self.item_by_iid)
+        if shown_again:
+            self.hidden_selected.difference_update(shown_again)
+            self.selected.update(shown_again)
+
+        for position, item in enumerate(visible):
+            iid = wanted[position]
+            values = tuple(self.row_values(item))
+            if iid not in self.rows:
+                self.tree.insert("", position, iid=iid, values=values, tags=self.tags_for(iid))
+                self.rows[iid] = values
+            elif self.rows[iid] != values:
+                self.tree.item(iid, values=values)
+                self.rows[iid] = values
+
+        if list(self.tree.get_children()) != wanted:
+            # Reordenar en una sola llamada a Tk (por ejemplo después de ordenar la cola)
+            self.tree.set_children("", *wanted)
+        self.update_scrollbar()
+
+    def update_item(self, item):
+        """Actualiza solo la fila de un item, si está visible."""
+        iid = self.iid(item)
+        if iid not in self.rows:
+            return
+        values = tuple(self.row_values(item))
+        if self.rows[iid] != values:
+            self.tree.item(iid, values=values)
+            self.rows[iid] = values
+
+    def set_selected(self, iid, selected):
+        if selected:
+            self.selected.add(iid)
+        else:
+            self.selected.discard(iid)
+        if iid in self.rows:
+            self.tree.item(iid, tags=self.tags_for(iid))
+
+    def clear_selection(self):
+        for iid in list(self.selected):
+            self.set_selected(iid, False)
+
+    def scroll_window(self, rows):
+        if not self.virtual:
+            self.tree.yview_scroll(rows, "units")
+            return "break"
+        start = max(0, min(self.window_start + rows, len(self.items) - self.window_size()))
+        if start != self.window_start:
+            self.window_start = start
+            self.sync(self.items)
+        return "break"
+
+    def on_mouse_wheel(self, event):
+        return self.scroll_window(-3 if event.delta > 0 else 3)
+
+    def yview(self, *args):
+        """Comando del scrollbar: en modo virtual mueve la ventana de filas materializadas."""
+        if not self.virtual:
+            return self.tree.yview(*args)
+        if args[0] == "moveto":
+            self.window_start = int(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            step = self.window_size() if args[2] == "pages" else 1
+            self.window_start += int(args[1]) * step
+        self.sync(self.items)
+
+    def on_tree_scroll(self, first, last):
+        if self.scrollbar is not None and not self.virtual:
+            self.scrollbar.set(first, last)
+
+    def update_scrollbar(self):
+        if self.scrollbar is None or not self.virtual:
+            return
+        total = len(self.items)
+        self.scrollbar.set(self.window_start / total, (self.window_start + self.window_size()) / total)
@@ -1,6 +1,10 @@
 import tkinter as tk
 from tkinter import ttk
 import os
+from TreeviewSync import TreeviewSync
+from operator import itemgetter
+from RenderEstimator import format_duration
+from MemoryTelemetry import format_memory
 
 class TreeviewsFrame(tk.Frame):
     def __init__(self, parent, controller, bg_color, fg_color, entry_bg_color, entry_fg_color):
@@ -29,14 +33,16 @@ class TreeviewsFrame(tk.Frame):
         self.filter_var.trace("w", lambda name, index, mode: self.controller.filter_loaded_files(self.filter_var.get()))
 
         # Scrollbar para el Treeview de archivos cargados
-        loaded_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.loaded_files_tree.yview)
+        loaded_scrollbar = ttk.Scrollbar(self, orient="vertical")
         loaded_scrollbar.grid(row=0, column=2, sticky="ns")
-        self.loaded_files_tree.configure(yscrollcommand=loaded_scrollbar.set)
+        # Las filas se actualizan por diferencias en lugar de reconstruirse enteras
+        self.loaded_files_sync = TreeviewSync(self.loaded_files_tree, self.loaded_file_row, key=itemgetter("id"), selected=self.selected_loaded_files)
+        self.loaded_files_sync.attach_scrollbar(loaded_scrollbar)
 
         # Treeview para la cola de render
         self.queue_tree = ttk.Treeview(
             self,
-            columns=("File", "Start", "End", "Output", "Camera", "Format", "Resolution", "Progress"),
+            columns=("File", "Start", "End", "Output", "Camera", "Format", "Resolution", "Progress", "ETA", "Memory"),
             show="headings",
         )
         self.queue_tree.heading("File", text="File")
@@ -47,6 +53,8 @@ class TreeviewsFrame(tk.Frame):
         self.queue_tree.heading("Format", text="Format")
         self.queue_tree.heading("Resolution", text="Resolution")
         self.queue_tree.heading("Progress", text="Progress")
+        self.queue_tree.heading("ETA", text="Time Left")
+        self.queue_tree.heading("Memory", text="Peak Memory")
         for col in (
             "File",
             "Start",
@@ -56,15 +64,18 @@ class TreeviewsFrame(tk.Frame):
             "Format",
             "Resolution",
             "Progress",
+            "ETA",
+            "Memory",
         ):
             self.queue_tree.column(col, anchor="center", stretch=True)
         self.queue_tree.grid(row=1, column=0, sticky="nsew", columnspan=2)
         self.queue_tree.bind("<Button-1>", self.on_tree_click)
 
         # Scrollbar para el Treeview de la cola de render
-        queue_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.queue_tree.yview)
+        queue_scrollbar = ttk.Scrollbar(self, orient="vertical")
         queue_scrollbar.grid(row=1, column=2, sticky="ns")
-        self.queue_tree.configure(yscrollcommand=queue_scrollbar.set)
+        self.queue_sync = TreeviewSync(self.queue_tree, self.queue_row, key=itemgetter("id"), selected=self.selected_items)
+        self.queue_sync.attach_scrollbar(queue_scrollbar)
 
         # Configurar el redimensionamiento de los Treeviews y su frame
         self.grid_rowconfigure(0, weight=1)
@@ -80,50 +91,44 @@ class TreeviewsFrame(tk.Frame):
         self.queue_menu.add_command(label="Sort by Camera", command=lambda: self.controller.sort_queue("Camera"))
         self.queue_menu.add_command(label="Sort by Format", command=lambda: self.controller.sort_queue("Format"))
         self.queue_menu.add_command(label="Sort by Resolution", command=lambda: self.controller.sort_queue("Resolution"))
+        self.queue_menu.add_command(label="Sort by Priority", command=lambda: self.controller.sort_queue("Priority"))
         self.queue_tree.bind("<Button-3>", self.show_queue_menu)
 
+    def loaded_file_row(self, item):
+        return (os.path.basename(item["file"]),)
+
+    def queue_row(self, item):
+        return (
+            os.path.basename(item["file"]),
+            item["start_frame"],
+            item["end_frame"],
+            item["output_path"],
+            item["selected_camera"],
+            item["format"],
+            item["resolution"],
+            f"{item.get('progress', 0)}%",
+            format_duration(item.get("eta")),
+            format_memory(item.get("peak_memory_mb")),
+        )
+
     def on_loaded_files_tree_click(self, event):
         region = self.loaded_files_tree.identify_region(event.x, event.y)
         if region == "cell":
             item_id = self.loaded_files_tree.identify_row(event.y)
             if item_id:
-                if item_id in self.selected_loaded_files:
-                    self.selected_loaded_files.remove(item_id)
-                    self.loaded_files_tree.item(item_id, tags=[])
-                else:
-                    self.selected_loaded_files.add(item_id)
-                    self.loaded_files_tree.item(item_id, tags=["selected"])
-
                 self.loaded_files_tree.tag_configure("selected", background=self.controller.view.treeview_selected_bg_color)
+                # Solo cambia la etiqueta de la fila pulsada
+                self.loaded_files_sync.set_selected(item_id, item_id not in self.selected_loaded_files)
 
-                for item in self.loaded_files_tree.get_children():
-                    if item in self.selected_loaded_files:
-                        self.loaded_files_tree.item(item, tags=["selected"])
-                    else:
-                        self.loaded_files_tree.item(item, tags=[])
-
-                index = self.loaded_files_tree.index(item_id)
-                self.controller.view.update_settings_from_loaded_files(index)
+                self.controller.view.update_settings_from_loaded_files(item_id)
 
     def on_tree_click(self, event):
         region = self.queue_tree.identify_region(event.x, event.y)
         if region == "cell":
             item_id = self.queue_tree.identify_row(event.y)
             if item_id:
-                if item_id in self.selected_items:
-                    self.selected_items.remove(item_id)
-                    self.queue_tree.item(item_id, tags=[])
-                else:
-                    self.selected_items.add(item_id)
-                    self.queue_tree.item(item_id, tags=["selected"])
-
                 self.queue_tree.tag_configure("selected", background=self.controller.view.treeview_selected_bg_color)
-
-                for item in self.queue_tree.get_children():
-                    if item in self.selected_items:
-                        self.queue_tree.item(item, tags=["selected"])
-                    else:
-                        self.queue_tree.item(item, tags=[])
+                self.queue_sync.set_selected(item_id, item_id not in self.selected_items)
 
     def show_queue_menu(self, event):
         self.queue_menu.post(event.x_root, event.y_root)
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""
+Benchmark de la cola sin interfaz, usando fake_blender.py en lugar de Blender:
+
+    python benchmark_queue.py                       # colas de 10, 1.000 y 100.000 items
+    python benchmark_queue.py --sizes 10,1000 --workers 4 --frames 2
+    python benchmark_queue.py --no-daemon --sizes 10 --frame-time 0.05
+    python benchmark_queue.py --json > resultados.json
+
+Por cada tamaño de cola mide:
+- trabajos por minuto y frames por segundo del RenderQueueModel de principio a fin,
+- latencia evento-interfaz: desde que fake_blender envía frame_done hasta que un
+  observador lo recibe a través del EventBus, drenado cada 50 ms como en Tk,
+- coste de leer el log: se pasan --log-parse-lines líneas sintéticas de Cycles por el
+  mismo camino que on_line (MemoryTelemetry.record_line, JobLog y la consola) y se da
+  la mediana de --repeats pasadas con su mínimo y máximo,
+- crecimiento de memoria (RSS) del proceso por item de la cola.
+
+Los ritmos y fallos de fake_blender.py se ajustan con sus variables FAKE_BLENDER_*.
+La salida de Blender y del modelo se descarta para que la consola no cuente en la medida.
+"""
+import os
+import sys
+import json
+import time
+import heapq
+import argparse
+import tempfile
+import contextlib
+import statistics
+from itertools import count
+from threading import Thread, Lock
+from RenderQueueModel import RenderQueueModel
+from RenderEvents import RenderEventServer, EVENT_PREFIX
+from MemoryTelemetry import MemoryTelemetry
+from JobLog import JobLog
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FAKE_BLENDER = os.path.join(ROOT, "fake_blender.py")
+
+class TimerRoot:
+    """Sustituye a la ventana de Tk en EventBus.attach_tk: ejecuta los after() en un hilo propio."""
+
+    def __init__(self):
+        self.timers = []
+        self.sequence = count()
+        self.lock = Lock()
+        self.running = True
+        self.thread = Thread(target=self.run, name="TimerRoot", daemon=True)
+        self.thread.start()
+
+    def after(self, milliseconds, callback):
+        with self.lock:
+            heapq.heappush(self.timers, (time.monotonic() + milliseconds / 1000, next(self.sequence), callback))
+
+    def run(self):
+        while self.running:
+            with self.lock:
+                due = self.timers[0][2] if self.timers and self.timers[0][0] <= time.monotonic() else None
+                if due is not None:
+                    heapq.heappop(self.timers)
+            if due is None:
+                time.sleep(0.002)
+            else:
+                due()
+
+    def stop(self):
+        self.running = False
+        self.thread.join(timeout=5)
+
+class TimedEventServer(RenderEventServer):
+    """Servidor de eventos que apunta cuándo envió fake_blender.py cada frame_done."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+        self.lock = Lock()
+
+    def dispatch(self, event):
+        if event.get("event") == "frame_done" and event.get("sent"):
+            with self.lock:
+                self.sent.append(event["sent"])
+        super().dispatch(event)
+
+    def take_sent(self):
+        with self.lock:
+            sent = self.sent
+            self.sent = []
+        return sent
+
+class LatencyObserver:
+    """Observador que hace de interfaz: mide cuánto tardan los frame_done en llegarle."""
+
+    def __init__(self, event_server):
+        self.event_server = event_server
+        self.latencies = []
+        self.deliveries = 0
+        self.errors = []
+
+    def update(self, model, event_type=None, data=None):
+        if event_type == "progress_update":
+            self.deliveries += 1
+            now = time.time()
+            self.latencies.extend(now - sent for sent in self.event_server.take_sent())
+        elif event_type == "error":
+            self.errors.append(data)
+
+def current_rss_mb():
+    """Memoria residente del proceso en MB (psutil si está instalado, si no /proc o el pico)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def synthetic_log_lines(count):
+    """Líneas como las de Cycles en modo detallado, con un 'Finished' por cada 50 muestras."""
+    lines = []
+    for index in range(count):
+        frame = index // 50 + 1
+        if index % 50 == 49:
+            lines.append(f"Fra:{frame} Mem:512.00M (Peak 640.00M) | Time:00:01.25 | Finished\n")
+        else:
+            lines.append(f"Fra:{frame} Mem:512.00M (Peak 640.00M) | Time:00:01.25 | Remaining:00:10.00 | Mem:480.00M, Peak:600.00M | Scene, ViewLayer | Sample {index % 50}/50\n")
+    return lines
+
+def measure_log_parsing(line_count, repeats, output_dir):
+    """
+    Microsegundos por línea del camino de on_line en RenderQueueModel.render_chunk para
+    las líneas que no son eventos: (mediana, mínimo, máximo) de repeats pasadas.
+    """
+    lines = synthetic_log_lines(line_count)
+    timings = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for repeat in range(repeats):
+            item = {"id": f"bench_{repeat}"}
+            MemoryTelemetry.reset(item)
+            telemetry = MemoryTelemetry(item)
+            job_log = JobLog(item["id"], os.path.join(output_dir, "parse_logs"))
+            started = time.perf_counter()
+            for line in lines:
+                if line.startswith(EVENT_PREFIX):
+                    continue
+                if line.startswith("Fra:"):
+                    telemetry.record_line(line)
+                job_log.append(line)
+                print(line, end="")
+            job_log.close()
+            timings.append((time.perf_counter() - started) / line_count * 1e6)
+    return statistics.median(timings), min(timings), max(timings)
+
+def run_queue(items, args, output_dir):
+    rss_before = current_rss_mb()
+
+    model = RenderQueueModel()
+    model.blender_executable = FAKE_BLENDER
+    model.max_workers = args.workers
+    model.chunk_size = args.chunk_size
+    model.use_daemon = args.daemon
+    model.use_metadata_cache = False
+    model.log_dir = os.path.join(output_dir, "logs")
+    model.event_server = TimedEventServer()
+    observer = LatencyObserver(model.event_server)
+    model.add_observer(observer)
+
+    for index in range(items):
+        blend_file = os.path.join(output_dir, f"scene_{index}.blend")
+        model.add_file(blend_file, ["Camera"], {"frame_start": 1, "frame_end": args.frames})
+    for job_id in model.loaded_files.ids():
+        model.add_to_queue(job_id, {"output_path": output_dir})
+
+    root = TimerRoot()
+    model.event_bus.attach_tk(root)
+    queue = list(model.queue)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        model.process_queue(queue)
+        elapsed = time.perf_counter() - started
+        # Entregar lo que quede en el bus, como haría el siguiente tick de Tk
+        time.sleep(0.1)
+        root.stop()
+        model.event_bus.drain()
+        model.get_supervisor().submit(model.shutdown_daemons()).result()
+    rss_after = current_rss_mb()
+    model.event_server.close()
+    model.get_supervisor().stop()
+
+    frames = items * args.frames
+    return {
+        "items": items,
+        "frames": frames,
+        "seconds": elapsed,
+        "jobs_per_minute": items / elapsed * 60 if elapsed else None,
+        "frames_per_second": frames / elapsed if elapsed else None,
+        "ui_deliveries": observer.deliveries,
+        "latency_p50_ms": (percentile(observer.latencies, 0.5) or 0) * 1000,
+        "latency_p95_ms": (percentile(observer.latencies, 0.95) or 0) * 1000,
+        "latency_max_ms": max(observer.latencies, default=0) * 1000,
+        "rss_growth_mb": rss_after - rss_before,
+        "rss_per_item_kb": (rss_after - rss_before) * 1024 / items if items else 0,
+        "errors": len(observer.errors),
+    }
+
+def print_result(result):
+    print(
+        f"{result['items']:>7} items {result['frames']:>7} frames  "
+        f"{result['seconds']:8.2f} s  {result['jobs_per_minute']:10.0f} jobs/min  "
+        f"{result['frames_per_second']:8.1f} fps  "
+        f"UI latency p50 {result['latency_p50_ms']:6.1f} ms p95 {result['latency_p95_ms']:6.1f} ms  "
+        f"RSS +{result['rss_growth_mb']:.1f} MB ({result['rss_per_item_kb']:.2f} KB/item)"
+        + (f"  {result['errors']} error(s)" if result["errors"] else ""),
+        file=sys.stderr,
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless render queue benchmark using fake_blender.py.")
+    parser.add_argument("--sizes", default="10,1000,100000", help="Comma separated queue sizes")
+    parser.add_argument("--frames", type=int, default=1, help="Frames per item")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=0)
+    parser.add_argument("--no-daemon", dest="daemon", action="store_false", help="Start one fake Blender process per chunk")
+    parser.add_argument("--frame-time", type=float, default=0.0, help="Seconds per fake frame")
+    parser.add_argument("--log-parse-lines", type=int, default=200000, help="Synthetic log lines for the log parsing measurement (0 = skip)")
+    parser.add_argument("--repeats", type=int, default=5, help="Repetitions of the log parsing measurement")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Probability that a fake frame fails")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON on stdout")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    os.environ["FAKE_BLENDER_FRAME_TIME"] = str(args.frame_time)
+    os.environ["FAKE_BLENDER_FAIL_RATE"] = str(args.fail_rate)
+    os.environ.setdefault("FAKE_BLENDER_PREVIEW_EVERY", "0")
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = []
+    with tempfile.TemporaryDirectory(prefix="render_queue_bench_") as output_dir:
+        # Calentamiento: la primera cola carga asyncio y el resto de módulos perezosos
+        run_queue(1, args, output_dir)
+        for size in sizes:
+            result = run_queue(size, args, output_dir)
+            print_result(result)
+            results.append(result)
+
+        log_parsing = None
+        if args.log_parse_lines > 0:
+            median, fastest, slowest = measure_log_parsing(args.log_parse_lines, max(1, args.repeats), output_dir)
+            log_parsing = {
+                "lines": args.log_parse_lines,
+                "repeats": max(1, args.repeats),
+                "us_per_line_median": median,
+                "us_per_line_min": fastest,
+                "us_per_line_max": slowest,
+            }
+            print(
+                f"log parsing: {median:.2f} us per line (min {fastest:.2f}, max {slowest:.2f}; "
+                f"{args.log_parse_lines} lines x {log_parsing['repeats']})",
+                file=sys.stderr,
+            )
+
+    if args.json:
+        print(json.dumps({"runs": results, "log_parsing": log_parsing}, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Mide el arranque de la aplicación y falla si se pasa del presupuesto:
+
+    python benchmark_startup.py
+    python benchmark_startup.py --runs 10 --import-budget-ms 120 --window-budget-ms 1000
+
+Cada medida se hace en un intérprete nuevo (sin caché de módulos) y se toma la mediana:
+- import del modelo (la ruta del CLI) y de toda la interfaz,
+- tiempo hasta la primera ventana, igual que main.py (se omite si no hay pantalla).
+
+Además comprueba que los subsistemas opcionales no se cargan al arrancar: psutil, PIL,
+smtplib/email, subprocess, asyncio y sqlite3 deben importarse solo cuando se usan.
+Termina con código 1 si algo se pasa del presupuesto, para poder usarlo en CI.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+LAZY_MODULES = ("psutil", "PIL", "smtplib", "email", "subprocess", "asyncio", "sqlite3")
+
+IMPORT_SNIPPET = """
+import sys, time, json
+started = time.perf_counter()
+import {modules}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+WINDOW_SNIPPET = """
+import time, json
+started = time.perf_counter()
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    print(json.dumps({"skipped": str(e)}))
+    raise SystemExit(0)
+from RenderQueueModel import RenderQueueModel
+from RenderQueueController import RenderQueueController
+from RenderQueueView import RenderQueueView
+root.configure(bg="#282828")
+model = RenderQueueModel()
+controller = RenderQueueController(model, None)
+view = RenderQueueView(root, controller)
+controller.view = view
+model.event_bus.attach_tk(root)
+root.update()
+elapsed = time.perf_counter() - started
+root.destroy()
+print(json.dumps({"ms": elapsed * 1000}))
+"""
+
+def run_snippet(snippet):
+    result = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def measure(snippet, runs):
+    samples = [run_snippet(snippet) for _ in range(runs)]
+    if "skipped" in samples[0]:
+        return samples[0]
+    return {
+        "ms": statistics.median(sample["ms"] for sample in samples),
+        "loaded": sorted({module for sample in samples for module in sample.get("loaded", [])}),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup time benchmark with a time budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=150)
+    parser.add_argument("--window-budget-ms", type=float, default=1500)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    failures = []
+    checks = (
+        ("model import", "RenderQueueModel"),
+        ("GUI import", "tkinter, RenderQueueModel, RenderQueueController, RenderQueueView"),
+    )
+    for name, modules in checks:
+        result = measure(IMPORT_SNIPPET.format(modules=modules, lazy=LAZY_MODULES), args.runs)
+        print(f"{name}: {result['ms']:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+        if result["ms"] > args.import_budget_ms:
+            failures.append(f"{name} over budget")
+        if result["loaded"]:
+            failures.append(f"{name} loads optional modules eagerly: {', '.join(result['loaded'])}")
+
+    result = measure(WINDOW_SNIPPET, args.runs)
+    if "skipped" in result:
+        print(f"time to first window: skipped ({result['skipped']})")
+    else:
+        print(f"time to first window: {result['ms']:.1f} ms (budget {args.window_budget_ms:.0f} ms)")
+        if result["ms"] > args.window_budget_ms:
+            failures.append("time to first window over budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Comprobación del lector nativo de .blend (BlendFileReader) sin necesitar Blender:
+
+    python check_blend_reader.py
+
+Genera archivos .blend sintéticos (cabecera, bloques OB/SC/GLOB y un DNA1 con su SDNA)
+en todas las variantes que el lector acepta: punteros de 4 y 8 bytes, little y big
+endian, la cabecera de Blender 5.0+ y comprimidos con gzip. En el SDNA hay campos de
+relleno antes de los que se leen, así que un error en los offsets, en el tamaño de
+puntero o en el orden de bytes da metadatos distintos de los esperados.
+Termina con código 1 si alguna variante no coincide.
+"""
+import os
+import sys
+import gzip
+import struct
+import tempfile
+from BlendFileReader import read_blend_metadata, UnsupportedBlendFile, OB_CAMERA
+
+EXPECTED = {
+    "cameras": ["CamMain", "CamSide"],
+    "scene_camera": "CamSide",
+    "frame_start": 12,
+    "frame_end": 340,
+    "resolution": "2560x1440",
+    "render_engine": "BLENDER_EEVEE_NEXT",
+}
+
+# (tipo, nombre) de cada campo; los *nombres son punteros y [n] arrays, como en el SDNA real
+STRUCTS = [
+    ("ID", [("void", "*next"), ("void", "*prev"), ("char", "name[66]"), ("short", "flag")]),
+    ("Object", [("ID", "id"), ("void", "*adt"), ("short", "type"), ("short", "partype"), ("float", "loc[3]")]),
+    ("RenderData", [("int", "cfra"), ("int", "sfra"), ("int", "efra"), ("float", "ctime"),
+                    ("short", "xasp"), ("short", "yasp"), ("int", "xsch"), ("int", "ysch"), ("char", "engine[32]")]),
+    ("Scene", [("ID", "id"), ("void", "*adt"), ("Object", "*camera"), ("void", "*world"), ("RenderData", "r")]),
+    ("FileGlobal", [("char", "subvstr[4]"), ("short", "subversion"), ("short", "minversion"),
+                    ("void", "*curscreen"), ("Scene", "*curscene")]),
+]
+BASIC_TYPES = {"char": 1, "short": 2, "int": 4, "float": 4, "void": 0}
+
+class BlendWriter:
+    """Arma un .blend mínimo con el tamaño de puntero, endianness y cabecera indicados."""
+
+    def __init__(self, pointer_size=8, endian="<", large_header=False):
+        self.pointer_size = pointer_size
+        self.endian = endian
+        self.large_header = large_header
+        self.pointer = "Q" if pointer_size == 8 else "I"
+        self.types = list(BASIC_TYPES) + [name for name, _ in STRUCTS]
+        self.lengths = dict(BASIC_TYPES)
+        self.layouts = {}
+        for name, fields in STRUCTS:
+            offset = 0
+            layout = {}
+            for type_name, field in fields:
+                count = 1
+                for dimension in field.split("[")[1:]:
+                    count *= int(dimension.rstrip("]"))
+                size = (pointer_size if field.startswith("*") else self.lengths[type_name]) * count
+                layout[field.lstrip("*").split("[")[0]] = (offset, type_name, field.startswith("*"))
+                offset += size
+            self.lengths[name] = offset
+            self.layouts[name] = layout
+
+    def pack(self, fmt, *values):
+        return struct.pack(self.endian + fmt, *values)
+
+    def struct_bytes(self, name, values):
+        """Contenido de un struct: values es {campo: valor}, los campos anidados con 'r.sfra'."""
+        data = bytearray(self.lengths[name])
+        self._fill(data, 0, name, values)
+        return bytes(data)
+
+    def _fill(self, data, base, name, values):
+        for field, (offset, type_name, is_pointer) in self.layouts[name].items():
+            nested = {key.split(".", 1)[1]: value for key, value in values.items() if key.startswith(field + ".")}
+            if nested:
+                self._fill(data, base + offset, type_name, nested)
+            if field not in values:
+                continue
+            value = values[field]
+            if is_pointer:
+                packed = self.pack(self.pointer, value)
+            elif type_name == "char":
+                packed = value.encode("utf-8")
+            else:
+                packed = self.pack({"short": "h", "int": "i", "float": "f"}[type_name], value)
+            data[base + offset:base + offset + len(packed)] = packed
+
+    def sdna(self):
+        def strings(items):
+            raw = b"".join(item.encode("latin-1") + b"\0" for item in items)
+            return raw + b"\0" * (-len(raw) % 4)
+
+        names = list(dict.fromkeys(field for _, fields in STRUCTS for _, field in fields))
+        data = b"SDNA" + b"NAME" + self.pack("i", len(names)) + strings(names)
+        data += b"TYPE" + self.pack("i", len(self.types)) + strings(self.types)
+        lengths = self.pack(f"{len(self.types)}h", *(self.lengths[name] for name in self.types))
+        data += b"TLEN" + lengths + b"\0" * (-len(lengths) % 4)
+        data += b"STRC" + self.pack("i", len(STRUCTS))
+        for name, fields in STRUCTS:
+            data += self.pack("hh", self.types.index(name), len(fields))
+            for type_name, field in fields:
+                data += self.pack("hh", self.types.index(type_name), names.index(field))
+        return data
+
+    def block(self, code, struct_name, old, body):
+        sdna_index = [name for name, _ in STRUCTS].index(struct_name) if struct_name else 0
+        code = code.encode("latin-1").ljust(4, b"\0")
+        if self.large_header:
+            return self.pack("4siQqq", code, sdna_index, old, len(body), 1) + body
+        return self.pack(f"4si{self.pointer}ii", code, len(body), old, sdna_index, 1) + body
+
+    def header(self):
+        endian = "v" if self.endian == "<" else "V"
+        if self.large_header:
+            return f"BLENDER17-01{endian}0500".encode("ascii")
+        return f"BLENDER{'-' if self.pointer_size == 8 else '_'}{endian}402".encode("ascii")
+
+    def blend_file(self):
+        def obj(name, object_type):
+            return self.struct_bytes("Object", {"id.name": "OB" + name, "type": object_type, "partype": 7})
+
+        def scene(name, camera, start, end, width, height, engine):
+            return self.struct_bytes("Scene", {
+                "id.name": "SC" + name, "id.flag": 3, "camera": camera, "world": 0x7777,
+                "r.cfra": 99, "r.sfra": start, "r.efra": end, "r.xasp": 1, "r.yasp": 1,
+                "r.xsch": width, "r.ysch": height, "r.engine": engine,
+            })
+
+        data = self.header()
+        data += self.block("GLOB", "FileGlobal", 0x10, self.struct_bytes("FileGlobal", {"subversion": 7, "curscreen": 0x20, "curscene": 0x900}))
+        data += self.block("OB", "Object", 0x100, obj("Cube", 1))
+        data += self.block("OB", "Object", 0x200, obj("CamMain", OB_CAMERA))
+        data += self.block("OB", "Object", 0x300, obj("CamSide", OB_CAMERA))
+        # La primera escena no es la activa: el lector tiene que seguir FileGlobal.curscene
+        data += self.block("SC", "Scene", 0x800, scene("Other", 0x200, 1, 250, 1920, 1080, "CYCLES"))
+        data += self.block("SC", "Scene", 0x900, scene("Shot", 0x300, 12, 340, 2560, 1440, "BLENDER_EEVEE_NEXT"))
+        data += self.block("DNA1", None, 0, self.sdna())
+        data += self.block("ENDB", None, 0, b"")
+        return data
+
+def check_variant(directory, label, pointer_size, endian, large_header=False, compress=False):
+    path = os.path.join(directory, label.replace(" ", "_") + ".blend")
+    data = BlendWriter(pointer_size, endian, large_header).blend_file()
+    with open(path, "wb") as f:
+        f.write(gzip.compress(data) if compress else data)
+    try:
+        metadata = read_blend_metadata(path)
+    except UnsupportedBlendFile as e:
+        return [f"could not read the file: {e}"]
+    return [
+        f"{key}: expected {expected!r}, got {metadata.get(key)!r}"
+        for key, expected in EXPECTED.items() if metadata.get(key) != expected
+    ]
+
+def main():
+    variants = [
+        ("64-bit little endian", 8, "<"),
+        ("32-bit little endian", 4, "<"),
+        ("64-bit big endian", 8, ">"),
+        ("32-bit big endian", 4, ">"),
+        ("Blender 5 header", 8, "<", True),
+        ("gzip compressed", 8, "<", False, True),
+    ]
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix="blend_reader_check_") as directory:
+        for label, *options in variants:
+            problems = check_variant(directory, label, *options)
+            print(f"{'ok  ' if not problems else 'FAIL'} {label}")
+            for problem in problems:
+                print(f"     {problem}")
+            failed += bool(problems)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
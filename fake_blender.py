@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Sustituto de Blender para pruebas y benchmarks de la cola. Acepta los mismos argumentos
+que construye RenderQueueModel y se comporta como script_blender.py / script_probe.py:
+
+    fake_blender.py --background <file.blend> --python script_blender.py -- <8 o 9 argumentos>
+    fake_blender.py --background --python script_blender.py -- --server
+    fake_blender.py --background --python script_probe.py -- <lista_de_archivos.json>
+
+Por cada frame escribe una línea "Fra:" como la de Blender y envía los eventos
+frame_start, frame_done, preview y error por el canal de RENDER_QUEUE_EVENTS (o por
+stdout con el prefijo RENDER_EVENT). El ritmo y los fallos se configuran con variables
+de entorno:
+
+    FAKE_BLENDER_STARTUP      segundos de arranque antes del primer frame (0)
+    FAKE_BLENDER_FRAME_TIME   segundos por frame (0)
+    FAKE_BLENDER_LOG_LINES    líneas de log extra por frame, como las de Cycles (0)
+    FAKE_BLENDER_MEM_MB       memoria que se informa en las líneas Fra: (512)
+    FAKE_BLENDER_PREVIEW_EVERY  enviar una previsualización cada N frames (5, 0 = nunca)
+    FAKE_BLENDER_FAIL_FRAMES  frames que fallan, en formato '1-10,15' ('')
+    FAKE_BLENDER_FAIL_RATE    probabilidad de que falle cada frame (0)
+    FAKE_BLENDER_CRASH        1 para terminar el proceso sin avisar al fallar (0)
+    FAKE_BLENDER_WRITE        1 para escribir un PNG mínimo por frame, útil para reanudar (0)
+    FAKE_BLENDER_SEED         semilla de FAKE_BLENDER_FAIL_RATE
+
+En Windows hay que lanzarlo como "python fake_blender.py"; RenderQueueModel usa un
+único ejecutable, así que allí se necesita un .bat que lo envuelva.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+
+# PNG de 1x1 píxel: lo justo para que OutputScanner lo dé por completo
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000b49444154789c6360000200000500017a5eab3f0000000049454e44ae426082"
+)
+
+startup = float(os.environ.get("FAKE_BLENDER_STARTUP", "0"))
+frame_time = float(os.environ.get("FAKE_BLENDER_FRAME_TIME", "0"))
+log_lines = int(os.environ.get("FAKE_BLENDER_LOG_LINES", "0"))
+memory_mb = float(os.environ.get("FAKE_BLENDER_MEM_MB", "512"))
+preview_every = int(os.environ.get("FAKE_BLENDER_PREVIEW_EVERY", "5"))
+fail_rate = float(os.environ.get("FAKE_BLENDER_FAIL_RATE", "0"))
+crash = os.environ.get("FAKE_BLENDER_CRASH") == "1"
+write_output = os.environ.get("FAKE_BLENDER_WRITE") == "1"
+rng = random.Random(os.environ.get("FAKE_BLENDER_SEED"))
+
+event_socket = None
+current_job_id = os.environ.get("RENDER_QUEUE_JOB", "")
+
+def parse_frame_spec(frame_spec):
+    frames = []
+    for part in frame_spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            frames.extend(range(int(first), int(last) + 1))
+        else:
+            frames.append(int(part))
+    return frames
+
+fail_frames = set(parse_frame_spec(os.environ.get("FAKE_BLENDER_FAIL_FRAMES", "")))
+
+def connect_events():
+    global event_socket
+    address = os.environ.get("RENDER_QUEUE_EVENTS")
+    if address:
+        host, port = address.rsplit(":", 1)
+        event_socket = socket.create_connection((host, int(port)), timeout=10)
+
+def emit(event, **data):
+    # "sent" permite medir la latencia hasta que el evento llega a la interfaz
+    data.update(event=event, job=current_job_id, sent=time.time())
+    line = json.dumps(data) + "\n"
+    if event_socket is not None:
+        event_socket.sendall(line.encode("utf-8"))
+    else:
+        print(f"RENDER_EVENT {line}", end="", flush=True)
+
+def render(output_path, start_frame, end_frame, format_type="PNG", frames=None, **unused):
+    """Simula setup_and_render: devuelve None si todo fue bien o el mensaje de error."""
+    preview_dir = os.path.join(os.path.dirname(output_path), "previews")
+    frame_list = parse_frame_spec(frames) if frames else range(int(start_frame), int(end_frame) + 1)
+    peak = memory_mb
+    for frame in frame_list:
+        emit("frame_start", frame=frame)
+        started = time.perf_counter()
+        if frame_time:
+            time.sleep(frame_time)
+        for line in range(log_lines):
+            print(f"Fra:{frame} Mem:{memory_mb:.2f}M (Peak {peak:.2f}M) | Time:00:00.00 | Sample {line}/{log_lines}")
+        if frame in fail_frames or (fail_rate and rng.random() < fail_rate):
+            message = f"Simulated render failure on frame {frame}"
+            if crash:
+                sys.stdout.flush()
+                os._exit(139)
+            print(f"Error: {message}", file=sys.stderr)
+            emit("error", message=message)
+            return message
+
+        elapsed = time.perf_counter() - started
+        peak = max(peak, memory_mb)
+        print(f"Fra:{frame} Mem:{memory_mb:.2f}M (Peak {peak:.2f}M) | Time:00:{elapsed:05.2f} | Finished", flush=True)
+        if write_output:
+            os.makedirs(output_path, exist_ok=True)
+            extension = "jpg" if format_type.upper() == "JPEG" else format_type.lower()
+            with open(os.path.join(output_path, f"{os.path.basename(output_path)}_{frame:04}.{extension}"), "wb") as f:
+                f.write(TINY_PNG)
+        emit("frame_done", frame=frame, time=round(elapsed, 3), peak_memory_mb=peak)
+        if preview_every and frame % preview_every == 0:
+            emit("preview", frame=frame, path=os.path.join(preview_dir, f"preview_{frame:04}.jpg"))
+    return None
+
+def serve():
+    global current_job_id
+    print("RENDER_SERVER_READY", flush=True)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        job = json.loads(line)
+        if job.get("command") == "quit":
+            break
+        current_job_id = job.pop("job_id", "")
+        error = render(**job)
+        result = {"status": "ok"} if error is None else {"status": "error", "message": error}
+        print(f"RENDER_DONE {json.dumps(result)}", flush=True)
+
+def probe(file_list_path):
+    with open(file_list_path, "r", encoding="utf-8") as f:
+        blend_files = json.load(f)
+    for blend_file in blend_files:
+        result = {
+            "file": blend_file,
+            "cameras": ["Camera"],
+            "scene_camera": "Camera",
+            "frame_start": 1,
+            "frame_end": 250,
+            "resolution": "1920x1080",
+            "render_engine": "CYCLES",
+        }
+        print(f"PROBE_RESULT: {json.dumps(result)}", flush=True)
+
+def main(argv):
+    script = argv[argv.index("--python") + 1] if "--python" in argv else ""
+    args = argv[argv.index("--") + 1:] if "--" in argv else []
+    if startup:
+        time.sleep(startup)
+
+    if os.path.basename(script) == "script_probe.py":
+        probe(args[0])
+        return 0
+
+    connect_events()
+    if args == ["--server"]:
+        serve()
+        return 0
+    if len(args) not in (8, 9):
+        print("Usage: fake_blender.py --background <file> --python script_blender.py -- <8 or 9 arguments>", file=sys.stderr)
+        return 1
+    error = render(
+        output_path=args[1],
+        start_frame=args[4],
+        end_frame=args[5],
+        format_type=args[7],
+        frames=args[8] if len(args) == 9 else None,
+    )
+    return 0 if error is None else 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -10,4 +10,7 @@ if __name__ == "__main__":
     controller = RenderQueueController(model, None)  # Se crea el controlador pero sin la vista
     view = RenderQueueView(root, controller)  # Se crea la vista y se le pasa el controlador
     controller.view = view  # Se asigna la vista al controlador después de que ambos han sido creados
-    root.mainloop()
\ No newline at end of file
+    model.event_bus.attach_tk(root)  # Los eventos del render se entregan en el hilo de Tk
+    root.after(0, controller.restore_journal)  # Recuperar la cola después de mostrar la ventana
+    root.mainloop()
+    model.close_alerts(timeout=5)  # Enviar el último resumen de alertas antes de salir
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Agente de render para repartir una cola entre varias máquinas. Se conecta al
+coordinador (render_cli.py --serve), recibe chunks, ejecuta Blender en esta máquina y
+devuelve el progreso:
+
+    python render_cli.py cola.json --serve 0.0.0.0:8765 --workers 6   # coordinador
+    python render_agent.py render-master:8765 --slots 2               # en cada nodo
+    python render_agent.py 127.0.0.1:8765 --slots 1 --blender ./fake_blender.py
+
+Envía un latido cada --heartbeat segundos; si el coordinador no lo recibe, da el
+agente por perdido y manda sus chunks a otro. Si se corta la conexión, el agente
+detiene sus renders y vuelve a conectarse. Los .blend y las carpetas de salida deben
+estar en las mismas rutas que en el coordinador.
+"""
+import os
+import sys
+import json
+import socket
+import asyncio
+import argparse
+from RenderQueueModel import RenderQueueModel
+from RenderSupervisor import RenderSupervisor
+from RenderEvents import EVENT_PREFIX
+
+class RenderAgent:
+    """Conexión con el coordinador y renders en curso de esta máquina, en un bucle de asyncio."""
+
+    def __init__(self, host, port, slots=1, name=None, heartbeat_interval=5.0, blender_executable="blender"):
+        self.host = host
+        self.port = port
+        self.slots = slots
+        self.name = name or socket.gethostname()
+        self.heartbeat_interval = heartbeat_interval
+        # El modelo solo se usa para construir el comando de Blender igual que en local
+        self.model = RenderQueueModel()
+        self.model.blender_executable = blender_executable
+        self.supervisor = RenderSupervisor()
+        self.writer = None
+        self.tasks = {}  # id del chunk -> tarea de render
+
+    def write(self, message):
+        if self.writer is not None:
+            self.writer.write((json.dumps(message) + "\n").encode("utf-8"))
+
+    async def send(self, message):
+        self.write(message)
+        if self.writer is not None:
+            await self.writer.drain()
+
+    async def run(self, reconnect=True):
+        """Atiende al coordinador hasta que pide salir; reconecta con espera creciente."""
+        delay = 1
+        while True:
+            try:
+                reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                if not reconnect:
+                    raise
+                print(f"Could not connect to {self.host}:{self.port} ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+            delay = 1
+            print(f"Connected to coordinator {self.host}:{self.port} as {self.name} with {self.slots} slot(s)")
+            quit_requested = await self.serve(reader)
+            if quit_requested or not reconnect:
+                return
+
+    async def serve(self, reader):
+        """Devuelve True si el coordinador pidió salir, False si se perdió la conexión."""
+        await self.send({"type": "hello", "name": self.name, "slots": self.slots})
+        heartbeat = asyncio.ensure_future(self.send_heartbeats())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    print("Connection to coordinator lost")
+                    return False
+                message = json.loads(line)
+                if message.get("type") == "render":
+                    chunk_id = message["chunk"]
+                    self.tasks[chunk_id] = asyncio.ensure_future(self.render(chunk_id, message["job_id"], message["job"]))
+                elif message.get("type") == "cancel":
+                    task = self.tasks.get(message.get("chunk"))
+                    if task is not None:
+                        task.cancel()
+                elif message.get("type") == "quit":
+                    return True
+        except (OSError, ValueError):
+            print("Connection to coordinator lost")
+            return False
+        finally:
+            heartbeat.cancel()
+            # El coordinador ya habrá mandado estos chunks a otro agente
+            for task in list(self.tasks.values()):
+                task.cancel()
+            self.writer.close()
+            self.writer = None
+
+    async def send_heartbeats(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.send({"type": "heartbeat", "running": len(self.tasks)})
+            except OSError:
+                return
+
+    async def render(self, chunk_id, job_id, job):
+        job = dict(job, render_threads=self.model.resolve_render_threads(job.get("render_threads", "Auto"), self.slots))
+        command = self.model.build_render_command(job)
+        print(f"Running command: {' '.join(command)}")
+        # Sin RENDER_QUEUE_EVENTS script_blender.py escribe los eventos en stdout con prefijo
+        env = {key: value for key, value in os.environ.items() if key != "RENDER_QUEUE_EVENTS"}
+        env["RENDER_QUEUE_JOB"] = job_id
+
+        def on_line(line):
+            # Solo viajan los eventos y las líneas Fra: (progreso y memoria), no todo el log
+            if line.startswith(EVENT_PREFIX) or line.startswith("Fra:"):
+                self.write({"type": "line", "chunk": chunk_id, "line": line})
+            else:
+                print(line, end="")
+
+        try:
+            try:
+                returncode, stderr = await self.supervisor.run_process(command, on_line, lambda line: print(line, end=""), env)
+            except FileNotFoundError:
+                returncode, stderr = 1, f"Blender executable not found on worker {self.name}"
+            await self.send({"type": "done", "chunk": chunk_id, "returncode": returncode, "stderr": stderr})
+        except OSError:
+            pass
+        finally:
+            self.tasks.pop(chunk_id, None)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render worker agent for a render_cli.py --serve coordinator.")
+    parser.add_argument("coordinator", help="Coordinator address as host:port")
+    parser.add_argument("--slots", type=int, default=1, help="Chunks rendered at the same time on this machine")
+    parser.add_argument("--name", help="Worker name shown by the coordinator (default: host name)")
+    parser.add_argument("--blender", default="blender", help="Blender executable (default: blender in PATH)")
+    parser.add_argument("--heartbeat", type=float, default=5.0, help="Seconds between heartbeats")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    host, port = args.coordinator.rsplit(":", 1)
+    agent = RenderAgent(host, int(port), max(1, args.slots), args.name, args.heartbeat, args.blender)
+    try:
+        asyncio.run(agent.run())
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
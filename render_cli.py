@@ -0,0 +1,168 @@
+"""
+Ejecuta una cola guardada con "Save Config" sin abrir la interfaz, para nodos de render
+sin pantalla o tareas programadas (cron):
+
+    python render_cli.py cola.json
+    python render_cli.py cola.json --workers 4 --chunk-size 10 --log render.log
+    python render_cli.py cola.json --json > eventos.jsonl
+    python render_cli.py cola.json --serve 0.0.0.0:8765 --workers 6  # renderizar en render_agent.py
+
+Usa el mismo RenderQueueModel que la interfaz y no importa tkinter ni PIL.
+Termina con código 0 si todo se renderizó, 1 si hubo errores y 130 si se interrumpió.
+"""
+import sys
+import json
+import argparse
+import datetime
+from RenderQueueModel import RenderQueueModel
+from RenderEstimator import format_duration
+from QueueFile import is_queue_file
+
+class ConsoleReporter:
+    """Observador del modelo que escribe el progreso del render como texto o JSON por línea."""
+
+    def __init__(self, stream, as_json=False):
+        self.stream = stream
+        self.as_json = as_json
+        self.errors = []
+        self.queue_eta = None
+
+    def write(self, event_type, **data):
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if self.as_json:
+            line = json.dumps(dict(data, event=event_type, time=timestamp))
+        else:
+            line = f"[{timestamp}] {data['text']}"
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def update(self, model, event_type=None, data=None):
+        if event_type == "error":
+            self.errors.append(data)
+            self.write("error", text=f"ERROR: {data}", message=data)
+        elif event_type == "progress_update":
+            item = model.queue.get(data)
+            if item is None:
+                return
+            self.write(
+                "progress",
+                text=f"{item['file']}: {item.get('progress', 0)}% (frame {item.get('current_frame', '-')}, "
+                     f"{format_duration(item.get('eta')) or '-'} left, queue {format_duration(self.queue_eta) or '-'} left)",
+                job=data,
+                file=item["file"],
+                progress=item.get("progress", 0),
+                frame=item.get("current_frame"),
+                eta=item.get("eta"),
+                peak_memory_mb=item.get("peak_memory_mb"),
+                global_progress=model.global_progress,
+            )
+        elif event_type == "eta_update":
+            self.queue_eta = data["queue_eta"]
+        elif event_type == "render_complete_item":
+            self.write("item_complete", text=data, message=data)
+        elif event_type == "render_complete":
+            self.write("complete", text=data, message=data)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run a saved render queue without the GUI.")
+    parser.add_argument("config", help="Queue written by Save Config (.json, .rqueue, .rqueue.gz or .rqueue.zst)")
+    parser.add_argument("--job", action="append", default=[], help="Only render the job with this id (repeatable)")
+    parser.add_argument("--workers", type=int, help="Parallel Blender workers")
+    parser.add_argument("--chunk-size", type=int, help="Frames per chunk (0 = whole item)")
+    parser.add_argument("--policy", choices=("fifo", "sjf", "fair"), help="Scheduling policy")
+    parser.add_argument("--min-free-ram", type=int, help="Do not start another worker below this free RAM in MB")
+    parser.add_argument("--max-cpu", type=int, help="Do not start another worker above this CPU load in percent")
+    parser.add_argument("--resume", action="store_true", help="Skip frames that are already rendered")
+    parser.add_argument("--daemon", action="store_true", help="Keep Blender workers warm between jobs")
+    parser.add_argument("--blender", help="Blender executable (default: blender in PATH)")
+    parser.add_argument("--serve", metavar="HOST:PORT", help="Act as coordinator and render on render_agent.py workers")
+    parser.add_argument("--heartbeat-timeout", type=float, default=15.0, help="Seconds without heartbeats before a worker's chunks are reassigned")
+    parser.add_argument("--journal", metavar="PATH", help="Record progress in this SQLite journal and resume an interrupted run from it")
+    parser.add_argument("--alerts", metavar="PATH", help="Alert targets (default: alerts.json in the user config folder)")
+    parser.add_argument("--log", help="Append progress to this file instead of stdout")
+    parser.add_argument("--json", action="store_true", help="Write progress as one JSON object per line")
+    return parser.parse_args(argv)
+
+def load_model(args):
+    """Devuelve (modelo, trabajos de un render interrumpido que hay que continuar)."""
+    model = RenderQueueModel()
+    interrupted = []
+    if args.journal:
+        import sqlite3
+        try:
+            interrupted = model.open_journal(args.journal)
+        except sqlite3.Error as e:
+            raise OSError(f"journal {args.journal} is not usable ({e})")
+    if interrupted:
+        # El diario manda: el render anterior no terminó y se continúa donde se quedó
+        print(f"Resuming {len(interrupted)} interrupted job(s) from {args.journal}", file=sys.stderr)
+    elif is_queue_file(args.config):
+        for _ in model.load_queue_file(args.config):
+            pass
+    else:
+        with open(args.config, "r", encoding="utf-8") as f:
+            model.load_dict(json.load(f))
+    if args.workers is not None:
+        model.max_workers = args.workers
+    if args.chunk_size is not None:
+        model.chunk_size = args.chunk_size
+    if args.policy:
+        model.schedule_policy = args.policy
+    if args.min_free_ram is not None:
+        model.min_free_memory_mb = args.min_free_ram
+    if args.max_cpu is not None:
+        model.max_cpu_percent = args.max_cpu
+    if args.resume:
+        model.resume_renders = True
+    if args.daemon:
+        model.use_daemon = True
+    if args.blender:
+        model.blender_executable = args.blender
+    if args.alerts:
+        model.alerts_path = args.alerts
+    if args.serve:
+        from RenderCoordinator import RenderCoordinator
+        host, port = args.serve.rsplit(":", 1)
+        model.coordinator = RenderCoordinator(host, int(port), args.heartbeat_timeout)
+    return model, interrupted
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        model, interrupted = load_model(args)
+    except (OSError, ValueError) as e:
+        print(f"Could not load {args.config}: {e}", file=sys.stderr)
+        return 1
+
+    queue = interrupted or [item for item in model.queue if not args.job or item["id"] in args.job]
+    if not queue:
+        print("Queue is empty!", file=sys.stderr)
+        return 1
+    if model.max_workers < 1 or model.chunk_size < 0:
+        print("Invalid number of workers or chunk size", file=sys.stderr)
+        return 1
+    # Misma carpeta de salida que al lanzar el render desde la interfaz
+    model.resolve_output_paths(queue)
+
+    stream = open(args.log, "a", encoding="utf-8") if args.log else sys.stdout
+    reporter = ConsoleReporter(stream, args.json)
+    # Sin bucle de Tk el bus entrega los eventos en el hilo del render
+    model.add_observer(reporter)
+    try:
+        model.process_queue(queue)
+    except KeyboardInterrupt:
+        model.stop_render()
+        reporter.write("stopped", text="Rendering stopped by user")
+        return 130
+    finally:
+        # Cerrar los daemons de Blender (también los que se quedan calientes) antes de salir
+        model.get_supervisor().submit(model.shutdown_daemons()).result()
+        if model.coordinator is not None:
+            model.get_supervisor().submit(model.coordinator.close()).result()
+        model.close_alerts()
+        if stream is not sys.stdout:
+            stream.close()
+    return 1 if reporter.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,105 @@
 import bpy
 import sys
 import os
+import json
+import time
+import socket
+
+# Archivo abierto actualmente en modo servidor: (ruta, mtime)
+loaded_blend = None
+
+# Canal de eventos hacia la cola (RENDER_QUEUE_EVENTS=host:port) y trabajo actual
+event_socket = None
+current_job_id = os.environ.get("RENDER_QUEUE_JOB", "")
+
+def connect_events():
+    """Conecta con el servidor de eventos del modelo si se indicó uno en el entorno."""
+    global event_socket
+    address = os.environ.get("RENDER_QUEUE_EVENTS")
+    if not address:
+        return
+    host, port = address.rsplit(":", 1)
+    try:
+        event_socket = socket.create_connection((host, int(port)), timeout=10)
+    except OSError as e:
+        print(f"No se pudo conectar al canal de eventos {address}: {e}")
+
+def emit(event, **data):
+    """
+    Envía un evento JSON de una línea por el canal de eventos. Si no hay canal, el
+    evento sale por stdout con el prefijo RENDER_EVENT.
+    """
+    global event_socket
+    data["event"] = event
+    data["job"] = current_job_id
+    line = json.dumps(data) + "\n"
+    if event_socket is not None:
+        try:
+            event_socket.sendall(line.encode("utf-8"))
+            return
+        except OSError:
+            event_socket = None
+    print(f"RENDER_EVENT {line}", end="", flush=True)
+
+def peak_memory_mb():
+    """Pico de memoria del proceso de Blender en MB, o None si no se puede saber."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux lo da en KB y macOS en bytes
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return round(counters.PeakWorkingSetSize / (1024 * 1024), 1)
+    except (ImportError, AttributeError, OSError):
+        pass
+    return None
+
+def open_blend_file(blend_file):
+    """Abre el .blend solo si no es el que ya está cargado o si cambió en disco."""
+    global loaded_blend
+    key = (os.path.abspath(blend_file), os.path.getmtime(blend_file))
+    if loaded_blend != key:
+        bpy.ops.wm.open_mainfile(filepath=blend_file)
+        loaded_blend = key
+
+def parse_frame_spec(frame_spec):
+    """Convierte '1-10,15,20-30' en la lista de frames que representa."""
+    frames = []
+    for part in frame_spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            frames.extend(range(int(first), int(last) + 1))
+        else:
+            frames.append(int(part))
+    return frames
 
-def render_animation(blend_file, output_path, camera_name, render_engine, start_frame, end_frame, render_threads, format_type):
+def render_animation(blend_file, output_path, camera_name, render_engine, start_frame, end_frame, render_threads, format_type, frames=None):
     """
     Abre un archivo .blend, establece la configuración de renderizado y renderiza una animación.
 
@@ -15,71 +112,117 @@ def render_animation(blend_file, output_path, camera_name, render_engine, start_
         end_frame (int): Fotograma final de la animación.
         render_threads (str): Número de hilos a utilizar para el renderizado.
         format_type (str): Formato de imagen para la salida ('PNG', 'JPEG', etc.).
+        frames (str, optional): Frames concretos a renderizar, por ejemplo '1-10,15'. Si se
+            omite se renderiza todo el rango entre start_frame y end_frame.
     """
     try:
-        bpy.ops.wm.open_mainfile(filepath=blend_file)
-
-        # Establecer la cámara
-        if camera_name not in bpy.data.objects:
-            raise ValueError(f"La cámara '{camera_name}' no se encontró en el archivo .blend.")
-        bpy.context.scene.camera = bpy.data.objects[camera_name]
-
-        # Establecer el rango de fotogramas
-        scene = bpy.context.scene
-        scene.frame_start = start_frame
-        scene.frame_end = end_frame
-
-        # Establecer la ruta de salida base sin el número de frame
-        # Blender agregará automáticamente el número de frame y la extensión
-        scene.render.filepath = output_path
-
-        # Establecer el formato de salida
-        if format_type in ['PNG', 'JPEG', 'TIFF', 'BMP', 'EXR']:
-            scene.render.image_settings.file_format = format_type
-            if format_type == 'JPEG':
-                scene.render.image_settings.quality = 90  # Ajusta la calidad del JPEG si es necesario
-        else:
-            raise ValueError(f"Formato de salida '{format_type}' no soportado.")
-
-        # Establecer el motor de renderizado
-        scene.render.engine = render_engine
-
-        # Establecer los hilos de renderizado
-        if render_threads.isdigit():
-            scene.render.threads_mode = 'FIXED'
-            scene.render.threads = int(render_threads)
-        else:
-            scene.render.threads_mode = 'AUTO'
-
-        # Crear un directorio para previsualizaciones si no existe
-        preview_dir = os.path.join(os.path.dirname(output_path), "previews")
-        os.makedirs(preview_dir, exist_ok=True)
-
-        # Renderizar cada fotograma y guardar una previsualización
-        for frame in range(start_frame, end_frame + 1):
-            scene.frame_set(frame)
-
-            # Establecer la ruta de salida para el frame actual
-            scene.render.filepath = os.path.join(output_path, f"{os.path.basename(output_path)}_{frame:04}")
-            # Renderizar el fotograma
-            bpy.ops.render.render(write_still=True)
-
-            # Guardar una imagen de previsualización (cada 5 fotogramas)
-            if frame % 5 == 0:
-                preview_path = os.path.join(preview_dir, f"preview_{frame:04}.jpg")
-                bpy.data.images['Render Result'].save_render(filepath=preview_path)
-                print(f"Previsualización guardada en {preview_path}")
-
+        setup_and_render(blend_file, output_path, camera_name, render_engine, start_frame, end_frame, render_threads, format_type, frames)
     except Exception as e:
         print(f"Error durante el renderizado: {e}")
+        emit("error", message=str(e))
         sys.exit(1)
 
+def setup_and_render(blend_file, output_path, camera_name, render_engine, start_frame, end_frame, render_threads, format_type, frames=None):
+    """Igual que render_animation pero propaga los errores en lugar de salir del proceso."""
+    open_blend_file(blend_file)
+
+    # Establecer la cámara
+    if camera_name not in bpy.data.objects:
+        raise ValueError(f"La cámara '{camera_name}' no se encontró en el archivo .blend.")
+    bpy.context.scene.camera = bpy.data.objects[camera_name]
+
+    # Establecer el rango de fotogramas
+    scene = bpy.context.scene
+    scene.frame_start = start_frame
+    scene.frame_end = end_frame
+
+    # Establecer la ruta de salida base sin el número de frame
+    # Blender agregará automáticamente el número de frame y la extensión
+    scene.render.filepath = output_path
+
+    # Establecer el formato de salida
+    if format_type in ['PNG', 'JPEG', 'TIFF', 'BMP', 'EXR']:
+        scene.render.image_settings.file_format = format_type
+        if format_type == 'JPEG':
+            scene.render.image_settings.quality = 90  # Ajusta la calidad del JPEG si es necesario
+    else:
+        raise ValueError(f"Formato de salida '{format_type}' no soportado.")
+
+    # Establecer el motor de renderizado
+    scene.render.engine = render_engine
+
+    # Establecer los hilos de renderizado
+    if render_threads.isdigit():
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = int(render_threads)
+    else:
+        scene.render.threads_mode = 'AUTO'
+
+    # Crear un directorio para previsualizaciones si no existe
+    preview_dir = os.path.join(os.path.dirname(output_path), "previews")
+    os.makedirs(preview_dir, exist_ok=True)
+
+    # Renderizar cada fotograma y guardar una previsualización
+    frame_list = parse_frame_spec(frames) if frames else range(start_frame, end_frame + 1)
+    for frame in frame_list:
+        emit("frame_start", frame=frame)
+        frame_started = time.perf_counter()
+        scene.frame_set(frame)
+
+        # Establecer la ruta de salida para el frame actual
+        scene.render.filepath = os.path.join(output_path, f"{os.path.basename(output_path)}_{frame:04}")
+        # Renderizar el fotograma
+        bpy.ops.render.render(write_still=True)
+        emit("frame_done", frame=frame, time=round(time.perf_counter() - frame_started, 3), peak_memory_mb=peak_memory_mb())
+
+        # Guardar una imagen de previsualización (cada 5 fotogramas)
+        if frame % 5 == 0:
+            preview_path = os.path.join(preview_dir, f"preview_{frame:04}.jpg")
+            bpy.data.images['Render Result'].save_render(filepath=preview_path)
+            print(f"Previsualización guardada en {preview_path}")
+            emit("preview", frame=frame, path=preview_path)
+
+def serve():
+    """
+    Modo servidor: se queda vivo leyendo trabajos de stdin (un JSON por línea) y
+    responde con una línea RENDER_DONE por trabajo. El .blend abierto se reutiliza
+    entre trabajos mientras no cambie. Termina con {"command": "quit"} o al cerrar stdin.
+    """
+    global current_job_id
+    print("RENDER_SERVER_READY", flush=True)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+            if job.get("command") == "quit":
+                break
+            current_job_id = job.pop("job_id", "")
+            job["start_frame"] = int(job["start_frame"])
+            job["end_frame"] = int(job["end_frame"])
+            job["format_type"] = job["format_type"].upper()
+            print(f"Motor de renderizado seleccionado: {job['render_engine']}")
+            setup_and_render(**job)
+            result = {"status": "ok"}
+        except Exception as e:
+            print(f"Error durante el renderizado: {e}")
+            emit("error", message=str(e))
+            result = {"status": "error", "message": str(e)}
+        print(f"RENDER_DONE {json.dumps(result)}", flush=True)
+
 if __name__ == "__main__":
     argv = sys.argv
     argv = argv[argv.index("--") + 1:]
+    connect_events()
+
+    if argv == ["--server"]:
+        serve()
+        sys.exit(0)
 
-    if len(argv) != 8:
-        print("Uso: blender --background --python script_blender.py -- <blend_file> <output_path> <camera_name> <render_engine> <start_frame> <end_frame> <render_threads> <format_type>")
+    if len(argv) not in (8, 9):
+        print("Uso: blender --background --python script_blender.py -- <blend_file> <output_path> <camera_name> <render_engine> <start_frame> <end_frame> <render_threads> <format_type> [<frames>]")
+        print("     blender --background --python script_blender.py -- --server")
         sys.exit(1)
 
     blend_file = argv[0]
@@ -90,6 +233,7 @@ if __name__ == "__main__":
     end_frame = int(argv[5])
     render_threads = argv[6]
     format_type = argv[7].upper()  # Convertir a mayúsculas para coincidir con las constantes de Blender
+    frames = argv[8] if len(argv) == 9 else None  # Frames sueltos, por ejemplo al reanudar un render
 
     print(f"Motor de renderizado seleccionado: {render_engine}")
-    render_animation(blend_file, output_path, camera_name, render_engine, start_frame, end_frame, render_threads, format_type)
\ No newline at end of file
+    render_animation(blend_file, output_path, camera_name, render_engine, start_frame, end_frame, render_threads, format_type, frames)
\ No newline at end of file
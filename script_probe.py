@@ -0,0 +1,44 @@
+import bpy
+import sys
+import json
+
+def probe_blend_file(blend_file):
+    """
+    Abre un archivo .blend y devuelve la información de la escena que necesita la cola.
+
+    Args:
+        blend_file (str): Ruta al archivo .blend.
+
+    Returns:
+        dict: Cámaras, rango de frames, resolución y motor de la escena activa.
+    """
+    bpy.ops.wm.open_mainfile(filepath=blend_file)
+    scene = bpy.context.scene
+    return {
+        "file": blend_file,
+        "cameras": [obj.name for obj in bpy.data.objects if obj.type == 'CAMERA'],
+        "scene_camera": scene.camera.name if scene.camera else "",
+        "frame_start": scene.frame_start,
+        "frame_end": scene.frame_end,
+        "resolution": f"{scene.render.resolution_x}x{scene.render.resolution_y}",
+        "render_engine": scene.render.engine,
+    }
+
+if __name__ == "__main__":
+    argv = sys.argv
+    argv = argv[argv.index("--") + 1:]
+
+    if len(argv) != 1:
+        print("Uso: blender --background --python script_probe.py -- <lista_de_archivos.json>")
+        sys.exit(1)
+
+    # La lista de archivos llega en un JSON para no chocar con el límite de la línea de comandos
+    with open(argv[0], "r", encoding="utf-8") as f:
+        blend_files = json.load(f)
+
+    for blend_file in blend_files:
+        try:
+            result = probe_blend_file(blend_file)
+        except Exception as e:
+            result = {"file": blend_file, "error": str(e)}
+        print(f"PROBE_RESULT: {json.dumps(result)}", flush=True)